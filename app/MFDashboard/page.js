@@ -16,21 +16,16 @@ const useDebounce = (value, delay) => {
 };
 
 const fetchSchemes = async (search = "") => {
+  // A blank search asks the backend for 6 random schemes rather than the
+  // whole list.
   const url = search
-    ? `${process.env.NEXT_PUBLIC_API_URL}/api/mutual/schemes?search=${encodeURIComponent(search)}`
-    : `${process.env.NEXT_PUBLIC_API_URL}/api/mutual/schemes`;
+    ? `${process.env.NEXT_PUBLIC_API_URL}/api/mutual/schemes?search=${encodeURIComponent(search)}&limit=8`
+    : `${process.env.NEXT_PUBLIC_API_URL}/api/mutual/schemes?sample=6`;
   const res = await fetch(url);
   if (!res.ok) return {};
   return await res.json();
 };
 
-function getRandomMFs(schemesObj, count = 6) {
-  const entries = Object.entries(schemesObj);
-  if (entries.length <= count) return entries;
-  const shuffled = entries.sort(() => 0.5 - Math.random());
-  return shuffled.slice(0, count);
-}
-
 export default function MFDashboardPage() {
   const [search, setSearch] = useState("");
   const debouncedSearch = useDebounce(search, 400);
@@ -50,8 +45,8 @@ export default function MFDashboardPage() {
         setDisplayedMfs(mfArr);
         setNoResults(mfArr.length === 0);
       } else {
-        // Show 6 random funds for blank search
-        const mfArr = getRandomMFs(data, 6);
+        // Show the 6 random funds returned for a blank search
+        const mfArr = Object.entries(data).slice(0, 6);
         setDisplayedMfs(mfArr);
         setNoResults(mfArr.length === 0);
       }
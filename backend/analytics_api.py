@@ -0,0 +1,165 @@
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from fastapi import APIRouter, HTTPException, Query
+
+import compute_pool
+import kernels
+from crypto_api import fetch_coin_market_data
+from executors import coingecko_pool, mfapi_pool, yfinance_pool
+from history_cache import PERIOD_OFFSETS, cached_histories, period_start
+from mf_api import load_scheme
+from serialization import array_values
+from stock_api import download_histories
+
+router = APIRouter(prefix="/api/analytics", tags=["Analytics"])
+
+MAX_INSTRUMENTS = 200
+PERIOD_PATTERN = "^(" + "|".join(list(PERIOD_OFFSETS) + ["ytd"]) + ")$"
+
+# (days since epoch, values), sorted by day with one value per day.
+DailySeries = Tuple[np.ndarray, np.ndarray]
+
+
+def split_ids(value: str) -> List[str]:
+    ids = []
+    for item in (value or "").split(","):
+        item = item.strip()
+        if item and item not in ids:
+            ids.append(item)
+    return ids
+
+
+def daily_series(dates, values) -> Optional[DailySeries]:
+    """Sort by date, drop missing values and keep the last value of each day."""
+    days = np.asarray(pd.DatetimeIndex(dates).to_numpy(dtype="datetime64[D]")).astype(np.int64)
+    days, values = kernels.last_per_day(days, values)
+    return (days, values) if len(days) else None
+
+
+def stock_series(symbols: List[str], period: str) -> Dict[str, DailySeries]:
+    frames = cached_histories(symbols, period, "1d", download_histories)
+    series = {}
+    for symbol, frame in frames.items():
+        if "Close" in frame.columns and not frame.empty:
+            # Exchange-local calendar dates.
+            index = frame.index.tz_localize(None) if frame.index.tz is not None else frame.index
+            found = daily_series(index, frame["Close"].to_numpy())
+            if found is not None:
+                series[symbol] = found
+    return series
+
+
+def scheme_series(code: str) -> Optional[DailySeries]:
+    scheme = load_scheme(code)
+    if scheme is None or not len(scheme):
+        return None
+    return daily_series(scheme.dates, scheme.navs)
+
+
+def coin_series(coin_id: str, vs_currency: str, days: int) -> Optional[DailySeries]:
+    df = fetch_coin_market_data(coin_id, vs_currency, days)
+    if df.empty:
+        return None
+    return daily_series(df["date"], df["price"])
+
+
+async def _gather(pool, fn, ids, *args) -> Dict[str, DailySeries]:
+    results = await asyncio.gather(
+        *(pool.run(fn, i, *args) for i in ids), return_exceptions=True
+    )
+    return {i: r for i, r in zip(ids, results) if r is not None and not isinstance(r, Exception)}
+
+
+@router.get("/correlation")
+async def get_correlation(
+    stocks: str = Query("", description="Comma separated, e.g. TCS.NS,INFY.NS"),
+    schemes: str = Query("", description="Comma separated mutual fund scheme codes"),
+    coins: str = Query("", description="Comma separated CoinGecko ids, e.g. bitcoin,ethereum"),
+    period: str = Query("1y", pattern=PERIOD_PATTERN),
+    window: int = Query(30, ge=2, le=365, description="Rolling correlation window, in periods"),
+    base: Optional[str] = Query(None, description="Instrument the rolling correlations are taken against; defaults to the first"),
+    vs_currency: str = "inr",
+):
+    """Correlation and covariance of daily returns across stocks, schemes and coins.
+
+    All series are forward-filled onto one calendar-day grid (weekdays only
+    when any stock or scheme is included), trimmed to the dates every
+    instrument has data for, and processed as a single price matrix.
+    """
+    requested = (
+        [("stock", s.upper()) for s in split_ids(stocks)]
+        + [("mf", c) for c in split_ids(schemes)]
+        + [("crypto", c.lower()) for c in split_ids(coins)]
+    )
+    if len(requested) < 2:
+        raise HTTPException(status_code=400, detail="Give at least two instruments")
+    if len(requested) > MAX_INSTRUMENTS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_INSTRUMENTS} instruments per request")
+
+    now = pd.Timestamp.now()
+    start_day = period_start(period, now).normalize()
+    days = (now.normalize() - start_day).days + 1
+    stock_ids = [i for kind, i in requested if kind == "stock"]
+    scheme_ids = [i for kind, i in requested if kind == "mf"]
+    coin_ids = [i for kind, i in requested if kind == "crypto"]
+
+    async def stocks_task():
+        if not stock_ids:
+            return {}
+        try:
+            return await yfinance_pool.run(stock_series, stock_ids, period)
+        except Exception:
+            return {}
+
+    found_stocks, found_schemes, found_coins = await asyncio.gather(
+        stocks_task(),
+        _gather(mfapi_pool, scheme_series, scheme_ids),
+        _gather(coingecko_pool, coin_series, coin_ids, vs_currency, days),
+    )
+    found = {"stock": found_stocks, "mf": found_schemes, "crypto": found_coins}
+    instruments = [(kind, i) for kind, i in requested if i in found[kind]]
+    missing = [{"id": i, "type": kind} for kind, i in requested if i not in found[kind]]
+    if len(instruments) < 2:
+        raise HTTPException(status_code=404, detail="Not enough instruments with price history")
+    series = [found[kind][i] for kind, i in instruments]
+
+    first_day = start_day.to_datetime64().astype("datetime64[D]").astype(np.int64)
+    first_day = max([first_day] + [int(d[0]) for d, _ in series])
+    grid = np.unique(np.concatenate([d for d, _ in series]))
+    grid = grid[grid >= first_day]
+    if any(kind != "crypto" for kind, _ in instruments):
+        # 1970-01-01 was a Thursday, so Saturday and Sunday are 2 and 3.
+        grid = grid[(grid % 7 != 2) & (grid % 7 != 3)]
+    if len(grid) < 3:
+        raise HTTPException(status_code=404, detail="Not enough overlapping history")
+
+    prices = np.column_stack([kernels.forward_fill_on_grid(grid, d, v) for d, v in series])
+    base_index = 0
+    if base:
+        ids = [i for _, i in instruments]
+        if base not in ids:
+            raise HTTPException(status_code=400, detail=f"Base {base} is not among the instruments with data")
+        base_index = ids.index(base)
+    cov, corr, rolling = await compute_pool.return_correlations(prices, window, base_index)
+
+    dates = grid.astype("datetime64[D]").astype(str)
+    return {
+        "instruments": [{"id": i, "type": kind} for kind, i in instruments],
+        "missing": missing,
+        "start": str(dates[0]),
+        "end": str(dates[-1]),
+        "observations": len(grid) - 1,
+        "correlation": array_values(corr, 6),
+        "covariance": array_values(cov),
+        "rolling": {
+            "base": instruments[base_index][1],
+            "window": window,
+            "dates": dates[window:].tolist() if len(rolling) else [],
+            "correlations": {
+                i: array_values(rolling[:, n], 6) for n, (_, i) in enumerate(instruments)
+            },
+        },
+    }
@@ -0,0 +1,83 @@
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, Optional
+
+from executors import BoundedExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """Runs a blocking `fn()` on `pool` every `interval` seconds.
+
+    The first run happens `delay` seconds after start. Failures are logged
+    and retried on the next tick.
+    """
+
+    def __init__(self, name: str, interval: float, fn: Callable[[], object], pool: BoundedExecutor, delay: float = 0):
+        self.name = name
+        self.interval = interval
+        self.fn = fn
+        self.pool = pool
+        self.delay = delay
+        self.runs = 0
+        self.failures = 0
+        self.last_run: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def _loop(self) -> None:
+        await asyncio.sleep(self.delay)
+        while True:
+            try:
+                await self.pool.run(self.fn)
+                self.last_error = None
+            except Exception as e:
+                self.failures += 1
+                self.last_error = str(e)
+                logger.warning(f"background task {self.name} failed: {e}")
+            self.runs += 1
+            self.last_run = time.time()
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop(), name=self.name)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "interval": self.interval,
+            "runs": self.runs,
+            "failures": self.failures,
+            "last_run": self.last_run,
+            "last_error": self.last_error,
+        }
+
+
+TASKS: Dict[str, PeriodicTask] = {}
+
+
+def schedule(name: str, interval: float, fn: Callable[[], object], pool: BoundedExecutor, delay: float = 0) -> PeriodicTask:
+    """Register a periodic task; it runs once `start_background_tasks` is called."""
+    task = TASKS[name] = PeriodicTask(name, interval, fn, pool, delay)
+    return task
+
+
+def start_background_tasks() -> None:
+    for task in TASKS.values():
+        task.start()
+
+
+async def stop_background_tasks() -> None:
+    await asyncio.gather(*(task.stop() for task in TASKS.values()))
+
+
+def background_stats() -> Dict[str, dict]:
+    return {name: task.stats() for name, task in TASKS.items()}
@@ -0,0 +1,255 @@
+import copy
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Match tiers, best first.
+EXACT, PREFIX, NAME = range(3)
+MAX_RESULTS = 100
+# Prefixes shorter than this match a large part of the list, so their best
+# MAX_RESULTS matches are precomputed instead of ranked per query.
+SHORT_PREFIX = 3
+
+
+def _tokens(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+def _compact(text: str) -> str:
+    return "".join(_tokens(text))
+
+
+class CoinIndex:
+    """Autocomplete index over the CoinGecko coin list.
+
+    Keys are compacted ids and symbols plus lower-cased name tokens; prefix
+    lookups bisect sorted key lists. Within a tier, coins with a better
+    market cap rank come first, then unranked coins by shorter name, so
+    "btc" finds Bitcoin before the many tokens reusing its ticker.
+    """
+
+    def __init__(self, coins: Iterable[dict], ranks: Dict[str, int]):
+        self.coins: List[dict] = []
+        seen = set()
+        for coin in coins:
+            coin_id = coin.get("id")
+            if coin_id and coin_id not in seen:
+                seen.add(coin_id)
+                self.coins.append({"id": coin_id, "symbol": coin.get("symbol") or "", "name": coin.get("name") or ""})
+
+        self._key_ids: Dict[str, List[int]] = defaultdict(list)
+        self._token_ids: Dict[str, List[int]] = defaultdict(list)
+        self._name_tokens = [_tokens(c["name"]) for c in self.coins]
+        for i, coin in enumerate(self.coins):
+            for key in {_compact(coin["id"]), _compact(coin["symbol"])} - {""}:
+                self._key_ids[key].append(i)
+            for token in set(self._name_tokens[i]) | set(_tokens(coin["id"])):
+                self._token_ids[token].append(i)
+        self._names = {_compact(c["name"]): [] for c in self.coins}
+        for i, coin in enumerate(self.coins):
+            self._names[_compact(coin["name"])].append(i)
+
+        self._keys = sorted(self._key_ids)
+        self._token_keys = sorted(self._token_ids)
+        self._short_key_prefixes = self._short_prefixes(self._key_ids)
+        self._short_token_prefixes = self._short_prefixes(self._token_ids)
+        self._rank(ranks)
+
+    def __len__(self) -> int:
+        return len(self.coins)
+
+    def _short_prefixes(self, ids: Dict[str, List[int]]) -> List[Set[str]]:
+        prefixes: List[Set[str]] = [set() for _ in self.coins]
+        for key, key_ids in ids.items():
+            short = {key[:n] for n in range(1, SHORT_PREFIX)}
+            for i in key_ids:
+                prefixes[i].update(short)
+        return prefixes
+
+    def _rank(self, ranks: Dict[str, int]) -> None:
+        unranked = len(ranks) + 1
+        self._order = [
+            (ranks.get(c["id"]) or unranked, len(c["name"]), c["id"]) for c in self.coins
+        ]
+        ranked = sorted(range(len(self.coins)), key=self._order.__getitem__)
+        self._short_key = self._top_by_prefix(ranked, self._short_key_prefixes)
+        self._short_token = self._top_by_prefix(ranked, self._short_token_prefixes)
+
+    @staticmethod
+    def _top_by_prefix(ranked: List[int], prefixes: List[Set[str]]) -> Dict[str, List[int]]:
+        # Each short prefix keeps the first MAX_RESULTS coins reaching it.
+        top: Dict[str, List[int]] = defaultdict(list)
+        for i in ranked:
+            for prefix in prefixes[i]:
+                found = top[prefix]
+                if len(found) < MAX_RESULTS:
+                    found.append(i)
+        return dict(top)
+
+    def reranked(self, ranks: Dict[str, int]) -> "CoinIndex":
+        """A copy ordered by new market cap ranks, sharing the token index."""
+        index = copy.copy(self)
+        index._rank(ranks)
+        return index
+
+    @staticmethod
+    def _prefixed(keys: List[str], ids: Dict[str, List[int]], prefix: str) -> Set[int]:
+        found = set()
+        for pos in range(bisect_left(keys, prefix), len(keys)):
+            key = keys[pos]
+            if not key.startswith(prefix):
+                break
+            found.update(ids[key])
+        return found
+
+    def search(self, query: str, limit: int = MAX_RESULTS) -> List[dict]:
+        """Ranked matches: exact id/symbol/name, id/symbol prefix, then name words."""
+        key = _compact(query)
+        if not key or limit <= 0:
+            return []
+        limit = min(limit, MAX_RESULTS)
+        tiers: Dict[int, int] = {}
+
+        def add(ids: Iterable[int], tier: int):
+            for i in ids:
+                if i not in tiers:
+                    tiers[i] = tier
+
+        add(self._key_ids.get(key, ()), EXACT)
+        add(self._names.get(key, ()), EXACT)
+        if len(key) < SHORT_PREFIX:
+            add(self._short_key.get(key, ()), PREFIX)
+        else:
+            add(self._prefixed(self._keys, self._key_ids, key), PREFIX)
+
+        # Every query word must prefix some word of the name (or id). The
+        # longest word picks the candidates; the rest are checked on them.
+        words = _tokens(query)
+        driver = max(words, key=len)
+        if len(driver) < SHORT_PREFIX:
+            candidates = self._short_token.get(driver, ())
+        else:
+            candidates = self._prefixed(self._token_keys, self._token_ids, driver)
+        others = [w for w in words if w is not driver]
+        add(
+            (i for i in candidates
+             if all(any(t.startswith(w) for t in self._name_tokens[i]) for w in others)),
+            NAME,
+        )
+        ranked = sorted(tiers, key=lambda i: (tiers[i], self._order[i]))
+        return [self.coins[i] for i in ranked[:limit]]
+
+
+class CoinDirectory:
+    """Markets snapshot of the top coins plus an index of every listed coin.
+
+    `fetch_markets()` returns CoinGecko /coins/markets rows and
+    `fetch_list()` the /coins/list entries. Both are refreshed in the
+    background; requests only read the current snapshot and index, which
+    are replaced whole on refresh. A request that arrives before the first
+    refresh loads the snapshot with `fetch_markets_now`, if given, since a
+    caller is waiting on it.
+    """
+
+    def __init__(
+        self,
+        fetch_markets: Callable[[], List[dict]],
+        fetch_list: Callable[[], List[dict]],
+        fetch_markets_now: Optional[Callable[[], List[dict]]] = None,
+    ):
+        self.fetch_markets = fetch_markets
+        self.fetch_list = fetch_list
+        self.fetch_markets_now = fetch_markets_now or fetch_markets
+        self.markets: List[dict] = []
+        self.by_id: Dict[str, dict] = {}
+        self.coin_list: List[dict] = []
+        self.index: Optional[CoinIndex] = None
+        self.markets_at: Optional[float] = None
+        self.list_at: Optional[float] = None
+        # Guards swapping in a new snapshot or index; never held while fetching.
+        self._lock = threading.Lock()
+        # Lets concurrent first requests share one on-demand fetch.
+        self._first_load = threading.Lock()
+
+    @staticmethod
+    def _ranks_of(markets: List[dict]) -> Dict[str, int]:
+        return {c["id"]: c["market_cap_rank"] for c in markets if c.get("market_cap_rank")}
+
+    def refresh_markets(self, fetch: Optional[Callable[[], List[dict]]] = None) -> int:
+        # Fetched without the lock: a BACKGROUND fetch may queue for rate
+        # budget for minutes, and readers must not wait behind it.
+        markets = [c for c in (fetch or self.fetch_markets)() if c.get("id")]
+        if not markets:
+            raise RuntimeError("no market rows")
+        by_id = {c["id"]: c for c in markets}
+        ranks = self._ranks_of(markets)
+        with self._lock:
+            self.by_id = by_id
+            self.markets = markets
+            self.markets_at = time.time()
+            if self.coin_list and self.index is not None:
+                # The list hasn't changed; only the ranking has.
+                self.index = self.index.reranked(ranks)
+            else:
+                # Until the full list arrives, the snapshot's coins are searchable.
+                self.index = CoinIndex(markets, ranks)
+        return len(markets)
+
+    def refresh_list(self) -> int:
+        coins = [c for c in self.fetch_list() if c.get("id")]
+        if not coins:
+            raise RuntimeError("coin list is empty")
+        markets = self.markets
+        index = CoinIndex(coins, self._ranks_of(markets))
+        with self._lock:
+            if self.markets is not markets:
+                # The snapshot was replaced while the index was built.
+                index = index.reranked(self._ranks_of(self.markets))
+            self.coin_list = coins
+            self.list_at = time.time()
+            self.index = index
+        return len(coins)
+
+    def _ensure_markets(self) -> None:
+        if self.markets_at is None:
+            with self._first_load:
+                if self.markets_at is None:
+                    self.refresh_markets(self.fetch_markets_now)
+
+    @property
+    def loaded(self) -> bool:
+        return self.markets_at is not None
+
+    def top(self, limit: int) -> List[dict]:
+        self._ensure_markets()
+        return self.markets[:limit]
+
+    def lookup(self, coin_ids: Iterable[str]) -> List[dict]:
+        """Market rows for the given ids that are in the snapshot, best ranked first."""
+        self._ensure_markets()
+        by_id = self.by_id
+        found = [by_id[i] for i in coin_ids if i in by_id]
+        return sorted(found, key=lambda c: c.get("market_cap_rank") or float("inf"))
+
+    def search(self, query: str, limit: int = MAX_RESULTS) -> List[dict]:
+        """Matching coins, with market fields when the coin is in the snapshot.
+
+        Coins outside the snapshot come back with only id, symbol and name.
+        """
+        self._ensure_markets()
+        index, by_id = self.index, self.by_id
+        return [by_id.get(c["id"], c) for c in index.search(query, limit)]
+
+    def stats(self) -> dict:
+        return {
+            "markets": len(self.markets),
+            "markets_at": self.markets_at,
+            "coins": len(self.coin_list),
+            "list_at": self.list_at,
+            "indexed": len(self.index) if self.index is not None else 0,
+        }
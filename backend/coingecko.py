@@ -0,0 +1,182 @@
+import heapq
+import itertools
+import logging
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+COINGECKO_BASE = "https://api.coingecko.com/api/v3"
+REQUEST_TIMEOUT = 15
+# The public API allows roughly 30 calls a minute; keep a little headroom.
+COINGECKO_RATE_PER_MINUTE = float(os.getenv("COINGECKO_RATE_PER_MINUTE", "25"))
+COINGECKO_BURST = int(os.getenv("COINGECKO_BURST", "5"))
+COINGECKO_MAX_RETRIES = int(os.getenv("COINGECKO_MAX_RETRIES", "3"))
+# Backoff after a 429 without Retry-After: base * 2^attempt, with jitter.
+COINGECKO_BACKOFF_BASE = float(os.getenv("COINGECKO_BACKOFF_BASE", "2"))
+COINGECKO_BACKOFF_MAX = float(os.getenv("COINGECKO_BACKOFF_MAX", "120"))
+
+# Lower values are served first.
+INTERACTIVE, LIVE, BACKGROUND = range(3)
+PRIORITY_NAMES = {INTERACTIVE: "interactive", LIVE: "live", BACKGROUND: "background"}
+# How long a call waits for budget before giving up, per priority.
+QUEUE_TIMEOUTS = {INTERACTIVE: 20.0, LIVE: 30.0, BACKGROUND: 300.0}
+
+
+class RateLimited(Exception):
+    """CoinGecko budget exhausted or upstream still answering 429."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"CoinGecko rate limit, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class RequestBudget:
+    """Token bucket shared by every thread calling CoinGecko.
+
+    Tokens refill at `rate_per_minute` up to `burst`. Waiting callers are
+    served strictly by (priority, arrival), so a queued interactive call
+    takes the next token ahead of any background call. `pause()` empties
+    the bucket and holds everyone until a 429's cool-down has passed.
+    """
+
+    def __init__(self, rate_per_minute: float, burst: int):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._cond = threading.Condition()
+        self._queue: List[Tuple[int, int]] = []
+        self._seq = itertools.count()
+        self.granted: Dict[int, int] = {p: 0 for p in PRIORITY_NAMES}
+        self.timed_out: Dict[int, int] = {p: 0 for p in PRIORITY_NAMES}
+
+    def _refill(self, now: float) -> None:
+        # Nothing accrues during a pause, so it ends with an empty bucket.
+        start = max(self.updated, self.paused_until)
+        if now > start:
+            self.tokens = min(self.capacity, self.tokens + (now - start) * self.rate)
+            self.updated = now
+
+    def _wait_time(self, now: float) -> float:
+        if now < self.paused_until:
+            return self.paused_until - now
+        return max(0.0, (1.0 - self.tokens) / self.rate)
+
+    def acquire(self, priority: int, timeout: float) -> bool:
+        """Block until this caller may send one request; False on timeout."""
+        ticket = (priority, next(self._seq))
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            heapq.heappush(self._queue, ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    wait = self._wait_time(now)
+                    if self._queue[0] == ticket and wait <= 0:
+                        heapq.heappop(self._queue)
+                        self.tokens -= 1.0
+                        self.granted[priority] += 1
+                        return True
+                    if now >= deadline:
+                        self._queue.remove(ticket)
+                        heapq.heapify(self._queue)
+                        self.timed_out[priority] += 1
+                        return False
+                    # Only the head needs to wake for a token; everyone else
+                    # is woken when the head changes.
+                    limit = deadline - now
+                    self._cond.wait(min(wait, limit) if self._queue[0] == ticket else limit)
+            finally:
+                self._cond.notify_all()
+
+    def pause(self, seconds: float) -> None:
+        with self._cond:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+            self._cond.notify_all()
+
+    def retry_after(self) -> float:
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+            return max(1.0, self._wait_time(now))
+
+    def stats(self) -> dict:
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+            waiting = {name: 0 for name in PRIORITY_NAMES.values()}
+            for priority, _ in self._queue:
+                waiting[PRIORITY_NAMES[priority]] += 1
+            return {
+                "tokens": round(self.tokens, 2),
+                "rate_per_minute": self.rate * 60,
+                "paused_for": round(max(0.0, self.paused_until - now), 1),
+                "waiting": waiting,
+                "granted": {PRIORITY_NAMES[p]: n for p, n in self.granted.items()},
+                "timed_out": {PRIORITY_NAMES[p]: n for p, n in self.timed_out.items()},
+            }
+
+
+def _retry_after_seconds(r: requests.Response) -> Optional[float]:
+    value = r.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class CoinGeckoClient:
+    """Every CoinGecko call goes through here: budget, priorities and 429 backoff."""
+
+    def __init__(self, budget: RequestBudget):
+        self.budget = budget
+        self.throttled = 0
+        self.sent = 0
+
+    def get(self, path: str, priority: int = INTERACTIVE, **params) -> requests.Response:
+        """GET `COINGECKO_BASE + path`.
+
+        Raises RateLimited if no budget frees up within the priority's
+        queue timeout, or if upstream still answers 429 after
+        COINGECKO_MAX_RETRIES backoffs. Other errors are returned as-is.
+        BACKGROUND calls may wait minutes for budget; run them on
+        executors.coingecko_background_pool, not coingecko_pool.
+        """
+        for attempt in range(COINGECKO_MAX_RETRIES + 1):
+            if not self.budget.acquire(priority, QUEUE_TIMEOUTS[priority]):
+                raise RateLimited(self.budget.retry_after())
+            self.sent += 1
+            r = requests.get(f"{COINGECKO_BASE}{path}", params=params or None, timeout=REQUEST_TIMEOUT)
+            if r.status_code != 429:
+                return r
+            self.throttled += 1
+            delay = _retry_after_seconds(r)
+            if delay is None:
+                delay = min(COINGECKO_BACKOFF_MAX, COINGECKO_BACKOFF_BASE * 2 ** attempt)
+            # Jitter so callers released together don't hit upstream together.
+            delay *= random.uniform(1.0, 1.5)
+            logger.warning(f"CoinGecko 429 on {path}, pausing {delay:.1f}s")
+            self.budget.pause(delay)
+        raise RateLimited(self.budget.retry_after())
+
+    def stats(self) -> dict:
+        return {"sent": self.sent, "throttled": self.throttled, **self.budget.stats()}
+
+
+client = CoinGeckoClient(RequestBudget(COINGECKO_RATE_PER_MINUTE, COINGECKO_BURST))
@@ -0,0 +1,240 @@
+import asyncio
+import functools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+import kernels
+from montecarlo import BandHistogram, SimulationResult, build_result, sample_days_for, simulate_into
+
+COMPUTE_MAX_WORKERS = int(os.getenv("COMPUTE_MAX_WORKERS", str(os.cpu_count() or 1)))
+# Simulations per independently seeded block. Blocks, not workers, own the
+# seed streams, so a seed gives the same result on any machine size.
+MC_BLOCK_SIMULATIONS = int(os.getenv("MC_BLOCK_SIMULATIONS", "25000"))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+# (shared memory name, shape, dtype string) describing an array in shared memory.
+ArraySpec = Tuple[str, Tuple[int, ...], str]
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Return the process pool, starting it on first use.
+
+    Workers are spawned rather than forked since the parent already runs the
+    upstream thread pools.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=COMPUTE_MAX_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def _discard(pool: ProcessPoolExecutor) -> None:
+    """Drop a pool whose worker died, so the next call starts a fresh one.
+
+    A broken ProcessPoolExecutor fails every later submission; without this
+    one crashed worker would take down every compute route until restart.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def _run_in_pool(calls):
+    """Run the no-argument `calls` concurrently in the pool, in order."""
+    loop = asyncio.get_running_loop()
+    pool = get_pool()
+    try:
+        return await asyncio.gather(*(loop.run_in_executor(pool, call) for call in calls))
+    except BrokenProcessPool:
+        _discard(pool)
+        raise
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+class SharedArray:
+    """NumPy array backed by a shared memory block owned by this process."""
+
+    def __init__(self, shape, dtype):
+        dtype = np.dtype(dtype)
+        nbytes = max(int(np.prod(shape)) * dtype.itemsize, 1)
+        self.shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        self.array = np.ndarray(shape, dtype=dtype, buffer=self.shm.buf)
+        self.spec: ArraySpec = (self.shm.name, tuple(shape), dtype.str)
+
+    @classmethod
+    def copy_of(cls, values: np.ndarray) -> "SharedArray":
+        values = np.ascontiguousarray(values)
+        shared = cls(values.shape, values.dtype)
+        shared.array[...] = values
+        return shared
+
+    def release(self) -> None:
+        self.array = None
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _attach(spec: ArraySpec):
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+
+def _call_with_arrays(fn, specs: Sequence[ArraySpec], kwargs: dict):
+    handles = [_attach(spec) for spec in specs]
+    try:
+        return fn(*(array for _, array in handles), **kwargs)
+    finally:
+        del fn, kwargs
+        for shm, _ in handles:
+            shm.close()
+
+
+async def run_with_arrays(fn, *arrays: np.ndarray, **kwargs):
+    """Run `fn(*arrays, **kwargs)` in the compute pool.
+
+    Arrays are copied once into shared memory and mapped by the worker, so
+    large inputs are not pickled. `fn` must be a module-level function and
+    must not keep references to the arrays after returning.
+    """
+    shared = [SharedArray.copy_of(a) for a in arrays]
+    try:
+        [result] = await _run_in_pool([
+            functools.partial(_call_with_arrays, fn, [s.spec for s in shared], kwargs),
+        ])
+        return result
+    finally:
+        for s in shared:
+            s.release()
+
+
+def timestamps_ns(dates) -> np.ndarray:
+    """int64 nanosecond timestamps for a datetime Series/Index, as kernels expect."""
+    return np.asarray(dates.to_numpy(dtype="datetime64[ns]")).view(np.int64)
+
+
+async def monthly_first_last(timestamps_ns: np.ndarray, values: np.ndarray):
+    return await run_with_arrays(kernels.monthly_first_last, timestamps_ns, values)
+
+
+async def month_of_year_mean_change(timestamps_ns: np.ndarray, prices: np.ndarray):
+    return await run_with_arrays(kernels.month_of_year_mean_change, timestamps_ns, prices)
+
+
+async def rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+    return await run_with_arrays(kernels.rolling_std, values, window=window)
+
+
+async def return_correlations(prices: np.ndarray, window: int, base: int):
+    return await run_with_arrays(kernels.return_correlations, prices, window=window, base=base)
+
+
+def _simulate_block(
+    terminal_spec: ArraySpec,
+    offset: int,
+    count: int,
+    seed_seq: np.random.SeedSequence,
+    last_price: float,
+    mu: float,
+    sigma: float,
+    days: int,
+    sample_every: int,
+    num_paths: int,
+    bands: bool,
+):
+    terminal_shm, terminal = _attach(terminal_spec)
+    histogram = (
+        BandHistogram(last_price, mu, sigma, sample_days_for(days, sample_every)) if bands else None
+    )
+    try:
+        sample_sum, paths = simulate_into(
+            terminal[offset:offset + count],
+            histogram,
+            last_price, mu, sigma, days,
+            np.random.default_rng(seed_seq),
+            sample_every, num_paths,
+        )
+        return sample_sum, paths, histogram
+    finally:
+        del terminal
+        terminal_shm.close()
+
+
+async def simulate_prices(
+    last_price: float,
+    mu: float,
+    sigma: float,
+    days: int,
+    num_simulations: int,
+    seed: Optional[int] = None,
+    dtype=np.float64,
+    sample_every: int = 5,
+    num_paths: int = 0,
+    band_percentiles: Sequence[float] = (),
+) -> SimulationResult:
+    """Process-pool version of `montecarlo.simulate_prices`.
+
+    Simulations are split into blocks of MC_BLOCK_SIMULATIONS, each with its
+    own child seed spawned from `seed`, and the blocks run across the pool
+    writing terminal prices straight into a shared array. Each block returns
+    its own band histogram, merged here.
+    """
+    if days < 1 or num_simulations < 1:
+        raise ValueError("days and num_simulations must be positive")
+    sample_days = sample_days_for(days, sample_every)
+    offsets = list(range(0, num_simulations, MC_BLOCK_SIMULATIONS))
+    seeds = np.random.SeedSequence(seed).spawn(len(offsets))
+
+    terminal = SharedArray((num_simulations,), dtype)
+    try:
+        blocks = await _run_in_pool([
+            functools.partial(
+                _simulate_block,
+                terminal.spec,
+                offset,
+                min(MC_BLOCK_SIMULATIONS, num_simulations - offset),
+                block_seed,
+                last_price, mu, sigma, days, sample_every,
+                num_paths if offset == 0 else 0,
+                bool(band_percentiles),
+            )
+            for offset, block_seed in zip(offsets, seeds)
+        ])
+        sample_sum = np.sum([block_sum for block_sum, _, _ in blocks], axis=0)
+        histogram = blocks[0][2]
+        if histogram is not None:
+            for _, _, block_histogram in blocks[1:]:
+                histogram.merge(block_histogram)
+        return build_result(
+            last_price,
+            terminal.array.copy(),
+            histogram,
+            sample_days,
+            sample_sum,
+            blocks[0][1],
+            band_percentiles,
+        )
+    finally:
+        terminal.release()
@@ -1,57 +1,73 @@
 from fastapi import APIRouter, HTTPException, Query
-import requests
 import pandas as pd
 import numpy as np
+from typing import Optional
+import os
+
+import compute_pool
+import kernels
+from background import schedule
+from coin_index import CoinDirectory
+from coingecko import BACKGROUND, INTERACTIVE, LIVE, RateLimited, client as coingecko
+from executors import coingecko_background_pool, coingecko_pool
+from montecarlo import MAX_HORIZON_DAYS, MAX_SIMULATIONS, PRECISION_PATTERN, PRECISIONS
+from price_store import PRICE_STORE_REFRESH, price_store, record_dtype
+from serialization import COLUMNAR, FORMAT_PATTERN, RECORDS, format_dates, serialize_aligned, serialize_frame
+from singleflight import coalesce, coingecko_flight, copy_result
 
 router = APIRouter(prefix="/api/crypto", tags=["Crypto"])
-COINGECKO_BASE = "https://api.coingecko.com/api/v3"
+MAX_COMPARE_COINS = 20
+# Coins kept in the markets snapshot (CoinGecko pages hold at most 250).
+COINGECKO_MARKETS_SIZE = min(250, int(os.getenv("COINGECKO_MARKETS_SIZE", "250")))
+# Also the refresh cadence of USD /famous prices, which are read from it.
+COINGECKO_MARKETS_REFRESH = float(os.getenv("COINGECKO_MARKETS_REFRESH", "120"))
+COINGECKO_COIN_LIST_REFRESH = float(os.getenv("COINGECKO_COIN_LIST_REFRESH", "86400"))
+FAMOUS_COIN_IDS = [
+    "bitcoin", "ethereum", "solana", "binancecoin", "tether", "ripple",
+    "cardano", "dogecoin", "tron", "avalanche-2",
+]
+# Shortest history kept per (coin, currency); shorter ranges are slices of it.
+CRYPTO_HISTORY_DAYS = int(os.getenv("CRYPTO_HISTORY_DAYS", "365"))
+
+DAY_NS = 86400 * 10**9
+MARKET_RECORD = record_dtype(["price"])
 
 
-def fetch_top_market_coins(per_page=100, page=1, vs_currency="usd"):
-    url = (
-        f"{COINGECKO_BASE}/coins/markets"
-        f"?vs_currency={vs_currency}&order=market_cap_desc"
-        f"&per_page={per_page}&page={page}&sparkline=false"
+def fetch_top_market_coins(per_page=COINGECKO_MARKETS_SIZE, page=1, vs_currency="usd", priority=BACKGROUND):
+    r = coingecko.get(
+        "/coins/markets", priority,
+        vs_currency=vs_currency, order="market_cap_desc", per_page=per_page, page=page, sparkline="false",
     )
-    r = requests.get(url)
-    if r.ok:
-        return r.json()
-    return []
+    r.raise_for_status()
+    return r.json()
+
+def fetch_coin_list():
+    r = coingecko.get("/coins/list", BACKGROUND)
+    r.raise_for_status()
+    return r.json()
 
-def fetch_markets_search(query, vs_currency="usd"):
-    url = (
-        f"{COINGECKO_BASE}/coins/markets?vs_currency={vs_currency}"
-        "&order=market_cap_desc&per_page=100&page=1&sparkline=false"
+coin_directory = CoinDirectory(
+    fetch_top_market_coins, fetch_coin_list,
+    fetch_markets_now=lambda: fetch_top_market_coins(priority=INTERACTIVE),
+)
+schedule("coingecko-markets", COINGECKO_MARKETS_REFRESH, coin_directory.refresh_markets, coingecko_background_pool)
+schedule("coingecko-coin-list", COINGECKO_COIN_LIST_REFRESH, coin_directory.refresh_list, coingecko_background_pool, delay=30)
+
+@coalesce(coingecko_flight, share=copy_result)
+def fetch_famous_coins(vs_currency="usd"):
+    r = coingecko.get(
+        "/coins/markets", INTERACTIVE,
+        vs_currency=vs_currency, ids=",".join(FAMOUS_COIN_IDS),
+        order="market_cap_desc", per_page=len(FAMOUS_COIN_IDS), page=1, sparkline="false",
     )
-    r = requests.get(url)
-    if not r.ok:
-        return []
-    results = r.json()
-    if query:
-        results = [
-            c for c in results
-            if query.lower() in (c.get('id','') + c.get('symbol','') + c.get('name','')).lower()
-        ]
-        # prioritize exact match
-        prioritized = [
-            c for c in results if
-            c.get('id','').lower() == query.lower() or
-            c.get('symbol','').lower() == query.lower() or
-            c.get('name','').lower() == query.lower()
-        ]
-        # remove dups, prioritized first
-        seen = set()
-        coins = []
-        for c in prioritized + results:
-            if c['id'] not in seen:
-                coins.append(c)
-                seen.add(c['id'])
-        return coins
-    return results
+    r.raise_for_status()
+    return r.json()
 
-def fetch_coin_market_data(coin_id, vs_currency="usd", days=365):
-    url = f"{COINGECKO_BASE}/coins/{coin_id}/market_chart?vs_currency={vs_currency}&days={days}"
-    r = requests.get(url)
+def fetch_market_chart(coin_id, vs_currency="usd", days=365, interval=None):
+    params = {"vs_currency": vs_currency, "days": days}
+    if interval:
+        params["interval"] = interval
+    r = coingecko.get(f"/coins/{coin_id}/market_chart", INTERACTIVE, **params)
     if r.ok:
         prices = r.json().get("prices", [])
         df = pd.DataFrame(prices, columns=["timestamp", "price"])
@@ -60,9 +76,92 @@ def fetch_coin_market_data(coin_id, vs_currency="usd", days=365):
         return df
     return pd.DataFrame([])
 
+def fetch_coin_market_data(coin_id, vs_currency="usd", days=365):
+    """Daily prices for the last `days` days as a timestamp/price/date frame.
+
+    Every range is a slice of one stored series per (coin, currency) that
+    spans at least CRYPTO_HISTORY_DAYS, so a coin's charts share a single
+    upstream download.
+    """
+    days = int(days)
+    records = fetch_stored_market_data(coin_id, vs_currency, max(days, CRYPTO_HISTORY_DAYS))
+    if records is None:
+        return pd.DataFrame([])
+    now = pd.Timestamp.now(tz="UTC").tz_localize(None)
+    records = records[np.searchsorted(records["ts"], (now - pd.Timedelta(days=days)).value):]
+    date = pd.DatetimeIndex(records["ts"].astype("datetime64[ns]"))
+    return pd.DataFrame({"timestamp": date.as_unit("ms").asi8, "price": records["price"], "date": date})
+
+@coalesce(coingecko_flight)
+def fetch_stored_market_data(coin_id, vs_currency, days):
+    """Records of the stored daily series covering `days`, topped up incrementally.
+
+    A stale series only downloads the days since its last stored point;
+    today's point (the intraday "current price") is replaced on each
+    top-up. Returns a copy, since a later top-up rewrites the file, or
+    None if upstream has no prices.
+    """
+    key = f"{coin_id}-{vs_currency}"
+    now = pd.Timestamp.now(tz="UTC").tz_localize(None)
+    start_ns = (now - pd.Timedelta(days=days)).value
+    with price_store.lock("crypto", key):
+        stored = price_store.read("crypto", key)
+        if stored is not None and stored.covers(start_ns) and len(stored.records):
+            if not stored.is_fresh(PRICE_STORE_REFRESH):
+                gap = (now.value - stored.last_ts) // DAY_NS + 2
+                new = fetch_market_chart(coin_id, vs_currency, gap, interval="daily")
+                if new.empty:
+                    price_store.touch("crypto", key)
+                else:
+                    price_store.append("crypto", key, _market_records(new))
+                    stored = price_store.read("crypto", key)
+            return np.array(stored.records)
+
+        df = fetch_market_chart(coin_id, vs_currency, days)
+        if df.empty:
+            return None
+        records = _market_records(df)
+        price_store.write("crypto", key, records, {"covers_from": start_ns})
+        return records
+
+def _market_records(df):
+    """One record per UTC day, stamped at midnight, holding its last price.
+
+    Ranges under 90 days come back hourly and the newest point is the live
+    price; both collapse to daily here.
+    """
+    days, prices = _daily_prices(df)
+    records = np.empty(len(days), dtype=MARKET_RECORD)
+    records["ts"] = days * DAY_NS
+    records["price"] = prices
+    return records
+
+def _daily_prices(df):
+    """(days since epoch, price) keeping the last price of each day."""
+    days = df["date"].to_numpy(dtype="datetime64[D]").astype(np.int64)
+    return kernels.last_per_day(days, df["price"].to_numpy(dtype=float))
+
+@coalesce(coingecko_flight)
+def fetch_simple_price(coin_id, vs_currency="usd"):
+    """Latest price, market cap, 24h volume and 24h change for one coin."""
+    r = coingecko.get(
+        "/simple/price", LIVE,
+        ids=coin_id, vs_currencies=vs_currency, include_market_cap="true", include_24hr_vol="true",
+        include_24hr_change="true", include_last_updated_at="true",
+    )
+    if not r.ok:
+        return {}
+    data = r.json().get(coin_id) or {}
+    return {
+        "price": data.get(vs_currency),
+        "market_cap": data.get(f"{vs_currency}_market_cap"),
+        "volume_24h": data.get(f"{vs_currency}_24h_vol"),
+        "change_24h": data.get(f"{vs_currency}_24h_change"),
+        "last_updated_at": data.get("last_updated_at"),
+    }
+
 def fetch_coin_details(coin_id):
-    url = f"{COINGECKO_BASE}/coins/{coin_id}"
-    r = requests.get(url)
+    r = coingecko.get(f"/coins/{coin_id}", INTERACTIVE)
     if r.ok:
         return r.json()
     return {}
@@ -83,10 +182,21 @@ def safeget(d, *path):
 
 @router.get("/coins")
 async def get_coins(search: str = ""):
-    if not search:
-        coins = fetch_top_market_coins(per_page=100)
-    else:
-        coins = fetch_markets_search(search)
+    """Top coins by market cap, or the coins best matching `search`.
+
+    Both come from memory: a background-refreshed markets snapshot and an
+    index of the full CoinGecko coin list. Matches outside the snapshot
+    have no market fields.
+    """
+    if not coin_directory.loaded:
+        # First request before the background refresh has finished.
+        try:
+            await coingecko_pool.run(coin_directory.top, 0)
+        except RateLimited:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=502, detail=f"Coin markets unavailable: {e}")
+    coins = coin_directory.search(search) if search else coin_directory.top(100)
     return [{
         "id": c["id"],
         "symbol": c["symbol"],
@@ -101,7 +211,7 @@ async def get_coins(search: str = ""):
 async def get_coin_details(coin_id: str):
     # Defensive logging: helpful during debugging and to surface not-found issues
     print(f"DEBUG: get_coin_details received {coin_id}")
-    data = fetch_coin_details(coin_id)
+    data = await coingecko_pool.run(fetch_coin_details, coin_id)
     if not data or "error" in data:
         # Optionally log this failure for debugging
         print(f"DEBUG: Coin {coin_id} not found or error in data")
@@ -132,27 +242,35 @@ async def get_coin_details(coin_id: str):
     }
 
 @router.get("/historical-price/{coin_id}")
-async def get_historical_price(coin_id: str, vs_currency: str = "usd", days: int = 365):
-    df = fetch_coin_market_data(coin_id, vs_currency, days)
+async def get_historical_price(
+    coin_id: str, vs_currency: str = "usd", days: int = 365,
+    format: str = Query(RECORDS, pattern=FORMAT_PATTERN),
+):
+    df = await coingecko_pool.run(fetch_coin_market_data, coin_id, vs_currency, days)
     if df.empty or "date" not in df.columns:
         return []
-    df["date_str"] = df["date"].dt.strftime("%Y-%m-%d")
-    return [{"date": row["date_str"], "price": row["price"]} for _, row in df.iterrows()]
+    df["date_str"] = format_dates(df["date"])
+    return serialize_frame(df, {"date": "date_str", "price": "price"}, format)
 
 @router.get("/performance-heatmap/{coin_id}")
 async def get_performance_heatmap(coin_id: str, vs_currency: str = "usd", days: int = 365):
-    df = fetch_coin_market_data(coin_id, vs_currency, days)
+    df = await coingecko_pool.run(fetch_coin_market_data, coin_id, vs_currency, days)
     if df.empty or "date" not in df.columns:
         return []
-    df["dayChange"] = df["price"].pct_change().fillna(0)
-    df["month"] = df["date"].dt.month
-    heatmap = df.groupby("month")["dayChange"].mean().reset_index()
-    heatmap["month"] = heatmap["month"].astype(str)
-    return heatmap.to_dict(orient="records")
+    months, day_change = await compute_pool.month_of_year_mean_change(
+        compute_pool.timestamps_ns(df["date"]), df["price"].to_numpy(dtype=float)
+    )
+    return [
+        {"month": str(month), "dayChange": change}
+        for month, change in zip(months.tolist(), day_change.tolist())
+    ]
 
 @router.get("/risk-volatility/{coin_id}")
-async def get_risk_volatility(coin_id: str, vs_currency: str = "usd", days: int = 365):
-    df = fetch_coin_market_data(coin_id, vs_currency, days)
+async def get_risk_volatility(
+    coin_id: str, vs_currency: str = "usd", days: int = 365,
+    format: str = Query(RECORDS, pattern=FORMAT_PATTERN),
+):
+    df = await coingecko_pool.run(fetch_coin_market_data, coin_id, vs_currency, days)
     if df.empty or "date" not in df.columns:
         return {
             "annualized_volatility": 0.0,
@@ -166,10 +284,10 @@ async def get_risk_volatility(coin_id: str, vs_currency: str = "usd", days: int
     annualized_return = (df["returns"].mean() + 1) ** 252 - 1
     risk_free_rate = 0.06
     sharpe_ratio = (annualized_return - risk_free_rate) / annualized_volatility if annualized_volatility > 0 else 0.0
-    returns_list = [
-        {"date": row["date"].strftime("%Y-%m-%d"), "returns": round(row["returns"], 8)}
-        for idx, row in df.iterrows()
-    ]
+    df["date_str"] = format_dates(df["date"])
+    returns_list = serialize_frame(
+        df, {"date": "date_str", "returns": "returns"}, format, decimals={"returns": 8}
+    )
     return {
         "annualized_volatility": float(annualized_volatility),
         "annualized_return": float(annualized_return),
@@ -178,8 +296,14 @@ async def get_risk_volatility(coin_id: str, vs_currency: str = "usd", days: int
     }
 
 @router.get("/monte-carlo-prediction/{coin_id}")
-async def monte_carlo_prediction(coin_id: str, vs_currency: str = "usd", num_simulations: int = 1000, days: int = 252):
-    df = fetch_coin_market_data(coin_id, vs_currency, 365)
+async def monte_carlo_prediction(
+    coin_id: str, vs_currency: str = "usd",
+    num_simulations: int = Query(1000, ge=1, le=MAX_SIMULATIONS),
+    days: int = Query(252, ge=1, le=MAX_HORIZON_DAYS),
+    seed: Optional[int] = Query(None, ge=0),
+    precision: str = Query("float64", pattern=PRECISION_PATTERN),
+):
+    df = await coingecko_pool.run(fetch_coin_market_data, coin_id, vs_currency, 365)
     if not len(df) or len(df) < 50:
         return {"message": "No price data"}
     df["returns"] = df["price"].pct_change()
@@ -187,39 +311,39 @@ async def monte_carlo_prediction(coin_id: str, vs_currency: str = "usd", num_sim
     mu = df["returns"].mean()
     sigma = df["returns"].std()
     last_price = float(df["price"].iloc[-1])
-    simulations = np.zeros((num_simulations, days))
-    simulations[:, 0] = last_price
-    for t in range(1, days):
-        random_returns = np.random.normal(mu, sigma, num_simulations)
-        simulations[:, t] = simulations[:, t - 1] * (1 + random_returns)
-    expected_price = float(np.mean(simulations[:, -1]))
-    prob_positive = float(np.mean(simulations[:, -1] > last_price))
-    percentile_5 = float(np.percentile(simulations[:, -1], 5))
-    percentile_95 = float(np.percentile(simulations[:, -1], 95))
+    result = await compute_pool.simulate_prices(
+        last_price, mu, sigma, days, num_simulations,
+        seed=seed, dtype=PRECISIONS[precision],
+    )
+    summary = result.summary()
     return {
-        "expected_price": expected_price,
-        "probability_positive_return": prob_positive * 100,
-        "lower_bound_5th_percentile": percentile_5,
-        "upper_bound_95th_percentile": percentile_95,
+        "expected_price": summary["expected"],
+        "probability_positive_return": summary["probability_positive"] * 100,
+        "lower_bound_5th_percentile": summary["percentile_5"],
+        "upper_bound_95th_percentile": summary["percentile_95"],
         "last_price": last_price,
     }
 
 @router.get("/famous")
 async def get_famous_coins(vs_currency: str = "usd"):
-    famous_ids = [
-        "bitcoin", "ethereum", "solana", "binancecoin", "tether", "ripple",
-        "cardano", "dogecoin", "tron", "avalanche-2"
-        # add/remove IDs as needed
-    ]
-    url = (
-        f"{COINGECKO_BASE}/coins/markets"
-        f"?vs_currency={vs_currency}&ids={','.join(famous_ids)}"
-        f"&order=market_cap_desc&per_page=10&page=1&sparkline=false"
-    )
-    r = requests.get(url)
-    if not r.ok:
-        return []
-    coins = r.json()
+    """Market data for the home page's fixed set of coins.
+
+    USD prices come from the coin directory's markets snapshot, refreshed
+    every COINGECKO_MARKETS_REFRESH seconds; other currencies are fetched
+    on demand.
+    """
+    if vs_currency == "usd" and coin_directory.loaded:
+        coins = coin_directory.lookup(FAMOUS_COIN_IDS)
+    else:
+        try:
+            if vs_currency == "usd":
+                coins = await coingecko_pool.run(coin_directory.lookup, FAMOUS_COIN_IDS)
+            else:
+                coins = await coingecko_pool.run(fetch_famous_coins, vs_currency)
+        except RateLimited:
+            raise
+        except Exception:
+            return []
     return [{
         "id": c["id"],
         "symbol": c["symbol"],
@@ -232,17 +356,33 @@ async def get_famous_coins(vs_currency: str = "usd"):
 
 
 @router.get("/compare-prices")
-async def compare_prices(coin_ids: str, vs_currency: str = "usd", days: int = 365):
-    ids = [c.strip() for c in coin_ids.split(",")]
-    comparison_data = {}
-    for coin_id in ids:
-        df = fetch_coin_market_data(coin_id, vs_currency, days)
-        if df.empty or "date" not in df.columns:
-            continue
-        df["date_str"] = df["date"].dt.strftime("%Y-%m-%d")
-        comparison_data[coin_id] = df.set_index("date_str")["price"]
-    if comparison_data:
-        combined = pd.concat(comparison_data.values(), axis=1, keys=comparison_data.keys()).reset_index()
-        combined.columns = ["date"] + [f"{cid}_price" for cid in comparison_data.keys()]
-        return combined.fillna("").astype(str).to_dict(orient="records")
-    return []
\ No newline at end of file
+async def compare_prices(
+    coin_ids: str, vs_currency: str = "usd", days: int = 365,
+    normalize: bool = Query(False, description="Rebase every price series to 100 on the first date they all have"),
+    format: str = Query(COLUMNAR, pattern=FORMAT_PATTERN),
+):
+    """Daily prices (last of each UTC day) of several coins on one date axis.
+
+    Coins are fetched concurrently. Columns are `date` and `<id>_price`;
+    dates a coin has no price for are null.
+    """
+    ids = []
+    for coin_id in coin_ids.split(","):
+        coin_id = coin_id.strip()
+        if coin_id and coin_id not in ids:
+            ids.append(coin_id)
+    if len(ids) > MAX_COMPARE_COINS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_COMPARE_COINS} coins per request")
+    results = await coingecko_pool.map(fetch_coin_market_data, ids, vs_currency, days)
+    found = {}
+    for coin_id, df in zip(ids, results):
+        if isinstance(df, pd.DataFrame) and not df.empty and "date" in df.columns:
+            series = _daily_prices(df)
+            if len(series[0]):
+                found[coin_id] = series
+    dates, matrix = kernels.outer_align(
+        [d for d, _ in found.values()], [v for _, v in found.values()]
+    )
+    if normalize and len(dates):
+        matrix = kernels.rebase(matrix)
+    return serialize_aligned(dates, matrix, [f"{cid}_price" for cid in found], format)
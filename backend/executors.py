@@ -0,0 +1,152 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Hashable, Optional
+
+
+class BoundedExecutor:
+    """Dedicated thread pool for one upstream's blocking I/O.
+
+    Each upstream (yfinance, CoinGecko, mfapi.in) gets its own pool so a
+    stall in one cannot exhaust the threads serving the others. Worker count
+    comes from `<NAME>_MAX_WORKERS`; calls beyond that wait in the queue and
+    are reported by `stats()`.
+    """
+
+    def __init__(self, name: str, default_workers: int):
+        self.name = name
+        self.max_workers = int(os.getenv(f"{name.upper()}_MAX_WORKERS", str(default_workers)))
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._submitted = 0
+        self._active = 0
+        self._completed = 0
+        self._cancelled = 0
+        self._failed = 0
+        self._peak_queue = 0
+        self._pending: Dict[Hashable, Future] = {}
+
+    def _call(self, fn, args, kwargs):
+        with self._lock:
+            self._active += 1
+        try:
+            return fn(*args, **kwargs)
+        except BaseException:
+            with self._lock:
+                self._failed += 1
+            raise
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._completed += 1
+
+    def _queued(self) -> int:
+        return self._submitted - self._completed - self._cancelled - self._active
+
+    def _count_cancel(self, future: Future) -> None:
+        # A job cancelled before it started never reaches _call.
+        if future.cancelled():
+            with self._lock:
+                self._cancelled += 1
+
+    async def run(self, fn, *args, **kwargs):
+        """Run `fn(*args, **kwargs)` on this pool without blocking the event loop.
+
+        Cancelling the awaiting task (e.g. on client disconnect) cancels
+        the job if it hasn't started yet.
+        """
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    async def map(self, fn, items, *args, limit: Optional[int] = None) -> list:
+        """Run `fn(item, *args)` for every item concurrently, `limit` at a time.
+
+        Results come back in item order; a call that raised yields its
+        exception instead. The limit (default: the pool size) keeps one
+        request from queueing ahead of everyone else's calls.
+        """
+        semaphore = asyncio.Semaphore(limit or self.max_workers)
+
+        async def one(item):
+            async with semaphore:
+                return await self.run(fn, item, *args)
+
+        return await asyncio.gather(*(one(item) for item in items), return_exceptions=True)
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        """Queue `fn(*args, **kwargs)` in the background and return its future."""
+        with self._lock:
+            self._submitted += 1
+            self._peak_queue = max(self._peak_queue, self._queued())
+        try:
+            future = self._pool.submit(self._call, fn, args, kwargs)
+        except BaseException:
+            with self._lock:
+                self._cancelled += 1
+            raise
+        future.add_done_callback(self._count_cancel)
+        return future
+
+    def submit_once(self, key: Hashable, fn, *args, **kwargs) -> Future:
+        """Like `submit`, but reuse the pending future if `key` is already queued.
+
+        Used for background refreshes, so a hot key never has more than one
+        refresh in flight.
+        """
+        with self._lock:
+            future = self._pending.get(key)
+            if future is not None:
+                return future
+            future = self._pending[key] = Future()
+        inner = self.submit(fn, *args, **kwargs)
+
+        def done(f: Future):
+            with self._lock:
+                self._pending.pop(key, None)
+            if f.cancelled():
+                future.cancel()
+            elif f.exception() is not None:
+                future.set_exception(f.exception())
+            else:
+                future.set_result(f.result())
+
+        inner.add_done_callback(done)
+        return future
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "active": self._active,
+                "queued": self._queued(),
+                "peak_queued": self._peak_queue,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "cancelled": self._cancelled,
+                "failed": self._failed,
+            }
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+yfinance_pool = BoundedExecutor("yfinance", 8)
+coingecko_pool = BoundedExecutor("coingecko", 4)
+mfapi_pool = BoundedExecutor("mfapi", 8)
+# Long-running background jobs that mostly wait on other pools; kept off the
+# upstream pools so they never hold a thread user requests need.
+background_pool = BoundedExecutor("background", 2)
+# BACKGROUND-priority CoinGecko refreshes. They can wait minutes for rate
+# budget, so they wait here rather than on a coingecko_pool thread.
+coingecko_background_pool = BoundedExecutor("coingecko_background", 1)
+
+POOLS = (yfinance_pool, coingecko_pool, mfapi_pool, background_pool, coingecko_background_pool)
+
+
+def executor_stats() -> dict:
+    return {pool.name: pool.stats() for pool in POOLS}
+
+
+def shutdown_executors() -> None:
+    for pool in POOLS:
+        pool.shutdown()
@@ -0,0 +1,294 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+# yfinance period strings that can be answered by slicing a longer frame.
+# "max" is handled separately since it has no fixed start.
+PERIOD_OFFSETS = {
+    "1d": pd.DateOffset(days=1),
+    "5d": pd.DateOffset(days=5),
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+    "5y": pd.DateOffset(years=5),
+    "10y": pd.DateOffset(years=10),
+}
+
+# yfinance counts these periods in trading sessions, not calendar days, so
+# their cached windows are cut at session boundaries. The calendar offsets
+# above only decide whether a cached frame can reach back far enough.
+SESSION_PERIODS = {"1d": 1, "5d": 5}
+
+INTRADAY_INTERVALS = {"1m", "2m", "5m", "15m", "30m", "60m", "90m", "1h"}
+
+HISTORY_CACHE_TTL = float(os.getenv("HISTORY_CACHE_TTL", "300"))
+HISTORY_CACHE_INTRADAY_TTL = float(os.getenv("HISTORY_CACHE_INTRADAY_TTL", "60"))
+HISTORY_CACHE_MAX_BYTES = int(os.getenv("HISTORY_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+HISTORY_CACHE_MAX_ENTRIES = int(os.getenv("HISTORY_CACHE_MAX_ENTRIES", "2048"))
+# Daily frames are always fetched for at least this period so the common
+# 1y/2y dashboard requests share a single download.
+HISTORY_CACHE_MIN_PERIOD = os.getenv("HISTORY_CACHE_MIN_PERIOD", "2y")
+
+
+def period_start(period: str, now: pd.Timestamp) -> Optional[pd.Timestamp]:
+    """Return the first timestamp covered by `period` as of `now`.
+
+    None means unbounded ("max"). Unknown periods raise KeyError.
+    """
+    if period == "max":
+        return None
+    if period == "ytd":
+        return now.normalize().replace(month=1, day=1)
+    return now - PERIOD_OFFSETS[period]
+
+
+def window_start(frame: pd.DataFrame, period: str, now: pd.Timestamp) -> Optional[pd.Timestamp]:
+    """Where `period`'s window starts within a cached `frame`.
+
+    Session periods start at the first bar of the Nth-last trading date the
+    frame holds (dates in the frame's own timezone); others at
+    `period_start`.
+    """
+    sessions = SESSION_PERIODS.get(period)
+    if sessions is None or frame.empty:
+        return period_start(period, now)
+    dates = frame.index.normalize().unique()
+    return dates[-min(sessions, len(dates))]
+
+
+def is_sliceable(period: str) -> bool:
+    return period in PERIOD_OFFSETS or period in ("ytd", "max")
+
+
+def wider_period(a: str, b: str) -> str:
+    """Return whichever of two sliceable periods reaches further back."""
+    now = pd.Timestamp.now()
+    start_a, start_b = period_start(a, now), period_start(b, now)
+    if start_a is None:
+        return a
+    if start_b is None:
+        return b
+    return a if start_a <= start_b else b
+
+
+class _Entry:
+    __slots__ = ("frame", "start", "fetched_at", "expires_at", "nbytes", "version")
+
+    def __init__(self, frame, start, fetched_at, expires_at, version):
+        self.frame = frame
+        self.start = start
+        self.fetched_at = fetched_at
+        self.expires_at = expires_at
+        self.nbytes = int(frame.memory_usage(index=True).sum())
+        self.version = version
+
+
+class FrameCache:
+    """In-process TTL cache of time-indexed DataFrames.
+
+    Entries are evicted least-recently-used first once either the entry
+    count or the total frame size goes over budget. Each entry remembers the
+    start of the window it was fetched for, so a request for a shorter
+    window can be answered by slicing the cached frame.
+    """
+
+    def __init__(self, max_bytes: int, max_entries: int):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._version = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key: Hashable, start: Optional[pd.Timestamp]) -> Optional[Tuple[pd.DataFrame, int]]:
+        """Return the whole cached frame for `key` and its version, if it covers `start`."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at < time.monotonic():
+                self.misses += 1
+                return None
+            if not _covers(entry.start, start):
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.frame, entry.version
+
+    def get(self, key: Hashable, start: Optional[pd.Timestamp]) -> Optional[pd.DataFrame]:
+        """Return the cached frame for `key` sliced from `start`, if covered."""
+        found = self.lookup(key, start)
+        if found is None:
+            return None
+        return slice_from(found[0], start)
+
+    def version(self, key: Hashable) -> Optional[int]:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.version if entry is not None else None
+
+    def put(self, key: Hashable, frame: pd.DataFrame, start: Optional[pd.Timestamp], ttl: float) -> int:
+        """Cache `frame` and return the version number assigned to it."""
+        now = time.monotonic()
+        with self._lock:
+            self._version += 1
+            entry = _Entry(frame, start, now, now + ttl, self._version)
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.nbytes
+            if entry.nbytes > self.max_bytes:
+                return entry.version
+            self._entries[key] = entry
+            self._bytes += entry.nbytes
+            while self._entries and (
+                self._bytes > self.max_bytes or len(self._entries) > self.max_entries
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+            return entry.version
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.nbytes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+def _covers(cached_start, requested_start) -> bool:
+    if cached_start is None:
+        return True
+    if requested_start is None:
+        return False
+    return cached_start <= requested_start
+
+
+def _align_tz(ts: pd.Timestamp, index: pd.DatetimeIndex) -> pd.Timestamp:
+    tz = getattr(index, "tz", None)
+    if tz is None:
+        return ts.tz_localize(None) if ts.tzinfo else ts
+    return ts.tz_localize(tz) if ts.tzinfo is None else ts.tz_convert(tz)
+
+
+def slice_from(frame: pd.DataFrame, start: Optional[pd.Timestamp]) -> pd.DataFrame:
+    """Rows of a time-indexed frame at or after `start` (all rows if None)."""
+    if start is None or frame.empty:
+        return frame
+    return frame.loc[frame.index >= _align_tz(start, frame.index)]
+
+
+history_cache = FrameCache(HISTORY_CACHE_MAX_BYTES, HISTORY_CACHE_MAX_ENTRIES)
+
+
+def cached_history_entry(
+    symbol: str,
+    period: str,
+    interval: str,
+    fetch: Callable[[str, str, str], pd.DataFrame],
+) -> Tuple[pd.DataFrame, Optional[pd.Timestamp], Optional[int]]:
+    """Like `cached_history`, but return the unsliced cached frame.
+
+    Returns `(frame, start, version)`: `slice_from(frame, start)` is the
+    requested window and `version` identifies this copy of the data in the
+    cache, so work derived from the whole frame can be memoized on it. The
+    version is None when the frame could not be cached.
+    """
+    if not is_sliceable(period):
+        return fetch(symbol, period, interval), None, None
+
+    key = (symbol.upper(), interval)
+    now = pd.Timestamp.now()
+    start = period_start(period, now)
+    found = history_cache.lookup(key, start)
+    if found is not None:
+        return found[0], window_start(found[0], period, now), found[1]
+
+    fetch_period = period
+    intraday = interval in INTRADAY_INTERVALS
+    if not intraday and is_sliceable(HISTORY_CACHE_MIN_PERIOD):
+        fetch_period = wider_period(period, HISTORY_CACHE_MIN_PERIOD)
+    full = fetch(symbol, fetch_period, interval)
+    if full.empty:
+        return full, start, None
+    ttl = HISTORY_CACHE_INTRADAY_TTL if intraday else HISTORY_CACHE_TTL
+    version = history_cache.put(key, full, period_start(fetch_period, now), ttl)
+    # A frame fetched for exactly `period` is upstream's own window.
+    return full, window_start(full, period, now) if fetch_period != period else None, version
+
+
+def cached_history(
+    symbol: str,
+    period: str,
+    interval: str,
+    fetch: Callable[[str, str, str], pd.DataFrame],
+) -> pd.DataFrame:
+    """Return raw OHLCV history for `symbol`, served from the shared cache.
+
+    `fetch(symbol, period, interval)` is only called on a miss, and may be
+    asked for a wider period than requested so later requests can slice.
+    Unrecognised periods bypass the cache entirely.
+    """
+    frame, start, _ = cached_history_entry(symbol, period, interval, fetch)
+    return slice_from(frame, start)
+
+
+def cached_histories(
+    symbols: List[str],
+    period: str,
+    interval: str,
+    fetch_many: Callable[[Sequence[str], str, str], Dict[str, pd.DataFrame]],
+) -> Dict[str, pd.DataFrame]:
+    """Batch variant of `cached_history`.
+
+    Symbols already in the cache are sliced locally; the rest are fetched in
+    a single `fetch_many(symbols_tuple, period, interval)` call and cached
+    individually, so later single-symbol requests hit as well.
+    """
+    if not is_sliceable(period):
+        return fetch_many(tuple(symbols), period, interval)
+
+    now = pd.Timestamp.now()
+    start = period_start(period, now)
+    frames: Dict[str, pd.DataFrame] = {}
+    missing = []
+    for symbol in symbols:
+        found = history_cache.lookup((symbol.upper(), interval), start)
+        if found is None:
+            missing.append(symbol)
+        else:
+            frames[symbol] = slice_from(found[0], window_start(found[0], period, now))
+    if not missing:
+        return frames
+
+    fetch_period = period
+    intraday = interval in INTRADAY_INTERVALS
+    if not intraday and is_sliceable(HISTORY_CACHE_MIN_PERIOD):
+        fetch_period = wider_period(period, HISTORY_CACHE_MIN_PERIOD)
+    ttl = HISTORY_CACHE_INTRADAY_TTL if intraday else HISTORY_CACHE_TTL
+    for symbol, full in fetch_many(tuple(missing), fetch_period, interval).items():
+        if full.empty:
+            continue
+        history_cache.put((symbol.upper(), interval), full, period_start(fetch_period, now), ttl)
+        frames[symbol] = slice_from(full, window_start(full, period, now)) if fetch_period != period else full
+    return frames
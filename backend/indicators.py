@@ -0,0 +1,164 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Optional, Sequence
+
+import pandas as pd
+
+INDICATOR_CACHE_MAX_ENTRIES = int(os.getenv("INDICATOR_CACHE_MAX_ENTRIES", "1024"))
+
+# An indicator maps an OHLCV frame to one or more new columns on the same index.
+Indicator = Callable[[pd.DataFrame], Dict[str, pd.Series]]
+
+INDICATORS: Dict[str, Indicator] = {}
+# Output columns of each indicator, in response order.
+INDICATOR_COLUMNS: Dict[str, List[str]] = {}
+
+
+def indicator(name: str, columns: Sequence[str] = ()):
+    """Register a vectorized indicator under `name`.
+
+    `columns` lists the columns it adds; by default a single column named
+    after the indicator.
+    """
+    def register(fn: Indicator) -> Indicator:
+        INDICATORS[name] = fn
+        INDICATOR_COLUMNS[name] = list(columns) or [name]
+        return fn
+    return register
+
+
+@indicator("returns")
+def _returns(df):
+    return {"returns": df["Close"].pct_change()}
+
+
+@indicator("ma20")
+def _ma20(df):
+    return {"ma20": df["Close"].rolling(window=20).mean()}
+
+
+@indicator("ma50")
+def _ma50(df):
+    return {"ma50": df["Close"].rolling(window=50).mean()}
+
+
+@indicator("ema20")
+def _ema20(df):
+    return {"ema20": df["Close"].ewm(span=20, adjust=False).mean()}
+
+
+@indicator("ema50")
+def _ema50(df):
+    return {"ema50": df["Close"].ewm(span=50, adjust=False).mean()}
+
+
+@indicator("rsi14")
+def _rsi14(df, window=14):
+    # Wilder's smoothing is an EMA with alpha = 1 / window.
+    change = df["Close"].diff()
+    gain = change.clip(lower=0).ewm(alpha=1 / window, adjust=False, min_periods=window).mean()
+    loss = (-change.clip(upper=0)).ewm(alpha=1 / window, adjust=False, min_periods=window).mean()
+    return {"rsi14": 100 - 100 / (1 + gain / loss)}
+
+
+@indicator("macd", columns=("macd", "macd_signal", "macd_hist"))
+def _macd(df):
+    close = df["Close"]
+    macd = close.ewm(span=12, adjust=False).mean() - close.ewm(span=26, adjust=False).mean()
+    signal = macd.ewm(span=9, adjust=False).mean()
+    return {"macd": macd, "macd_signal": signal, "macd_hist": macd - signal}
+
+
+@indicator("bollinger", columns=("bb_middle", "bb_upper", "bb_lower"))
+def _bollinger(df, window=20, width=2):
+    rolling = df["Close"].rolling(window=window)
+    middle = rolling.mean()
+    std = rolling.std()
+    return {"bb_middle": middle, "bb_upper": middle + width * std, "bb_lower": middle - width * std}
+
+
+def parse_indicators(value: Optional[str]) -> List[str]:
+    """Split a comma separated `indicators=` value, rejecting unknown names."""
+    names = [n.strip().lower() for n in (value or "").split(",") if n.strip()]
+    unknown = [n for n in names if n not in INDICATORS]
+    if unknown:
+        raise ValueError(
+            f"Unknown indicators: {', '.join(unknown)}. Available: {', '.join(INDICATORS)}"
+        )
+    return list(dict.fromkeys(names))
+
+
+def columns_for(names: Sequence[str]) -> List[str]:
+    return [column for name in names for column in INDICATOR_COLUMNS[name]]
+
+
+class IndicatorCache:
+    """LRU of computed indicator columns, keyed by data version and indicator.
+
+    Keys include the history cache version of the frame they were computed
+    from, so a refreshed frame never reuses stale columns and old entries
+    simply age out.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Dict[str, pd.Series]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Dict[str, pd.Series]]:
+        with self._lock:
+            columns = self._entries.get(key)
+            if columns is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return columns
+
+    def put(self, key: Hashable, columns: Dict[str, pd.Series]) -> None:
+        with self._lock:
+            self._entries[key] = columns
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+indicator_cache = IndicatorCache(INDICATOR_CACHE_MAX_ENTRIES)
+
+
+def add_indicators(
+    df: pd.DataFrame,
+    names: Sequence[str],
+    cache_key: Optional[Hashable] = None,
+) -> pd.DataFrame:
+    """Return a copy of `df` with the columns of each named indicator added.
+
+    With a `cache_key` (e.g. symbol, interval and history cache version)
+    each indicator is computed once per key and reused afterwards. Compute
+    on the whole cached frame and slice afterwards, so rolling windows at
+    the start of the requested range are already warmed up.
+    """
+    columns: Dict[str, pd.Series] = {}
+    for name in names:
+        key = (cache_key, name) if cache_key is not None else None
+        computed = indicator_cache.get(key) if key is not None else None
+        if computed is None:
+            computed = INDICATORS[name](df)
+            if key is not None:
+                indicator_cache.put(key, computed)
+        columns.update(computed)
+    if not columns:
+        return df
+    return df.assign(**columns)
@@ -0,0 +1,130 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, time as clock
+from typing import Callable, Dict, Optional
+from zoneinfo import ZoneInfo
+
+from executors import BoundedExecutor
+
+# Profile fields (sector, industry, website, summary) barely change.
+INFO_PROFILE_TTL = float(os.getenv("INFO_PROFILE_TTL", "86400"))
+# Price fields go stale after INFO_QUOTE_TTL seconds while the market is
+# open, INFO_QUOTE_CLOSED_TTL while it is closed.
+INFO_QUOTE_TTL = float(os.getenv("INFO_QUOTE_TTL", "15"))
+INFO_QUOTE_CLOSED_TTL = float(os.getenv("INFO_QUOTE_CLOSED_TTL", "900"))
+# A stale quote younger than this is served immediately while a background
+# refresh runs; older ones are refetched before answering.
+INFO_QUOTE_MAX_STALE = float(os.getenv("INFO_QUOTE_MAX_STALE", "300"))
+INFO_CACHE_MAX_ENTRIES = int(os.getenv("INFO_CACHE_MAX_ENTRIES", "4096"))
+
+MARKET_TZ = ZoneInfo("Asia/Kolkata")
+MARKET_OPEN = clock(9, 15)
+MARKET_CLOSE = clock(15, 30)
+INDIAN_SUFFIXES = (".NS", ".BO")
+
+
+def market_is_open(now: Optional[datetime] = None) -> bool:
+    """Whether NSE/BSE are in their regular session (weekday 09:15-15:30 IST).
+
+    Exchange holidays are not tracked; they are treated as trading days.
+    """
+    now = (now or datetime.now(MARKET_TZ)).astimezone(MARKET_TZ)
+    return now.weekday() < 5 and MARKET_OPEN <= now.time() <= MARKET_CLOSE
+
+
+def quote_ttl(symbol: str) -> float:
+    # Market hours are only known for Indian listings; other symbols always
+    # get the short TTL.
+    if symbol.upper().endswith(INDIAN_SUFFIXES) and not market_is_open():
+        return INFO_QUOTE_CLOSED_TTL
+    return INFO_QUOTE_TTL
+
+
+class _Entry:
+    __slots__ = ("info", "fetched_at")
+
+    def __init__(self, info: dict, fetched_at: float):
+        self.info = info
+        self.fetched_at = fetched_at
+
+
+class InfoCache:
+    """Cache of `Ticker.info` dicts with separate profile and quote freshness.
+
+    Both tiers are served from the same scrape, but are judged against their
+    own TTLs: a profile read only looks at INFO_PROFILE_TTL, so it never
+    waits on a price refresh. Stale entries are returned at once and
+    refreshed in the background on `pool` (stale-while-revalidate); only a
+    missing entry, or a quote older than INFO_QUOTE_MAX_STALE, blocks on
+    upstream.
+    """
+
+    def __init__(self, fetch: Callable[[str], dict], pool: BoundedExecutor, max_entries: int = INFO_CACHE_MAX_ENTRIES):
+        self.fetch = fetch
+        self.pool = pool
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def _get(self, symbol: str) -> Optional[_Entry]:
+        with self._lock:
+            entry = self._entries.get(symbol)
+            if entry is not None:
+                self._entries.move_to_end(symbol)
+            return entry
+
+    def _load(self, symbol: str) -> dict:
+        info = self.fetch(symbol) or {}
+        with self._lock:
+            self._entries[symbol] = _Entry(info, time.time())
+            self._entries.move_to_end(symbol)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return info
+
+    def _revalidate(self, symbol: str) -> None:
+        # A failed refresh leaves the stale entry in place; the next read retries.
+        self.pool.submit_once(("info", symbol), self._load, symbol)
+
+    async def _read(self, symbol: str, ttl: float, max_stale: float) -> dict:
+        symbol = symbol.upper()
+        entry = self._get(symbol)
+        if entry is not None:
+            age = time.time() - entry.fetched_at
+            if age < ttl:
+                self.hits += 1
+                return entry.info
+            if age < max_stale:
+                self.stale_hits += 1
+                self._revalidate(symbol)
+                return entry.info
+        self.misses += 1
+        return await self.pool.run(self._load, symbol)
+
+    async def profile(self, symbol: str) -> dict:
+        """Info for profile/static fields; a stale entry is never waited on."""
+        return await self._read(symbol, INFO_PROFILE_TTL, float("inf"))
+
+    async def quote(self, symbol: str, max_stale: Optional[float] = None) -> dict:
+        """Info for price fields, at most a quote TTL old or revalidating.
+
+        `max_stale=0` never serves a stale quote.
+        """
+        ttl = quote_ttl(symbol)
+        if max_stale is None:
+            max_stale = max(ttl, INFO_QUOTE_MAX_STALE)
+        return await self._read(symbol, ttl, max_stale)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+            }
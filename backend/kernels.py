@@ -0,0 +1,269 @@
+import numpy as np
+
+# Kernels for the CPU-heavy analytics run inside the compute pool. They take
+# plain arrays (timestamps as int64 nanoseconds) so inputs can be handed over
+# through shared memory instead of pickled DataFrames.
+
+
+def _year_month(timestamps_ns: np.ndarray):
+    months = timestamps_ns.astype("datetime64[ns]").astype("datetime64[M]").astype(np.int64)
+    return months // 12 + 1970, months % 12 + 1
+
+
+def monthly_first_last(timestamps_ns: np.ndarray, values: np.ndarray):
+    """First and last value of each calendar month, in input row order.
+
+    Equivalent to `groupby([year, month]).agg(["first", "last"])`: groups
+    come out sorted by (year, month) and "first"/"last" follow the order the
+    rows were given in, not date order.
+    """
+    if not len(values):
+        empty = np.empty(0)
+        return empty.astype(np.int64), empty.astype(np.int64), empty, empty
+    years, months = _year_month(timestamps_ns)
+    keys = years * 12 + (months - 1)
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+    ends = np.r_[starts[1:], len(sorted_keys)] - 1
+    group_keys = sorted_keys[starts]
+    return (
+        group_keys // 12,
+        group_keys % 12 + 1,
+        values[order[starts]],
+        values[order[ends]],
+    )
+
+
+def month_of_year_mean_change(timestamps_ns: np.ndarray, prices: np.ndarray):
+    """Mean period-over-period change for each calendar month (1-12) present.
+
+    The first change is taken as 0, matching `pct_change().fillna(0)`.
+    """
+    if not len(prices):
+        return np.empty(0, dtype=np.int64), np.empty(0)
+    change = np.zeros(len(prices))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change[1:] = prices[1:] / prices[:-1] - 1.0
+    change[~np.isfinite(change)] = 0.0
+    _, months = _year_month(timestamps_ns)
+    sums = np.bincount(months, weights=change, minlength=13)
+    counts = np.bincount(months, minlength=13)
+    present = np.flatnonzero(counts)
+    return present, sums[present] / counts[present]
+
+
+def rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+    """Rolling sample standard deviation (ddof=1), NaN until the window fills.
+
+    Uses cumulative sums of values and squares, so cost is O(n) regardless
+    of window size. NaNs in the input make the windows containing them NaN.
+    """
+    n = len(values)
+    out = np.full(n, np.nan)
+    if window < 2 or n < window:
+        return out
+    x = np.asarray(values, dtype=np.float64)
+    # Centre on the mean to keep the sum-of-squares formula well conditioned.
+    finite = np.isfinite(x)
+    x = np.where(finite, x - np.nanmean(x) if finite.any() else 0.0, 0.0)
+    c1 = np.concatenate(([0.0], np.cumsum(x)))
+    c2 = np.concatenate(([0.0], np.cumsum(x * x)))
+    bad = np.concatenate(([0], np.cumsum(~finite)))
+    s1 = c1[window:] - c1[:-window]
+    s2 = c2[window:] - c2[:-window]
+    var = (s2 - s1 * s1 / window) / (window - 1)
+    np.maximum(var, 0.0, out=var)
+    std = np.sqrt(var)
+    std[(bad[window:] - bad[:-window]) > 0] = np.nan
+    out[window - 1:] = std
+    return out
+
+
+def last_per_day(days: np.ndarray, values: np.ndarray):
+    """Sort by day, drop missing values and keep the last value of each day.
+
+    `days` are int64 days since the epoch; ties keep their input order, so
+    the later of two same-day observations wins.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    keep = np.isfinite(values)
+    days, values = np.asarray(days, dtype=np.int64)[keep], values[keep]
+    order = np.argsort(days, kind="stable")
+    days, values = days[order], values[order]
+    last = np.r_[days[1:] != days[:-1], True] if len(days) else np.empty(0, dtype=bool)
+    return days[last], values[last]
+
+
+def forward_fill_on_grid(grid_days: np.ndarray, days: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Values of one series on `grid_days`, carrying the last observation forward.
+
+    `days` must be sorted and unique. Grid days before the first observation
+    are NaN.
+    """
+    idx = np.searchsorted(days, grid_days, side="right") - 1
+    out = values[np.maximum(idx, 0)].astype(np.float64)
+    out[idx < 0] = np.nan
+    return out
+
+
+def outer_align(series_days, series_values):
+    """Union of the series' days and a T x N matrix of their values on it.
+
+    Each `days` array must be sorted and unique. Days a series has no value
+    for are NaN.
+    """
+    if not series_days:
+        return np.empty(0, dtype=np.int64), np.empty((0, 0))
+    days = np.unique(np.concatenate(series_days))
+    out = np.full((len(days), len(series_days)), np.nan)
+    for j, (d, v) in enumerate(zip(series_days, series_values)):
+        out[np.searchsorted(days, d), j] = v
+    return days, out
+
+
+def rebase(matrix: np.ndarray, base: float = 100.0) -> np.ndarray:
+    """Scale each column to `base` on the first row where every column has a value.
+
+    Without such a row, each column is scaled from its own first value.
+    """
+    finite = np.isfinite(matrix)
+    common = np.flatnonzero(finite.all(axis=1))
+    if len(common):
+        ref = matrix[common[0]]
+    else:
+        ref = matrix[finite.argmax(axis=0), np.arange(matrix.shape[1])]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return matrix / ref * base
+
+
+def return_correlations(prices: np.ndarray, window: int, base: int):
+    """Covariance and correlation of period returns for a T x N price matrix.
+
+    Also returns the rolling `window`-period correlation of every column
+    against column `base` as a (T - window) x N matrix. Everything is one
+    pass over the matrix; zero-variance columns give NaN correlations.
+    """
+    returns = prices[1:] / prices[:-1] - 1.0
+    returns = returns - returns.mean(axis=0)
+    n = len(returns)
+    cov = returns.T @ returns / max(n - 1, 1)
+    std = np.sqrt(np.diag(cov))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = np.clip(cov / np.outer(std, std), -1.0, 1.0)
+
+    if window < 2 or n < window:
+        return cov, corr, np.empty((0, prices.shape[1]))
+    x = returns[:, [base]]
+    zero = np.zeros((1, returns.shape[1]))
+    sx = np.concatenate((zero[:, :1], np.cumsum(x, axis=0)))
+    sxx = np.concatenate((zero[:, :1], np.cumsum(x * x, axis=0)))
+    sy = np.concatenate((zero, np.cumsum(returns, axis=0)))
+    syy = np.concatenate((zero, np.cumsum(returns * returns, axis=0)))
+    sxy = np.concatenate((zero, np.cumsum(x * returns, axis=0)))
+    wx = sx[window:] - sx[:-window]
+    wy = sy[window:] - sy[:-window]
+    cxy = (sxy[window:] - sxy[:-window]) - wx * wy / window
+    vx = (sxx[window:] - sxx[:-window]) - wx * wx / window
+    vy = (syy[window:] - syy[:-window]) - wy * wy / window
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rolling = np.clip(cxy / np.sqrt(np.maximum(vx, 0) * np.maximum(vy, 0)), -1.0, 1.0)
+    return cov, corr, rolling
+
+
+def rolling_cagr(days: np.ndarray, values: np.ndarray, window_days: int):
+    """Annualized growth over every `window_days` span in a daily series.
+
+    `days` must be sorted. Each day is paired with the last observation on
+    or before `window_days` earlier; days without one are skipped. The
+    growth is the difference of log values over the actual span, so each
+    window is O(1) once the log series exists. Returns the end positions
+    and their CAGR.
+    """
+    log_values = np.log(values)
+    start = np.searchsorted(days, days - window_days, side="right") - 1
+    ends = np.flatnonzero(start >= 0)
+    start = start[ends]
+    years = (days[ends] - days[start]) / 365.25
+    return ends, np.expm1((log_values[ends] - log_values[start]) / years)
+
+
+def sip_units(days: np.ndarray, values: np.ndarray, installment_days: np.ndarray, amount: float):
+    """Positions bought at and units bought by each installment.
+
+    An installment buys at the first value on or after its day; ones after
+    the last value are dropped.
+    """
+    at = np.searchsorted(days, installment_days, side="left")
+    at = at[at < len(days)]
+    return at, amount / values[at]
+
+
+def xirr(amounts: np.ndarray, days: np.ndarray, guess: float = 0.1, tol: float = 1e-10) -> float:
+    """Annual internal rate of return of dated cash flows (negative = invested).
+
+    Newton's method on the NPV, falling back to bisection when it doesn't
+    converge. NaN if the flows don't change sign.
+    """
+    if not (amounts.min() < 0 < amounts.max()):
+        return float("nan")
+    t = (days - days[0]) / 365.0
+
+    def npv(rate):
+        return float((amounts * (1.0 + rate) ** -t).sum())
+
+    rate = guess
+    for _ in range(50):
+        disc = (1.0 + rate) ** -t
+        value = (amounts * disc).sum()
+        slope = (-t * amounts * disc).sum() / (1.0 + rate)
+        if slope == 0 or not np.isfinite(value):
+            break
+        step = value / slope
+        rate -= step
+        if rate <= -1.0 or not np.isfinite(rate):
+            break
+        if abs(step) < tol:
+            return float(rate)
+
+    lo, hi = -0.9999, 1.0
+    while npv(hi) > 0 and hi < 1e6:
+        hi *= 2
+    if npv(lo) * npv(hi) > 0:
+        return float("nan")
+    for _ in range(200):
+        mid = (lo + hi) / 2
+        if npv(lo) * npv(mid) <= 0:
+            hi = mid
+        else:
+            lo = mid
+        if hi - lo < tol:
+            break
+    return (lo + hi) / 2
+
+
+def nav_metrics(days: np.ndarray, values: np.ndarray, risk_free: float, cagr_years=(1, 3, 5)) -> np.ndarray:
+    """Screener metrics of one daily series, as one float64 row.
+
+    Volatility, return and Sharpe are annualized from daily returns over
+    the whole history (252 periods a year); max drawdown is the deepest
+    fall from a running peak, as a negative fraction. Then the
+    point-to-point CAGR over each of `cagr_years`, NaN when the history is
+    shorter. Fewer than three values give all NaN.
+    """
+    out = np.full(4 + len(cagr_years), np.nan)
+    if len(values) < 3:
+        return out
+    returns = values[1:] / values[:-1] - 1.0
+    volatility = returns.std(ddof=1) * np.sqrt(252)
+    annual_return = (returns.mean() + 1.0) ** 252 - 1.0
+    out[0] = volatility
+    out[1] = annual_return
+    out[2] = (annual_return - risk_free) / volatility if volatility > 0 else 0.0
+    out[3] = (values / np.maximum.accumulate(values) - 1.0).min()
+    for i, years in enumerate(cagr_years):
+        start = np.searchsorted(days, days[-1] - round(365.25 * years), side="right") - 1
+        if start >= 0:
+            span = (days[-1] - days[start]) / 365.25
+            out[4 + i] = (values[-1] / values[start]) ** (1.0 / span) - 1.0
+    return out
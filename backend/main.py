@@ -1,12 +1,21 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from dotenv import load_dotenv
 import os
 
-from mf_api import router as mf_router
+from mf_api import nav_sync, router as mf_router, screener
 from stock_api import router as stock_router
 from portfolio_mongodb import router as portfolio_router, init_db
-from crypto_api import router as crypto_router
+from crypto_api import coin_directory, router as crypto_router
+from analytics_api import router as analytics_router
+from streaming import hub as stream_hub, router as stream_router
+from coingecko import RateLimited, client as coingecko_client
+from background import background_stats, start_background_tasks, stop_background_tasks
+from compute_pool import shutdown_pool
+from executors import executor_stats, shutdown_executors
+from search_index import get_index
+from snapshot import snapshot_stats
 
 # Load environment variables (so MONGODB_URI is available)
 load_dotenv()
@@ -24,13 +33,75 @@ app.include_router(mf_router)
 app.include_router(stock_router)
 app.include_router(portfolio_router)
 app.include_router(crypto_router)   
+app.include_router(analytics_router)
+app.include_router(stream_router)
+
+
+@app.exception_handler(RateLimited)
+async def rate_limited_handler(request: Request, exc: RateLimited):
+    # Surface CoinGecko throttling instead of answering with empty data.
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(int(exc.retry_after + 0.5))},
+    )
+
+
 @app.get("/")
 def root():
     return {"message": "Stock, Mutual Fund and Crypto unified API is running!"}
 
 
+@app.get("/api/metrics/executors")
+def get_executor_metrics():
+    """Worker, in-flight and queue-depth counters for each upstream pool."""
+    return executor_stats()
+
+
+@app.get("/api/metrics/coingecko")
+def get_coingecko_metrics():
+    """Request budget, queue by priority and 429 counts for CoinGecko."""
+    return coingecko_client.stats()
+
+
+@app.get("/api/metrics/coin-directory")
+def get_coin_directory_metrics():
+    """Size and age of the CoinGecko markets snapshot and coin list index."""
+    return coin_directory.stats()
+
+
+@app.get("/api/metrics/snapshots")
+def get_snapshot_metrics():
+    """Age and failed refreshes of the background-refreshed response snapshots."""
+    return snapshot_stats()
+
+
+@app.get("/api/metrics/background")
+def get_background_metrics():
+    """Run counts and last errors of the periodic background tasks."""
+    return background_stats()
+
+
+@app.get("/api/metrics/nav-sync")
+def get_nav_sync_metrics():
+    """Progress and throughput of the bulk AMFI NAV sync."""
+    return nav_sync.stats()
+
+
+@app.get("/api/metrics/screener")
+def get_screener_metrics():
+    """Size and last rebuild of the MF screener metrics table."""
+    return screener.stats()
+
+
+@app.get("/api/metrics/streams")
+def get_stream_metrics():
+    """Live topics, subscriptions and upstream polls of the quote stream hub."""
+    return stream_hub.stats()
+
+
 @app.on_event("startup")
-def startup_event():
+async def startup_event():
     # Attempt to initialize MongoDB connection if MONGODB_URI is set.
     uri = os.getenv("MONGODB_URI")
     if uri:
@@ -39,3 +110,14 @@ def startup_event():
         # Don't force a connection to localhost if not explicitly configured.
         # This allows the app to start even when MongoDB is not running.
         init_db(None)
+    # Build the symbol search index now rather than on the first keystroke.
+    get_index()
+    start_background_tasks()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await stop_background_tasks()
+    await stream_hub.close()
+    shutdown_executors()
+    shutdown_pool()
@@ -1,137 +1,455 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 import requests
 import pandas as pd
 import numpy as np
+from typing import Optional
+from collections import OrderedDict
+import os
+import threading
+import time
+
+import compute_pool
+import kernels
+from background import schedule
+from executors import background_pool, mfapi_pool
+from nav_sync import AMFI_NAV_SYNC, AMFI_NAV_SYNC_INTERVAL, NavSync
+from montecarlo import MAX_HORIZON_DAYS, MAX_SIMULATIONS, PRECISION_PATTERN, PRECISIONS
+from price_store import PRICE_STORE_MF_REFRESH, frame_to_records, is_next_session, price_store
+from scheme_catalogue import SchemeCatalogue
+from screener import METRICS, Screener
+from serialization import COLUMNAR, FORMAT_PATTERN, RECORDS, serialize_aligned, serialize_frame
+from singleflight import coalesce, mfapi_flight
 
 router = APIRouter(prefix="/api/mutual", tags=["Mutual Funds"])
 
 MFAPI_BASE_URL = "https://api.mfapi.in"
+REQUEST_TIMEOUT = 15
+MF_CATALOGUE_REFRESH = float(os.getenv("MF_CATALOGUE_REFRESH", "86400"))
+DEFAULT_SCHEME_PAGE = 50
+MAX_SCHEME_PAGE = 500
+MAX_COMPARE_SCHEMES = 20
+MAX_ROLLING_YEARS = 30
+RISK_FREE_RATE = 0.06
+MF_SCREENER_REFRESH = float(os.getenv("MF_SCREENER_REFRESH", "10800"))
+MF_SCHEME_CACHE_MAX_ENTRIES = int(os.getenv("MF_SCHEME_CACHE_MAX_ENTRIES", "512"))
 
-def fetch_all_schemes():
+def fetch_scheme_list():
     url = f"{MFAPI_BASE_URL}/mf"
-    r = requests.get(url)
-    if r.ok:
-        return {item["schemeCode"]: item["schemeName"] for item in r.json()}
-    return {}
-
-def fetch_scheme_details(scheme_code):
-    url = f"{MFAPI_BASE_URL}/mf/{scheme_code}"
-    r = requests.get(url)
-    if r.ok:
-        meta = r.json().get("meta", {})
-        return meta
-    return {}
-
-def fetch_historical_nav(scheme_code):
-    url = f"{MFAPI_BASE_URL}/mf/{scheme_code}"
-    r = requests.get(url)
-    if r.ok:
-        return r.json().get("data", [])
-    return []
+    r = requests.get(url, timeout=REQUEST_TIMEOUT)
+    r.raise_for_status()
+    return [(item["schemeCode"], item["schemeName"]) for item in r.json()]
+
+scheme_catalogue = SchemeCatalogue(fetch_scheme_list)
+schedule("mf-catalogue", MF_CATALOGUE_REFRESH, scheme_catalogue.refresh, mfapi_pool)
+
+class SchemeNavs:
+    """One scheme's meta and NAV history, parsed once and shared by every endpoint.
+
+    `dates` (datetime64[D]) and `navs` (float64) are in date order, oldest
+    first. Instances are never mutated; a refresh builds a new one.
+    """
+
+    __slots__ = ("meta", "dates", "navs", "checked_at", "synced_through", "_rows")
+
+    def __init__(self, meta: dict, records: np.ndarray, checked_at: float, synced_through: Optional[str] = None):
+        self.meta = meta
+        self.dates = records["ts"].astype("datetime64[ns]").astype("datetime64[D]")
+        self.navs = np.array(records["nav"], dtype=np.float64)
+        self.checked_at = checked_at
+        self.synced_through = synced_through
+        self._rows = None
+
+    def is_fresh(self) -> bool:
+        return _is_current(self.checked_at, self.synced_through)
+
+    def __len__(self) -> int:
+        return len(self.navs)
+
+    def timestamps_ns(self) -> np.ndarray:
+        return self.dates.astype("datetime64[ns]").view(np.int64)
+
+    def returns(self) -> np.ndarray:
+        """Simple day-over-day returns, aligned with `dates[1:]`."""
+        return self.navs[1:] / self.navs[:-1] - 1
+
+    def rows(self) -> list:
+        """mfapi.in-style `[{"date": "dd-mm-yyyy", "nav": "..."}]`, newest first."""
+        if self._rows is None:
+            iso = np.datetime_as_string(self.dates[::-1]).tolist()
+            self._rows = [
+                {"date": f"{d[8:10]}-{d[5:7]}-{d[:4]}", "nav": f"{nav:.5f}"}
+                for d, nav in zip(iso, self.navs[::-1].tolist())
+            ]
+        return self._rows
+
+
+_scheme_cache: "OrderedDict[str, SchemeNavs]" = OrderedDict()
+_scheme_cache_lock = threading.Lock()
+
+
+def _forget(keys) -> None:
+    with _scheme_cache_lock:
+        for key in keys:
+            _scheme_cache.pop(key, None)
+
+
+nav_sync = NavSync(price_store, on_update=_forget)
+if AMFI_NAV_SYNC:
+    schedule("amfi-nav-sync", AMFI_NAV_SYNC_INTERVAL, nav_sync.run, mfapi_pool, delay=30)
+
+
+def _is_current(checked_at: float, synced_through: Optional[str]) -> bool:
+    # Series kept up to date by the bulk AMFI sync never need an upstream check.
+    return time.time() - checked_at < PRICE_STORE_MF_REFRESH or nav_sync.is_current(synced_through)
+
+
+def _remember(key: str, scheme: SchemeNavs) -> SchemeNavs:
+    with _scheme_cache_lock:
+        _scheme_cache[key] = scheme
+        _scheme_cache.move_to_end(key)
+        while len(_scheme_cache) > MF_SCHEME_CACHE_MAX_ENTRIES:
+            _scheme_cache.popitem(last=False)
+    return scheme
+
+
+def _from_store(key: str) -> SchemeNavs:
+    stored = price_store.read("mf", key)
+    meta = stored.meta
+    return _remember(key, SchemeNavs(meta.get("meta", {}), stored.records, meta["checked_at"], meta.get("synced_through")))
+
+
+@coalesce(mfapi_flight)
+def load_scheme(scheme_code) -> Optional[SchemeNavs]:
+    """Meta and NAV history for a scheme, or None if mfapi.in doesn't know it.
+
+    Served from memory, then from the local price store, which the daily
+    AMFI sync (nav_sync) keeps current for every stored scheme. A stale series is
+    topped up from /mf/{code}/latest when that NAV is the next business
+    day's; anything else falls back to one full download, which also
+    carries the meta. If that download fails, the stored series is served.
+    """
+    key = str(scheme_code)
+    with _scheme_cache_lock:
+        cached = _scheme_cache.get(key)
+    if cached is not None and cached.is_fresh():
+        return cached
+
+    with price_store.lock("mf", key):
+        stored = price_store.read("mf", key)
+        if stored is not None and len(stored.records):
+            if _is_current(stored.meta.get("checked_at", 0), stored.meta.get("synced_through")):
+                return _from_store(key)
+            try:
+                r = requests.get(f"{MFAPI_BASE_URL}/mf/{scheme_code}/latest", timeout=REQUEST_TIMEOUT)
+                latest = _nav_records(r.json().get("data", [])) if r.ok else None
+            except (requests.RequestException, ValueError):
+                latest = None
+            # /latest is a single NAV, so it may only extend a series that
+            # can't be missing a business day before it.
+            if latest is not None and len(latest) and is_next_session(stored.last_ts, latest["ts"][0]):
+                price_store.append("mf", key, latest)
+                return _from_store(key)
+
+        has_stored = stored is not None and len(stored.records) > 0
+        try:
+            r = requests.get(f"{MFAPI_BASE_URL}/mf/{scheme_code}", timeout=REQUEST_TIMEOUT)
+            payload = r.json() if r.ok else None
+        except (requests.RequestException, ValueError):
+            if not has_stored:
+                raise
+            payload = None
+        if payload is None:
+            # A stale series beats an error; the next request tries again.
+            return _from_store(key) if has_stored else None
+        meta = payload.get("meta", {})
+        records = _nav_records(payload.get("data", []))
+        if not len(records):
+            return _remember(key, SchemeNavs(meta, records, time.time()))
+        price_store.write("mf", key, records, {"covers_from": None, "meta": meta})
+        return _from_store(key)
+
+screener = Screener(price_store, load_scheme, mfapi_pool, scheme_catalogue.codes, RISK_FREE_RATE)
+schedule("mf-screener", MF_SCREENER_REFRESH, screener.rebuild, background_pool, delay=60)
+
+def _nav_records(navs):
+    df = pd.DataFrame(navs, columns=["date", "nav"])
+    df["nav"] = pd.to_numeric(df["nav"], errors="coerce")
+    df.index = pd.to_datetime(df["date"], format="%d-%m-%Y", errors="coerce")
+    df = df[df.index.notna()].dropna(subset=["nav"])
+    return frame_to_records(df, ["nav"])
+
+def split_codes(scheme_codes: str) -> list:
+    codes = []
+    for code in scheme_codes.split(","):
+        code = code.strip()
+        if code and code not in codes:
+            codes.append(code)
+    if len(codes) > MAX_COMPARE_SCHEMES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_COMPARE_SCHEMES} schemes per request")
+    return codes
+
+async def load_schemes(scheme_codes: str) -> dict:
+    """Comma separated codes -> {code: SchemeNavs}, loaded concurrently.
+
+    Unknown schemes and ones without NAVs are left out.
+    """
+    codes = split_codes(scheme_codes)
+    results = await mfapi_pool.map(load_scheme, codes)
+    return {
+        code: scheme for code, scheme in zip(codes, results)
+        if isinstance(scheme, SchemeNavs) and len(scheme)
+    }
 
 @router.get("/schemes")
-async def get_schemes(search: str = ""):
-    all_schemes = fetch_all_schemes()
-    if search:
-        filtered = {code: name for code, name in all_schemes.items() if search.lower() in name.lower()}
-        return filtered if filtered else {}
-    return all_schemes
+async def get_schemes(
+    search: str = "",
+    limit: int = Query(DEFAULT_SCHEME_PAGE, ge=1, le=MAX_SCHEME_PAGE),
+    offset: int = Query(0, ge=0),
+    sample: Optional[int] = Query(None, ge=1, le=MAX_SCHEME_PAGE, description="Random schemes to return instead of a page"),
+    format: str = Query("map", pattern="^(map|list)$"),
+):
+    """One page of schemes matching `search`, best matches first.
+
+    Without a search, pages run through the list in mfapi.in's order;
+    `sample=n` returns n random schemes instead. The full list is never
+    sent in one response.
+
+    The default "map" format is `{code: name}`. Clients that need the
+    ranking order or the total should use format=list, since JavaScript
+    reorders integer-like object keys.
+    """
+    if sample is not None and not search.strip():
+        lookup, args = scheme_catalogue.sample, (sample,)
+    else:
+        lookup, args = scheme_catalogue.search, (search, offset, limit)
+    if scheme_catalogue.loaded:
+        total, page = lookup(*args)
+    else:
+        try:
+            total, page = await mfapi_pool.run(lookup, *args)
+        except Exception as e:
+            raise HTTPException(status_code=502, detail=f"Scheme list unavailable: {e}")
+    if format == "list":
+        return {
+            "total": total,
+            "offset": offset,
+            "limit": limit,
+            "results": [{"code": code, "name": name} for code, name in page],
+        }
+    return {code: name for code, name in page}
 
 @router.get("/scheme-details/{scheme_code}")
 async def get_scheme_details(scheme_code: str):
-    details = fetch_scheme_details(scheme_code)
-    if not details:
-        # Fallback: Try to get scheme name from full data
-        url = f"{MFAPI_BASE_URL}/mf/{scheme_code}"
-        r = requests.get(url)
-        if r.ok:
-            full_data = r.json()
-            meta = full_data.get("meta", {})
-            if meta:
-                return meta
-            # If meta is empty, return scheme name from the response
-            return {
-                "scheme_name": full_data.get("scheme_name", ""),
-                "fund_house": full_data.get("fund_house", ""),
-                "scheme_type": full_data.get("scheme_type", ""),
-                "scheme_category": full_data.get("scheme_category", "")
-            }
-    return details
+    scheme = await mfapi_pool.run(load_scheme, scheme_code)
+    if scheme is None:
+        return {}
+    if scheme.meta:
+        return scheme.meta
+    return {"scheme_name": "", "fund_house": "", "scheme_type": "", "scheme_category": ""}
 
 @router.get("/historical-nav/{scheme_code}")
 async def get_historical_nav(scheme_code: str):
-    return fetch_historical_nav(scheme_code) or []
+    scheme = await mfapi_pool.run(load_scheme, scheme_code)
+    return scheme.rows() if scheme is not None else []
 
 @router.get("/compare-navs")
-async def compare_navs(scheme_codes: str):
-    codes = scheme_codes.split(",")
-    comparison_data = {}
-    for code in codes:
-        navs = fetch_historical_nav(code.strip())
-        if navs:
-            df = pd.DataFrame(navs)
-            df["date"] = pd.to_datetime(df["date"], dayfirst=True)
-            df["nav"] = pd.to_numeric(df["nav"], errors="coerce")
-            df = df.dropna(subset=["nav"])
-            df = df.set_index("date")
-            comparison_data[code] = df["nav"]
-    if comparison_data:
-        combined = pd.concat(comparison_data.values(), axis=1, keys=comparison_data.keys()).reset_index()
-        combined.columns = ["date"] + [f"{code}_nav" for code in comparison_data.keys()]
-        return combined.fillna("").astype(str).to_dict(orient="records")
-    return []
+async def compare_navs(
+    scheme_codes: str,
+    normalize: bool = Query(False, description="Rebase every NAV series to 100 on the first date they all have"),
+    format: str = Query(COLUMNAR, pattern=FORMAT_PATTERN),
+):
+    """NAV histories of several schemes on one date axis.
+
+    Schemes are loaded concurrently. Columns are `date` and `<code>_nav`;
+    dates a scheme has no NAV for are null.
+    """
+    found = await load_schemes(scheme_codes)
+    days, matrix = kernels.outer_align(
+        [scheme.dates.astype(np.int64) for scheme in found.values()],
+        [scheme.navs for scheme in found.values()],
+    )
+    if normalize and len(days):
+        matrix = kernels.rebase(matrix)
+    return serialize_aligned(days, matrix, [f"{code}_nav" for code in found], format)
+
+def _parse_windows(windows: str) -> list:
+    try:
+        years = sorted({int(w) for w in windows.split(",") if w.strip()})
+    except ValueError:
+        raise HTTPException(status_code=400, detail="windows must be whole years, e.g. 1,3,5")
+    if not years or years[0] < 1 or years[-1] > MAX_ROLLING_YEARS:
+        raise HTTPException(status_code=400, detail=f"windows must be between 1 and {MAX_ROLLING_YEARS} years")
+    return years
+
+@router.get("/rolling-returns")
+async def get_rolling_returns(
+    scheme_codes: str,
+    windows: str = Query("1,3,5", description="Comma separated window lengths in years"),
+    series: bool = Query(False, description="Include the rolling CAGR series, not just its summary"),
+    format: str = Query(COLUMNAR, pattern=FORMAT_PATTERN),
+):
+    """Rolling CAGR (in %) of each scheme for each window.
+
+    A window ending on a date starts at the last NAV on or before the same
+    date `years` earlier; windows that don't fit in the history are left
+    out. The summary covers every window that fits.
+    """
+    years = _parse_windows(windows)
+    found = await load_schemes(scheme_codes)
+    result = {}
+    for code, scheme in found.items():
+        days = scheme.dates.astype(np.int64)
+        per_window = {}
+        for y in years:
+            ends, cagr = kernels.rolling_cagr(days, scheme.navs, round(365.25 * y))
+            cagr = cagr * 100
+            summary = {"count": int(len(cagr))}
+            if len(cagr):
+                summary.update({
+                    "latest": float(cagr[-1]),
+                    "mean": float(cagr.mean()),
+                    "median": float(np.median(cagr)),
+                    "min": float(cagr.min()),
+                    "max": float(cagr.max()),
+                    "positive_pct": float((cagr > 0).mean() * 100),
+                })
+            if series:
+                summary["series"] = serialize_aligned(days[ends], cagr[:, None], ["cagr"], format, decimals=4)
+            per_window[str(y)] = summary
+        result[code] = {"scheme_name": scheme.meta.get("scheme_name", ""), "windows": per_window}
+    return result
+
+@router.get("/sip")
+async def get_sip_returns(
+    scheme_codes: str,
+    amount: float = Query(10000, gt=0, description="Monthly installment"),
+    years: int = Query(3, ge=1, le=MAX_ROLLING_YEARS, description="SIP duration, ending at the latest NAV"),
+    day: int = Query(1, ge=1, le=28, description="Day of the month installments are made"),
+    series: bool = Query(False, description="Include invested amount and value after each installment"),
+    format: str = Query(COLUMNAR, pattern=FORMAT_PATTERN),
+):
+    """Outcome of a monthly SIP in each scheme over the last `years`.
+
+    Each installment buys at the first NAV on or after its date. XIRR
+    treats installments as outflows and the value at the latest NAV as the
+    final inflow.
+    """
+    found = await load_schemes(scheme_codes)
+    result = {}
+    for code, scheme in found.items():
+        days = scheme.dates.astype(np.int64)
+        last = scheme.dates[-1]
+        first_month = (last.astype("datetime64[M]") - 12 * years + 1)
+        installments = np.arange(first_month, last.astype("datetime64[M]") + 1).astype("datetime64[D]") + (day - 1)
+        installments = installments[installments <= last].astype(np.int64)
+        at, units = kernels.sip_units(days, scheme.navs, installments, amount)
+        if not len(at):
+            continue
+        total_units = float(units.sum())
+        invested = amount * len(at)
+        value = total_units * float(scheme.navs[-1])
+        flows = np.append(np.full(len(at), -amount), value)
+        rate = kernels.xirr(flows, np.append(days[at], days[-1]).astype(np.float64))
+        entry = {
+            "scheme_name": scheme.meta.get("scheme_name", ""),
+            "installments": int(len(at)),
+            "first_installment": str(scheme.dates[at[0]]),
+            "valuation_date": str(last),
+            "invested": invested,
+            "units": total_units,
+            "value": value,
+            "absolute_return_pct": (value / invested - 1) * 100,
+            "xirr_pct": rate * 100 if np.isfinite(rate) else None,
+        }
+        if series:
+            cumulative = np.column_stack((
+                amount * np.arange(1, len(at) + 1),
+                np.cumsum(units) * scheme.navs[at],
+            ))
+            entry["series"] = serialize_aligned(days[at], cumulative, ["invested", "value"], format, decimals=2)
+        result[code] = entry
+    return result
+
+@router.get("/screener")
+async def screen_schemes(
+    category: str = Query("", description="Case-insensitive part of the SEBI category, e.g. \"large cap\""),
+    fund_house: str = "",
+    min_volatility: Optional[float] = None,
+    max_volatility: Optional[float] = None,
+    min_sharpe: Optional[float] = None,
+    max_drawdown: Optional[float] = Query(None, ge=0, description="Deepest drawdown allowed, as a positive fraction"),
+    min_cagr_1y: Optional[float] = None,
+    min_cagr_3y: Optional[float] = None,
+    min_cagr_5y: Optional[float] = None,
+    sort: str = Query("sharpe", pattern="^(" + "|".join(METRICS) + ")$"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    limit: int = Query(50, ge=1, le=MAX_SCHEME_PAGE),
+    offset: int = Query(0, ge=0),
+):
+    """Filter and rank every stored scheme by precomputed risk and return metrics.
+
+    Metrics are fractions, computed as in /risk-volatility over each
+    scheme's whole history; max_drawdown is negative. Schemes missing the
+    sort metric come last.
+    """
+    table = screener.table
+    if table is None:
+        raise HTTPException(status_code=503, detail="Screener metrics are still being computed")
+    bounds = {
+        "volatility": (min_volatility, max_volatility),
+        "sharpe": (min_sharpe, None),
+        "max_drawdown": (-max_drawdown if max_drawdown is not None else None, None),
+        "cagr_1y": (min_cagr_1y, None),
+        "cagr_3y": (min_cagr_3y, None),
+        "cagr_5y": (min_cagr_5y, None),
+    }
+    bounds = {name: b for name, b in bounds.items() if b != (None, None)}
+    total, positions = table.query(bounds, sort, order == "desc", offset, limit, category, fund_house)
+    return {
+        "total": total,
+        "offset": offset,
+        "limit": limit,
+        "as_of": table.built_at,
+        "results": table.rows(positions),
+    }
 
 @router.get("/performance-heatmap/{scheme_code}")
 async def get_performance_heatmap(scheme_code: str):
-    navs = fetch_historical_nav(scheme_code)
-    if navs:
-        df = pd.DataFrame(navs)
-        df["date"] = pd.to_datetime(df["date"], dayfirst=True)
-        df["nav"] = pd.to_numeric(df["nav"], errors="coerce")
-        df.dropna(subset=["nav"], inplace=True)
-        
-        # Calculate monthly returns
-        df["year"] = df["date"].dt.year
-        df["month"] = df["date"].dt.month
-        
+    scheme = await mfapi_pool.run(load_scheme, scheme_code)
+    if scheme is not None and len(scheme):
         # Get first and last NAV of each month
-        monthly_data = df.groupby(["year", "month"]).agg({
-            "nav": ["first", "last"]
-        }).reset_index()
-        monthly_data.columns = ["year", "month", "first_nav", "last_nav"]
-        
+        years, months, first_nav, last_nav = await compute_pool.monthly_first_last(
+            scheme.timestamps_ns(), scheme.navs
+        )
+
         # Calculate percentage change
-        monthly_data["value"] = ((monthly_data["last_nav"] - monthly_data["first_nav"]) / monthly_data["first_nav"]) * 100
-        monthly_data["nav"] = monthly_data["last_nav"]
-        
-        heatmap = monthly_data[["year", "month", "value", "nav"]].to_dict(orient="records")
-        return heatmap
+        value = ((last_nav - first_nav) / first_nav) * 100
+        return [
+            {"year": year, "month": month, "value": v, "nav": nav}
+            for year, month, v, nav in zip(
+                years.tolist(), months.tolist(), value.tolist(), last_nav.tolist()
+            )
+        ]
     return []
 
 @router.get("/risk-volatility/{scheme_code}")
-async def get_risk_volatility(scheme_code: str):
-    navs = fetch_historical_nav(scheme_code)
-    if not navs:
+async def get_risk_volatility(scheme_code: str, format: str = Query(RECORDS, pattern=FORMAT_PATTERN)):
+    scheme = await mfapi_pool.run(load_scheme, scheme_code)
+    if scheme is None or len(scheme) < 2:
         return {
             "annualized_volatility": 0.0,
             "annualized_return": 0.0,
             "sharpe_ratio": 0.0,
             "returns": []
         }
-    df = pd.DataFrame(navs)
-    df["date"] = pd.to_datetime(df["date"], dayfirst=True)
-    df["nav"] = pd.to_numeric(df["nav"], errors="coerce")
-    df.dropna(subset=["nav"], inplace=True)
-    df["returns"] = df["nav"].pct_change()
-    df.dropna(subset=["returns"], inplace=True)
+    df = pd.DataFrame({"date": scheme.dates[1:], "returns": scheme.returns()})
     annualized_volatility = df["returns"].std() * (252**0.5)
     annualized_return = (df["returns"].mean() + 1) ** 252 - 1
-    risk_free_rate = 0.06
-    sharpe_ratio = (annualized_return - risk_free_rate) / annualized_volatility if annualized_volatility > 0 else 0.0
-    returns_list = [
-        {"date": row["date"].strftime("%Y-%m-%d"), "returns": round(row["returns"], 8)}
-        for idx, row in df.iterrows()
-    ]
+    sharpe_ratio = (annualized_return - RISK_FREE_RATE) / annualized_volatility if annualized_volatility > 0 else 0.0
+    df["date_str"] = np.datetime_as_string(scheme.dates[1:])
+    returns_list = serialize_frame(
+        df, {"date": "date_str", "returns": "returns"}, format, decimals={"returns": 8}
+    )
     return {
         "annualized_volatility": float(annualized_volatility),
         "annualized_return": float(annualized_return),
@@ -140,47 +458,55 @@ async def get_risk_volatility(scheme_code: str):
     }
 
 @router.get("/monte-carlo-prediction/{scheme_code}")
-async def get_monte_carlo_prediction(scheme_code: str, num_simulations: int = 1000, days: int = 252):
-    navs = fetch_historical_nav(scheme_code)
-    if not navs:
+async def get_monte_carlo_prediction(
+    scheme_code: str,
+    num_simulations: int = Query(1000, ge=1, le=MAX_SIMULATIONS),
+    days: int = Query(252, ge=1, le=MAX_HORIZON_DAYS),
+    seed: Optional[int] = Query(None, ge=0),
+    precision: str = Query("float64", pattern=PRECISION_PATTERN),
+):
+    scheme = await mfapi_pool.run(load_scheme, scheme_code)
+    if scheme is None or not len(scheme):
         return {"message": "No NAV data"}
-    df = pd.DataFrame(navs)
-    df["nav"] = pd.to_numeric(df["nav"], errors="coerce")
-    df = df.dropna(subset=["nav"])
-    df["returns"] = df["nav"].pct_change()
-    df = df.dropna(subset=["returns"])
-    if len(df["returns"]) < 2:
+    returns = scheme.returns()
+    if len(returns) < 2:
         return {"message": "Insufficient data for Monte Carlo simulation"}
-    mu = df["returns"].mean()
-    sigma = df["returns"].std()
-    last_nav = float(df["nav"].iloc[-1])
-    simulations = np.zeros((num_simulations, days))
-    simulations[:, 0] = last_nav
-    for t in range(1, days):
-        random_returns = np.random.normal(mu, sigma, num_simulations)
-        simulations[:, t] = simulations[:, t - 1] * (1 + random_returns)
-    expected_nav = float(np.mean(simulations[:, -1]))
-    prob_positive = float(np.mean(simulations[:, -1] > last_nav))
-    percentile_5 = float(np.percentile(simulations[:, -1], 5))
-    percentile_95 = float(np.percentile(simulations[:, -1], 95))
-    
-    # Prepare simulation paths for visualization (sample 4 simulations)
-    simulation_paths = []
-    for i in range(min(4, num_simulations)):
-        simulation_paths.append({
+    mu = float(returns.mean())
+    sigma = float(returns.std(ddof=1))
+    last_nav = float(scheme.navs[-1])
+    # Sample every 5th day, keeping 4 full paths for visualization
+    result = await compute_pool.simulate_prices(
+        last_nav, mu, sigma, days, num_simulations,
+        seed=seed, dtype=PRECISIONS[precision],
+        sample_every=5, num_paths=min(4, num_simulations), band_percentiles=(5, 95),
+    )
+    summary = result.summary()
+    sample_days = result.sample_days.tolist()
+
+    simulation_paths = [
+        {
             "name": f"Simulation {i + 1}",
-            "data": [{"day": day, "value": float(simulations[i, day])} for day in range(0, days, 5)]  # Every 5 days
-        })
-    
+            "data": [{"day": day, "value": value} for day, value in zip(sample_days, path.tolist())]
+        }
+        for i, path in enumerate(result.paths)
+    ]
+
     # Historical + Predicted path
-    historical_predicted = [{"day": day, "value": float(np.mean(simulations[:, day]))} for day in range(0, days, 5)]
-    
+    historical_predicted = [
+        {"day": day, "value": value} for day, value in zip(sample_days, result.mean_path.tolist())
+    ]
+    percentile_bands = [
+        {"day": day, "lower": lower, "upper": upper}
+        for day, lower, upper in zip(sample_days, result.bands[5].tolist(), result.bands[95].tolist())
+    ]
+
     return {
-        "expected_nav": expected_nav,
-        "probability_positive_return": prob_positive * 100,
-        "lower_bound_5th_percentile": percentile_5,
-        "upper_bound_95th_percentile": percentile_95,
+        "expected_nav": summary["expected"],
+        "probability_positive_return": summary["probability_positive"] * 100,
+        "lower_bound_5th_percentile": summary["percentile_5"],
+        "upper_bound_95th_percentile": summary["percentile_95"],
         "last_nav": last_nav,
         "simulation_paths": simulation_paths,
-        "historical_predicted": historical_predicted
+        "historical_predicted": historical_predicted,
+        "percentile_bands": percentile_bands,
     }
@@ -0,0 +1,214 @@
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+PRECISIONS = {"float32": np.float32, "float64": np.float64}
+PRECISION_PATTERN = "^(float32|float64)$"
+
+# Upper bound on the scratch matrix allocated per chunk of simulations.
+CHUNK_BYTES = 32 * 1024 * 1024
+# Request limits for the simulation routes; output buffers scale with both.
+MAX_SIMULATIONS = 100_000
+MAX_HORIZON_DAYS = 2520
+# Percentile bands come from a per-sampled-day histogram of log prices:
+# BAND_BINS bins spanning BAND_SPAN_SIGMAS standard deviations either side
+# of the expected log price, so memory doesn't grow with num_simulations.
+BAND_BINS = 2048
+BAND_SPAN_SIGMAS = 6.0
+
+
+@dataclass
+class SimulationResult:
+    """Summary of a Monte Carlo price simulation.
+
+    Only terminal prices and the sampled days are kept; the full
+    `num_simulations x days` path matrix is never materialised.
+    """
+    last_price: float
+    terminal: np.ndarray
+    sample_days: np.ndarray
+    mean_path: np.ndarray
+    bands: Dict[float, np.ndarray] = field(default_factory=dict)
+    paths: np.ndarray = None
+
+    def summary(self) -> dict:
+        terminal = self.terminal
+        return {
+            "expected": float(np.mean(terminal)),
+            "probability_positive": float(np.mean(terminal > self.last_price)),
+            "percentile_5": float(np.percentile(terminal, 5)),
+            "percentile_95": float(np.percentile(terminal, 95)),
+        }
+
+
+def sample_days_for(days: int, sample_every: int) -> np.ndarray:
+    return np.arange(0, days, sample_every)
+
+
+class BandHistogram:
+    """Counts of simulated log prices per sampled day, in fixed bins.
+
+    Bins are placed from the model alone, so blocks of simulations can be
+    counted independently and merged. Prices outside the span land in the
+    edge bins. Percentiles interpolate within a bin, which is accurate to a
+    small fraction of a standard deviation for the bands reported.
+    """
+
+    def __init__(self, last_price: float, mu: float, sigma: float, sample_days: np.ndarray, bins: int = BAND_BINS):
+        self.last_price = float(last_price)
+        self.sample_days = np.asarray(sample_days)
+        self.bins = bins
+        drift = np.log1p(max(mu, -1.0 + 1e-12)) - sigma ** 2 / 2
+        half = np.maximum(BAND_SPAN_SIGMAS * sigma * np.sqrt(self.sample_days), 1e-6)
+        self.low = self.sample_days * drift - half
+        self.width = 2 * half / bins
+        self.counts = np.zeros((len(self.sample_days), bins), dtype=np.int64)
+        self.total = 0
+
+    def add(self, samples: np.ndarray) -> None:
+        """Count a block of simulations: one row per path, one column per sampled day."""
+        with np.errstate(divide="ignore"):
+            log_prices = np.log(samples / self.last_price)
+        pos = (log_prices - self.low) / self.width
+        np.clip(pos, 0, self.bins - 1, out=pos)
+        cells = pos.astype(np.intp) + np.arange(len(self.sample_days)) * self.bins
+        self.counts += np.bincount(cells.ravel(), minlength=self.counts.size).reshape(self.counts.shape)
+        self.total += len(samples)
+
+    def merge(self, other: "BandHistogram") -> None:
+        self.counts += other.counts
+        self.total += other.total
+
+    def percentile(self, p: float) -> np.ndarray:
+        """Price at percentile `p` for each sampled day (linear, like np.percentile)."""
+        rank = p / 100 * (self.total - 1)
+        cumulative = np.cumsum(self.counts, axis=1)
+        cols = np.arange(len(self.sample_days))
+        bin_index = np.minimum((cumulative <= rank).sum(axis=1), self.bins - 1)
+        in_bin = self.counts[cols, bin_index]
+        before = cumulative[cols, bin_index] - in_bin
+        frac = np.clip((rank - before + 0.5) / np.maximum(in_bin, 1), 0, 1)
+        prices = self.last_price * np.exp(self.low + (bin_index + frac) * self.width)
+        prices[self.sample_days == 0] = self.last_price
+        return prices
+
+
+def simulate_into(
+    terminal: np.ndarray,
+    histogram: Optional[BandHistogram],
+    last_price: float,
+    mu: float,
+    sigma: float,
+    days: int,
+    rng: np.random.Generator,
+    sample_every: int = 5,
+    num_paths: int = 0,
+) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Fill preallocated output arrays with one block of simulations.
+
+    Simulates `len(terminal)` paths, writing terminal prices into `terminal`
+    and, if given, counting prices on the sampled days into `histogram`. Precision
+    follows `terminal.dtype`. Returns the per-sampled-day sum over the block
+    and the first `num_paths` sampled paths.
+
+    Day 0 is `last_price` and each of the following `days - 1` steps applies
+    `price *= 1 + r` with `r ~ N(mu, sigma)`, matching the original per-day
+    loop. Steps are computed as a cumulative sum of log returns over chunks
+    of simulations, so peak memory is bounded by CHUNK_BYTES. A given seed
+    gives the same result whatever the chunk size.
+    """
+    num_simulations = len(terminal)
+    dtype = terminal.dtype
+    steps = days - 1
+    sample_days = sample_days_for(days, sample_every)
+    # Column of the cumulative log-return matrix holding each sampled day.
+    sample_cols = sample_days[sample_days > 0] - 1
+
+    chunk = max(num_paths, 1, CHUNK_BYTES // max(steps * dtype.itemsize, 1))
+    sample_sum = np.zeros(len(sample_days), dtype=np.float64)
+    paths = None
+
+    for start in range(0, num_simulations, chunk):
+        n = min(chunk, num_simulations - start)
+        if steps:
+            growth = rng.standard_normal((n, steps), dtype=dtype)
+            growth *= sigma
+            growth += mu
+            # A return below -100% would give a negative price; floor at zero.
+            np.maximum(growth, -1.0, out=growth)
+            with np.errstate(divide="ignore"):
+                np.log1p(growth, out=growth)
+            np.cumsum(growth, axis=1, out=growth)
+            chunk_terminal = last_price * np.exp(growth[:, -1])
+            chunk_samples = np.empty((n, len(sample_days)), dtype=dtype)
+            chunk_samples[:, 0] = last_price
+            chunk_samples[:, 1:] = last_price * np.exp(growth[:, sample_cols])
+        else:
+            chunk_terminal = np.full(n, last_price, dtype=dtype)
+            chunk_samples = np.full((n, len(sample_days)), last_price, dtype=dtype)
+
+        terminal[start:start + n] = chunk_terminal
+        sample_sum += chunk_samples.sum(axis=0, dtype=np.float64)
+        if histogram is not None:
+            histogram.add(chunk_samples)
+        if paths is None and num_paths:
+            paths = chunk_samples[:num_paths].copy()
+    return sample_sum, paths
+
+
+def build_result(
+    last_price: float,
+    terminal: np.ndarray,
+    histogram: Optional[BandHistogram],
+    sample_days: np.ndarray,
+    sample_sum: np.ndarray,
+    paths: Optional[np.ndarray],
+    band_percentiles: Sequence[float],
+) -> SimulationResult:
+    bands = {}
+    if histogram is not None:
+        for p in band_percentiles:
+            bands[p] = histogram.percentile(p)
+    return SimulationResult(
+        last_price=float(last_price),
+        terminal=terminal,
+        sample_days=sample_days,
+        mean_path=sample_sum / len(terminal),
+        bands=bands,
+        paths=paths,
+    )
+
+
+def simulate_prices(
+    last_price: float,
+    mu: float,
+    sigma: float,
+    days: int,
+    num_simulations: int,
+    seed: Optional[int] = None,
+    dtype=np.float64,
+    sample_every: int = 5,
+    num_paths: int = 0,
+    band_percentiles: Sequence[float] = (),
+    rng: Optional[np.random.Generator] = None,
+) -> SimulationResult:
+    """Simulate `num_simulations` price paths with normally distributed daily returns.
+
+    See `simulate_into` for the model. `sample_every` selects the days
+    reported in `mean_path`, `bands` and the first `num_paths` simulated
+    `paths`; percentile bands are only computed when `band_percentiles` is
+    given, from a `BandHistogram` filled chunk by chunk.
+    """
+    if days < 1 or num_simulations < 1:
+        raise ValueError("days and num_simulations must be positive")
+    rng = rng if rng is not None else np.random.default_rng(seed)
+    sample_days = sample_days_for(days, sample_every)
+    terminal = np.empty(num_simulations, dtype=dtype)
+    histogram = BandHistogram(last_price, mu, sigma, sample_days) if band_percentiles else None
+    sample_sum, paths = simulate_into(
+        terminal, histogram, last_price, mu, sigma, days, rng, sample_every, num_paths
+    )
+    return build_result(
+        last_price, terminal, histogram, sample_days, sample_sum, paths, band_percentiles
+    )
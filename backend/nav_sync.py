@@ -0,0 +1,241 @@
+import json
+import logging
+import os
+import threading
+import time
+from datetime import date, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import requests
+
+from price_store import PriceStore, is_next_session, record_dtype
+
+logger = logging.getLogger(__name__)
+
+# AMFI publishes every scheme's latest NAV in one file each evening. Either
+# URL may instead be a local path (placeholders still apply), which is how
+# the sync is exercised without network access.
+AMFI_NAV_URL = os.getenv("AMFI_NAV_URL", "https://www.amfiindia.com/spages/NAVAll.txt")
+AMFI_NAV_HISTORY_URL = os.getenv(
+    "AMFI_NAV_HISTORY_URL",
+    "https://portal.amfiindia.com/DownloadNAVHistoryReport_Po.aspx?frmdt={start}&todt={end}",
+)
+AMFI_NAV_SYNC = os.getenv("AMFI_NAV_SYNC", "1") != "0"
+# The file only changes once a day; checking more often just picks the new
+# one up sooner after it is published.
+AMFI_NAV_SYNC_INTERVAL = float(os.getenv("AMFI_NAV_SYNC_INTERVAL", "10800"))
+# Missed days older than this are left to the on-demand per-scheme refresh.
+AMFI_NAV_CATCHUP_DAYS = int(os.getenv("AMFI_NAV_CATCHUP_DAYS", "30"))
+# Synced series count as current while the last successful sync is younger
+# than this.
+AMFI_NAV_SYNC_VALID = float(os.getenv("AMFI_NAV_SYNC_VALID", "172800"))
+AMFI_REQUEST_TIMEOUT = 60
+
+DAY_NS = 86400 * 10**9
+NAV_RECORD = record_dtype(["nav"])
+
+
+def _read_source(url: str) -> str:
+    if url.startswith(("http://", "https://")):
+        r = requests.get(url, timeout=AMFI_REQUEST_TIMEOUT)
+        r.raise_for_status()
+        return r.text
+    with open(url, encoding="utf-8", errors="replace") as f:
+        return f.read()
+
+
+def parse_nav_file(text: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Scheme codes, day timestamps (ns) and NAVs from an AMFI NAV report.
+
+    Handles both the daily NAVAll.txt and the history report: columns are
+    located from the "Scheme Code;..." header line, and the fund house and
+    category lines between blocks are skipped. Rows without a usable NAV
+    or date are dropped.
+    """
+    code_col, nav_col, date_col = 0, 4, 5
+    codes: List[str] = []
+    navs: List[str] = []
+    dates: List[str] = []
+    for line in text.splitlines():
+        fields = line.split(";")
+        if len(fields) < 4:
+            continue
+        if fields[0].strip() == "Scheme Code":
+            header = [f.strip() for f in fields]
+            code_col, nav_col, date_col = (
+                header.index("Scheme Code"), header.index("Net Asset Value"), header.index("Date"),
+            )
+            continue
+        if len(fields) <= max(code_col, nav_col, date_col):
+            continue
+        code = fields[code_col].strip()
+        if code.isdigit():
+            codes.append(code)
+            navs.append(fields[nav_col].strip())
+            dates.append(fields[date_col].strip())
+
+    nav_values = pd.to_numeric(pd.Series(navs, dtype=object), errors="coerce").to_numpy(dtype=float)
+    days = pd.to_datetime(pd.Series(dates, dtype=object), format="%d-%b-%Y", errors="coerce")
+    keep = np.isfinite(nav_values) & days.notna().to_numpy()
+    ts = days.to_numpy(dtype="datetime64[ns]").view(np.int64)
+    return np.array(codes, dtype=object)[keep], ts[keep], nav_values[keep]
+
+
+def group_by_scheme(codes: np.ndarray, ts: np.ndarray, navs: np.ndarray) -> Dict[str, np.ndarray]:
+    """Per-scheme NAV records sorted by date, one per day (the last one wins)."""
+    order = np.lexsort((ts, codes))
+    codes, ts, navs = codes[order], ts[order], navs[order]
+    bounds = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1], True])
+    grouped = {}
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        t = ts[lo:hi]
+        last = np.r_[t[1:] != t[:-1], True]
+        records = np.empty(int(last.sum()), dtype=NAV_RECORD)
+        records["ts"] = t[last]
+        records["nav"] = navs[lo:hi][last]
+        grouped[codes[lo]] = records
+    return grouped
+
+
+class NavSync:
+    """Daily bulk sync of every scheme's NAV from AMFI into the price store.
+
+    Each run downloads the day's NAV file and, if days were missed since
+    the last sync, the history report covering them. New NAVs are appended
+    to the "mf" series already in the store; schemes that were never
+    requested are left alone, since one NAV is not a history. The date the
+    store is synced through is persisted next to it, so catch-up works
+    across restarts.
+    """
+
+    def __init__(
+        self,
+        store: PriceStore,
+        on_update: Optional[Callable[[Iterable[str]], None]] = None,
+    ):
+        self.store = store
+        self.on_update = on_update
+        self.state_path = os.path.join(store.root, "amfi_sync.json")
+        self._lock = threading.Lock()
+        self.state = self._load_state()
+        self.progress = {"done": 0, "total": 0}
+        self.last_run: Optional[dict] = None
+
+    def _load_state(self) -> dict:
+        try:
+            with open(self.state_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self) -> None:
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.state, f)
+        os.replace(tmp, self.state_path)
+
+    @property
+    def synced_through(self) -> Optional[str]:
+        return self.state.get("synced_through")
+
+    def is_current(self, synced_through: Optional[str]) -> bool:
+        """Whether a series last updated by the sync on `synced_through` is up to date."""
+        return (
+            synced_through is not None
+            and synced_through == self.synced_through
+            and time.time() - self.state.get("succeeded_at", 0) < AMFI_NAV_SYNC_VALID
+        )
+
+    def _fetch(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, str, str, int]:
+        """Rows newer than the last sync, the newest NAV date, bytes read and
+        the first date from which every published NAV is among the rows."""
+        text = _read_source(AMFI_NAV_URL)
+        downloaded = len(text)
+        codes, ts, navs = parse_nav_file(text)
+        if not len(codes):
+            raise RuntimeError("AMFI NAV file had no NAV rows")
+        newest = ts.max().astype("datetime64[ns]").astype("datetime64[D]").item()
+        if self.synced_through is None:
+            return codes, ts, navs, newest.isoformat(), newest.isoformat(), downloaded
+
+        # The daily file only holds each scheme's latest NAV; days missed
+        # since the last sync come from the history report.
+        start = date.fromisoformat(self.synced_through) + timedelta(days=1)
+        start = max(start, newest - timedelta(days=AMFI_NAV_CATCHUP_DAYS))
+        end = newest - timedelta(days=1)
+        covered_from = newest
+        if start <= end:
+            history = _read_source(AMFI_NAV_HISTORY_URL.format(
+                start=start.strftime("%d-%b-%Y"), end=end.strftime("%d-%b-%Y"),
+            ))
+            downloaded += len(history)
+            old_codes, old_ts, old_navs = parse_nav_file(history)
+            codes = np.concatenate((old_codes, codes))
+            ts = np.concatenate((old_ts, ts))
+            navs = np.concatenate((old_navs, navs))
+            covered_from = start
+        fresh = ts > np.datetime64(self.synced_through, "ns").astype(np.int64)
+        return codes[fresh], ts[fresh], navs[fresh], newest.isoformat(), covered_from.isoformat(), downloaded
+
+    def run(self) -> dict:
+        """One sync pass; returns (and keeps) its stats."""
+        with self._lock:
+            started = time.time()
+            codes, ts, navs, newest, covered_from, downloaded = self._fetch()
+            grouped = group_by_scheme(codes, ts, navs) if len(codes) else {}
+            updated, skipped = self._apply(grouped, newest, covered_from)
+            if self.on_update is not None and updated:
+                self.on_update(updated)
+
+            self.state["synced_through"] = max(newest, self.synced_through or newest)
+            self.state["succeeded_at"] = time.time()
+            self._save_state()
+            elapsed = time.time() - started
+            self.last_run = {
+                "started_at": started,
+                "seconds": round(elapsed, 3),
+                "bytes": downloaded,
+                "rows": int(len(codes)),
+                "schemes_in_file": len(grouped),
+                "schemes_updated": len(updated),
+                "schemes_skipped": skipped,
+                "rows_per_second": round(len(codes) / elapsed, 1) if elapsed > 0 else None,
+            }
+            logger.info(f"AMFI NAV sync through {self.synced_through}: {self.last_run}")
+            return self.last_run
+
+    def _apply(self, grouped: Dict[str, np.ndarray], newest: str, covered_from: str) -> Tuple[List[str], int]:
+        covered_ns = np.datetime64(covered_from, "ns").astype(np.int64)
+        updated: List[str] = []
+        skipped = 0
+        self.progress = {"done": 0, "total": len(grouped)}
+        for code, records in grouped.items():
+            with self.store.lock("mf", code):
+                stored = self.store.read("mf", code)
+                if stored is None or not len(stored.records):
+                    skipped += 1
+                elif not (
+                    is_next_session(stored.last_ts, records["ts"][0])
+                    or covered_ns <= stored.last_ts + DAY_NS
+                ):
+                    # NAVs may be missing between the stored series and these
+                    # rows: a hole the sync can't fill; the next request
+                    # refetches the whole history instead.
+                    skipped += 1
+                else:
+                    self.store.append("mf", code, records, {"synced_through": newest})
+                    updated.append(code)
+            self.progress["done"] += 1
+        return updated, skipped
+
+    def stats(self) -> dict:
+        return {
+            "enabled": AMFI_NAV_SYNC,
+            "synced_through": self.synced_through,
+            "succeeded_at": self.state.get("succeeded_at"),
+            "progress": dict(self.progress),
+            "last_run": self.last_run,
+        }
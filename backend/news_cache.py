@@ -0,0 +1,96 @@
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from executors import BoundedExecutor
+
+NEWS_TTL = float(os.getenv("NEWS_TTL", "300"))
+# Items kept per symbol across refreshes, newest first.
+NEWS_MAX_ITEMS = int(os.getenv("NEWS_MAX_ITEMS", "50"))
+NEWS_CACHE_MAX_SYMBOLS = int(os.getenv("NEWS_CACHE_MAX_SYMBOLS", "2048"))
+
+
+def _published(raw: dict) -> Optional[int]:
+    ts = raw.get("providerPublishTime")
+    if ts:
+        return int(ts)
+    pub_date = (raw.get("content") or {}).get("pubDate")
+    if pub_date:
+        try:
+            return int(datetime.fromisoformat(pub_date.replace("Z", "+00:00")).timestamp())
+        except ValueError:
+            return None
+    return None
+
+
+def normalize_item(raw: dict) -> Optional[dict]:
+    """Flatten a yfinance news item (old flat or newer nested "content" shape).
+
+    Items without a link are dropped, since the link is the dedupe key.
+    """
+    content = raw.get("content") or {}
+    link = raw.get("link") or (content.get("canonicalUrl") or {}).get("url") \
+        or (content.get("clickThroughUrl") or {}).get("url")
+    if not link:
+        return None
+    published = _published(raw)
+    return {
+        "title": raw.get("title") or content.get("title") or "",
+        "publisher": raw.get("publisher") or (content.get("provider") or {}).get("displayName") or "",
+        "link": link,
+        "published": published,
+        "datetime": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(published)) if published else "",
+    }
+
+
+def newest_first(items) -> List[dict]:
+    return sorted(items, key=lambda item: item["published"] or 0, reverse=True)
+
+
+class _Entry:
+    __slots__ = ("items", "fetched_at")
+
+    def __init__(self, items: Dict[str, dict], fetched_at: float):
+        self.items = items
+        self.fetched_at = fetched_at
+
+
+class NewsCache:
+    """Per-symbol news, merged and deduplicated by link across refreshes.
+
+    Items are normalized once when fetched. A stale symbol is served from
+    the cache at once and refreshed in the background on `pool`; only a
+    symbol never seen before waits on upstream.
+    """
+
+    def __init__(self, fetch: Callable[[str], list], pool: BoundedExecutor):
+        self.fetch = fetch
+        self.pool = pool
+        self._entries: Dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+
+    def _load(self, symbol: str) -> List[dict]:
+        fresh = [item for item in map(normalize_item, self.fetch(symbol) or []) if item]
+        with self._lock:
+            entry = self._entries.pop(symbol, None)
+            items = dict(entry.items) if entry is not None else {}
+            for item in fresh:
+                items[item["link"]] = item
+            kept = newest_first(items.values())[:NEWS_MAX_ITEMS]
+            self._entries[symbol] = _Entry({item["link"]: item for item in kept}, time.time())
+            while len(self._entries) > NEWS_CACHE_MAX_SYMBOLS:
+                del self._entries[next(iter(self._entries))]
+        return kept
+
+    async def get(self, symbol: str) -> List[dict]:
+        """News for `symbol`, newest first."""
+        symbol = symbol.upper()
+        with self._lock:
+            entry = self._entries.get(symbol)
+        if entry is None:
+            return await self.pool.run(self._load, symbol)
+        if time.time() - entry.fetched_at >= NEWS_TTL:
+            self.pool.submit_once(("news", symbol), self._load, symbol)
+        return list(entry.items.values())
@@ -1,9 +1,11 @@
 import sqlite3
+from contextlib import contextmanager
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List
-import datetime
 import logging
+import os
+import threading
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -11,23 +13,77 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+PORTFOLIO_DB = os.getenv("PORTFOLIO_DB", "portfolio.db")
+# How long a writer waits for another connection's write lock before failing.
+PORTFOLIO_DB_BUSY_TIMEOUT_MS = int(os.getenv("PORTFOLIO_DB_BUSY_TIMEOUT_MS", "5000"))
+MAX_BULK_ITEMS = 500
+
+# WAL lets readers run alongside the single writer; NORMAL sync is durable
+# across application crashes in WAL mode and skips an fsync per commit.
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    f"PRAGMA busy_timeout={PORTFOLIO_DB_BUSY_TIMEOUT_MS}",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-8000",
+)
+
+ITEM_COLUMNS = "id, symbol, name, item_type, added_at"
+
+_local = threading.local()
+
+
+def get_connection() -> sqlite3.Connection:
+    """This thread's connection, opened and configured on first use.
+
+    Handlers are plain functions, so FastAPI runs them on its threadpool
+    and each worker thread keeps one connection for its lifetime.
+    Transactions are explicit (see `transaction`).
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(PORTFOLIO_DB, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        _local.conn = conn
+    return conn
+
+
+@contextmanager
+def transaction():
+    """A write transaction on this thread's connection.
+
+    BEGIN IMMEDIATE takes the write lock up front, so concurrent writers
+    queue on busy_timeout instead of failing mid-transaction. Rolled back
+    on any exception, including HTTPException and a failed COMMIT, so the
+    thread's connection is never left inside a transaction.
+    """
+    conn = get_connection()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+        conn.commit()
+    except BaseException:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+
+
 # Initialize SQLite database
 def init_db():
-    conn = sqlite3.connect('portfolio.db')
-    c = conn.cursor()
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS portfolio_items (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id TEXT NOT NULL,
-            symbol TEXT NOT NULL,
-            name TEXT NOT NULL,
-            item_type TEXT NOT NULL,
-            added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            UNIQUE(user_id, symbol)
-        )
-    ''')
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS portfolio_items (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id TEXT NOT NULL,
+                symbol TEXT NOT NULL,
+                name TEXT NOT NULL,
+                item_type TEXT NOT NULL,
+                added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE(user_id, symbol)
+            )
+        ''')
 
 # Initialize database on startup
 init_db()
@@ -45,81 +101,86 @@ class PortfolioItemResponse(BaseModel):
     item_type: str
     added_at: str
 
+class PortfolioBulkRequest(BaseModel):
+    add: List[PortfolioItem] = []
+    remove: List[int] = []
+
+class PortfolioBulkResponse(BaseModel):
+    added: List[PortfolioItemResponse]
+    removed: List[int]
+
+def _item(row: sqlite3.Row) -> PortfolioItemResponse:
+    return PortfolioItemResponse(**dict(row))
+
 @router.post("/api/portfolio/add/{user_id}", response_model=PortfolioItemResponse)
-async def add_to_portfolio(user_id: str, item: PortfolioItem):
+def add_to_portfolio(user_id: str, item: PortfolioItem):
     try:
-        conn = sqlite3.connect('portfolio.db')
-        c = conn.cursor()
-        
-        # Check if item already exists
-        c.execute('SELECT id FROM portfolio_items WHERE user_id = ? AND symbol = ?', 
-                 (user_id, item.symbol))
-        if c.fetchone():
+        with transaction() as conn:
+            row = conn.execute(f'''
+                INSERT INTO portfolio_items (user_id, symbol, name, item_type)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (user_id, symbol) DO NOTHING
+                RETURNING {ITEM_COLUMNS}
+            ''', (user_id, item.symbol, item.name, item.item_type)).fetchone()
+        if row is None:
             raise HTTPException(status_code=400, detail="Item already in portfolio")
-        
-        # Add new item
-        c.execute('''
-            INSERT INTO portfolio_items (user_id, symbol, name, item_type)
-            VALUES (?, ?, ?, ?)
-        ''', (user_id, item.symbol, item.name, item.item_type))
-        
-        item_id = c.lastrowid
-        conn.commit()
-        
-        # Get the inserted item
-        c.execute('SELECT * FROM portfolio_items WHERE id = ?', (item_id,))
-        row = c.fetchone()
-        conn.close()
-        
-        return PortfolioItemResponse(
-            id=row[0],
-            symbol=row[2],
-            name=row[3],
-            item_type=row[4],
-            added_at=row[5]
-        )
+        return _item(row)
+    except sqlite3.Error as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/api/portfolio/bulk/{user_id}", response_model=PortfolioBulkResponse)
+def bulk_update_portfolio(user_id: str, request: PortfolioBulkRequest):
+    """Add and remove many items in one transaction.
+
+    Added items that are already in the portfolio get the new name and
+    type. `removed` lists the ids that belonged to the user. Either every
+    change is applied or none is.
+    """
+    if len(request.add) + len(request.remove) > MAX_BULK_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_ITEMS} items per request")
+    try:
+        with transaction() as conn:
+            removed = [
+                row["id"] for item_id in dict.fromkeys(request.remove)
+                for row in conn.execute(
+                    'DELETE FROM portfolio_items WHERE id = ? AND user_id = ? RETURNING id',
+                    (item_id, user_id),
+                )
+            ]
+            added = [
+                _item(conn.execute(f'''
+                    INSERT INTO portfolio_items (user_id, symbol, name, item_type)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT (user_id, symbol)
+                    DO UPDATE SET name = excluded.name, item_type = excluded.item_type
+                    RETURNING {ITEM_COLUMNS}
+                ''', (user_id, item.symbol, item.name, item.item_type)).fetchone())
+                for item in request.add
+            ]
+        return PortfolioBulkResponse(added=added, removed=removed)
     except sqlite3.Error as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/api/portfolio/{user_id}", response_model=List[PortfolioItemResponse])
-async def get_portfolio(user_id: str):
+def get_portfolio(user_id: str):
     try:
-        conn = sqlite3.connect('portfolio.db')
-        c = conn.cursor()
-        c.execute('SELECT * FROM portfolio_items WHERE user_id = ?', (user_id,))
-        items = c.fetchall()
-        conn.close()
-        
-        return [
-            PortfolioItemResponse(
-                id=item[0],
-                symbol=item[2],
-                name=item[3],
-                item_type=item[4],
-                added_at=item[5]
-            )
-            for item in items
-        ]
+        rows = get_connection().execute(
+            f'SELECT {ITEM_COLUMNS} FROM portfolio_items WHERE user_id = ? ORDER BY id', (user_id,)
+        ).fetchall()
+        return [_item(row) for row in rows]
     except sqlite3.Error as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/api/portfolio/{user_id}/{item_id}")
-async def remove_from_portfolio(user_id: str, item_id: int):
+def remove_from_portfolio(user_id: str, item_id: int):
     try:
-        conn = sqlite3.connect('portfolio.db')
-        c = conn.cursor()
-        
-        # Check if item exists and belongs to user
-        c.execute('SELECT id FROM portfolio_items WHERE id = ? AND user_id = ?', 
-                 (item_id, user_id))
-        if not c.fetchone():
+        with transaction() as conn:
+            row = conn.execute(
+                'DELETE FROM portfolio_items WHERE id = ? AND user_id = ? RETURNING id',
+                (item_id, user_id),
+            ).fetchone()
+        if row is None:
             raise HTTPException(status_code=404, detail="Item not found in portfolio")
-        
-        c.execute('DELETE FROM portfolio_items WHERE id = ? AND user_id = ?', 
-                 (item_id, user_id))
-        conn.commit()
-        conn.close()
-        
         return {"message": "Item removed successfully"}
     except sqlite3.Error as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,227 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+PRICE_STORE_DIR = os.getenv(
+    "PRICE_STORE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "prices")
+)
+# How long a stored series is served without asking upstream for new bars.
+PRICE_STORE_REFRESH = float(os.getenv("PRICE_STORE_REFRESH", "900"))
+PRICE_STORE_MF_REFRESH = float(os.getenv("PRICE_STORE_MF_REFRESH", "21600"))
+
+_SAFE_KEY = re.compile(r"[^A-Za-z0-9._-]")
+
+
+class StoredSeries:
+    """A memory-mapped price series plus its metadata.
+
+    `records` is a structured array with an int64 `ts` field (UTC
+    nanoseconds, strictly increasing) and one float64 field per column.
+    """
+
+    def __init__(self, records: np.ndarray, meta: dict):
+        self.records = records
+        self.meta = meta
+
+    @property
+    def fields(self) -> List[str]:
+        return self.meta["fields"]
+
+    @property
+    def last_ts(self) -> Optional[int]:
+        return int(self.records["ts"][-1]) if len(self.records) else None
+
+    @property
+    def covers_from(self) -> Optional[int]:
+        """Start of the window the series was fetched for; None means full history."""
+        return self.meta.get("covers_from")
+
+    def covers(self, start_ns: Optional[int]) -> bool:
+        if self.covers_from is None:
+            return True
+        return start_ns is not None and self.covers_from <= start_ns
+
+    def is_fresh(self, max_age: float) -> bool:
+        return time.time() - self.meta.get("checked_at", 0) < max_age
+
+    def to_frame(self, start_ns: Optional[int] = None) -> pd.DataFrame:
+        """Columns as a DataFrame indexed by timestamp in the stored timezone."""
+        records = self.records
+        if start_ns is not None:
+            records = records[np.searchsorted(records["ts"], start_ns):]
+        index = pd.DatetimeIndex(records["ts"].astype("datetime64[ns]"), name=self.meta.get("index_name"))
+        index = index.tz_localize("UTC")
+        tz = self.meta.get("tz")
+        index = index.tz_convert(tz) if tz else index.tz_localize(None)
+        return pd.DataFrame({f: np.asarray(records[f]) for f in self.fields}, index=index)
+
+
+def record_dtype(fields: List[str]) -> np.dtype:
+    return np.dtype([("ts", "<i8")] + [(f, "<f8") for f in fields])
+
+
+def frame_to_records(frame: pd.DataFrame, fields: List[str]) -> np.ndarray:
+    """Structured records for the numeric `fields` of a DatetimeIndex-ed frame."""
+    index = frame.index
+    if getattr(index, "tz", None) is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    records = np.empty(len(frame), dtype=record_dtype(fields))
+    records["ts"] = index.to_numpy(dtype="datetime64[ns]").view(np.int64)
+    for f in fields:
+        records[f] = frame[f].to_numpy(dtype=float) if f in frame.columns else np.nan
+    return records
+
+
+def is_next_session(last_ts: int, next_ts: int) -> bool:
+    """Whether a bar at `next_ts` can follow one at `last_ts` without a hole.
+
+    True when no business day lies strictly between the two dates, e.g.
+    Tue -> Wed or Fri -> Mon. Exchange holidays count as missing days, so a
+    caller errs towards a full refetch.
+    """
+    last_day = np.datetime64(int(last_ts), "ns").astype("datetime64[D]")
+    next_day = np.datetime64(int(next_ts), "ns").astype("datetime64[D]")
+    return bool(next_day <= np.busday_offset(last_day, 1, roll="backward"))
+
+
+# Data files start with MAGIC, a little-endian uint32 header length and the
+# JSON header (the full meta); records follow at the next 8-byte boundary.
+MAGIC = b"PSTORE2\0"
+_HEADER_LEN = np.dtype("<u4")
+
+
+def _read_header(f) -> tuple:
+    """(meta, records offset) from the start of an open data file."""
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError("not a price store file")
+    length = int(np.frombuffer(f.read(_HEADER_LEN.itemsize), dtype=_HEADER_LEN)[0])
+    meta = json.loads(f.read(length))
+    offset = len(MAGIC) + _HEADER_LEN.itemsize + length
+    return meta, offset + (-offset % 8)
+
+
+class PriceStore:
+    """On-disk price series, one raw record file per instrument.
+
+    Each instrument has `<key>.bin`: a JSON header (fields, record count,
+    version, timezone, fetch window) followed by fixed-width records, read
+    through np.memmap. Every change, appends included, writes a temporary
+    file and os.replaces the old one, so a reader always gets records and
+    meta from the same write, and existing memory maps stay valid.
+
+    `touch` only updates `checked_at`, so it writes the small `<key>.json`
+    sidecar instead of copying the records; the sidecar names the version
+    it belongs to and is ignored once the data file is replaced.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._locks: Dict[str, threading.Lock] = defaultdict(threading.Lock)
+        self._locks_lock = threading.Lock()
+
+    def _paths(self, namespace: str, key: str):
+        base = os.path.join(self.root, namespace, _SAFE_KEY.sub("_", key))
+        return base + ".bin", base + ".json"
+
+    def lock(self, namespace: str, key: str) -> threading.Lock:
+        with self._locks_lock:
+            return self._locks[f"{namespace}/{key}"]
+
+    def read(self, namespace: str, key: str) -> Optional[StoredSeries]:
+        data_path, check_path = self._paths(namespace, key)
+        try:
+            # Header and memmap come from the same open file, so a concurrent
+            # os.replace can't pair this header with another write's records.
+            with open(data_path, "rb") as f:
+                meta, offset = _read_header(f)
+                dtype = record_dtype(meta["fields"])
+                count = min((os.fstat(f.fileno()).st_size - offset) // dtype.itemsize, meta["count"])
+                if count > 0:
+                    records = np.memmap(f, dtype=dtype, mode="r", offset=offset, shape=(count,))
+                else:
+                    records = np.empty(0, dtype=dtype)
+        except (OSError, ValueError, KeyError):
+            return None
+        try:
+            with open(check_path) as f:
+                check = json.load(f)
+            if check.get("version") == meta.get("version"):
+                meta["checked_at"] = max(meta.get("checked_at", 0), check["checked_at"])
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return StoredSeries(records, meta)
+
+    def keys(self, namespace: str) -> List[str]:
+        """Keys stored under `namespace`, as written on disk."""
+        try:
+            names = os.listdir(os.path.join(self.root, namespace))
+        except OSError:
+            return []
+        return sorted(name[:-4] for name in names if name.endswith(".bin"))
+
+    def _write_series(self, data_path: str, meta: dict, *chunks: np.ndarray) -> None:
+        header = json.dumps(meta).encode()
+        prefix = MAGIC + np.array([len(header)], dtype=_HEADER_LEN).tobytes() + header
+        tmp = data_path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(prefix + b"\0" * (-len(prefix) % 8))
+            for chunk in chunks:
+                f.write(chunk.tobytes())
+        os.replace(tmp, data_path)
+
+    def write(self, namespace: str, key: str, records: np.ndarray, meta: dict) -> None:
+        """Replace the stored series for `key`."""
+        data_path, _ = self._paths(namespace, key)
+        os.makedirs(os.path.dirname(data_path), exist_ok=True)
+        records = np.sort(records, order="ts")
+        meta = dict(
+            meta, fields=list(records.dtype.names[1:]), count=len(records),
+            version=time.time_ns(), checked_at=time.time(),
+        )
+        self._write_series(data_path, meta, records)
+
+    def append(self, namespace: str, key: str, records: np.ndarray, meta: Optional[dict] = None) -> int:
+        """Append `records`, replacing stored bars from the first new timestamp on.
+
+        Upstream usually re-sends the last stored bar (which may have been
+        captured mid-session), so overlapping bars take the new values.
+        Returns the number of bars added. Callers hold `lock(namespace, key)`
+        for both the read and the append.
+        """
+        stored = self.read(namespace, key)
+        if stored is None:
+            raise KeyError(f"{namespace}/{key} is not stored")
+        data_path, _ = self._paths(namespace, key)
+        records = np.sort(records, order="ts")
+        old_count = len(stored.records)
+        keep = int(np.searchsorted(stored.records["ts"], records["ts"][0])) if len(records) else old_count
+        meta = dict(
+            stored.meta, **(meta or {}), count=keep + len(records),
+            version=time.time_ns(), checked_at=time.time(),
+        )
+        # Written to a new file and swapped in rather than patched in place:
+        # other threads and compute pool workers may still have the old file
+        # memory-mapped, and truncating it under them raises SIGBUS.
+        self._write_series(data_path, meta, stored.records[:keep], records)
+        del stored
+        return meta["count"] - old_count
+
+    def touch(self, namespace: str, key: str) -> None:
+        """Mark a series as checked against upstream without changing it."""
+        stored = self.read(namespace, key)
+        if stored is not None:
+            _, check_path = self._paths(namespace, key)
+            tmp = check_path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump({"version": stored.meta.get("version"), "checked_at": time.time()}, f)
+            os.replace(tmp, check_path)
+
+
+price_store = PriceStore(PRICE_STORE_DIR)
@@ -0,0 +1,170 @@
+import re
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Match tiers, best first.
+EXACT, PREFIX, CONTAINS = range(3)
+
+
+class _Index:
+    """Immutable search structures for one snapshot of the catalogue.
+
+    Codes live in an int64 array and names in a list, both in a fixed
+    order: shortest name first, then code, which doubles as the ranking
+    tie-break. Every distinct word of the names maps to a sorted int32
+    array of the positions containing it. A query term is looked up in the
+    (small) word vocabulary rather than in the names themselves, so a
+    search only touches the postings of the words it matches.
+    """
+
+    def __init__(self, schemes: Iterable[Tuple[int, str]]):
+        schemes = list(schemes)
+        order = sorted(range(len(schemes)), key=lambda i: (len(schemes[i][1]), schemes[i][0]))
+        rows = [schemes[i] for i in order]
+        # Positions in the order the list was fetched, for unfiltered listings.
+        self.listed = np.empty(len(order), dtype=np.int32)
+        self.listed[order] = np.arange(len(order), dtype=np.int32)
+        self.size = len(rows)
+        self.codes = np.array([code for code, _ in rows], dtype=np.int64)
+        self.names = [name for _, name in rows]
+        lower = [name.lower() for name in self.names]
+
+        postings: Dict[str, List[int]] = defaultdict(list)
+        for pos, name in enumerate(lower):
+            for word in set(_TOKEN.findall(name)):
+                postings[word].append(pos)
+        self.words = sorted(postings)
+        self.postings = [np.array(postings[w], dtype=np.int32) for w in self.words]
+        # All words in one string, for finding every word that contains a term.
+        self.vocab = "\n".join(self.words)
+        self.word_starts = np.cumsum([0] + [len(w) + 1 for w in self.words[:-1]])
+
+        by_lower = sorted(range(self.size), key=lower.__getitem__)
+        self.by_lower = np.array(by_lower, dtype=np.int32)
+        self.sorted_lower = [lower[i] for i in by_lower]
+
+    def _words_containing(self, term: str) -> List[int]:
+        if len(term) == 1:
+            # A single character would match nearly everything; treat it as
+            # a word prefix instead.
+            lo = bisect_left(self.words, term)
+            hi = bisect_left(self.words, term + "\uffff")
+            return list(range(lo, hi))
+        found = []
+        at = self.vocab.find(term)
+        while at != -1:
+            word = int(np.searchsorted(self.word_starts, at, side="right")) - 1
+            found.append(word)
+            # Skip to the next word; further hits in this one add nothing.
+            nxt = self.vocab.find("\n", at)
+            if nxt == -1:
+                break
+            at = self.vocab.find(term, nxt + 1)
+        return found
+
+    def _mask(self, term: str) -> np.ndarray:
+        """Boolean mask of the positions with a word containing `term`."""
+        mask = np.zeros(self.size, dtype=bool)
+        for word in self._words_containing(term):
+            mask[self.postings[word]] = True
+        return mask
+
+    def search(self, query: str, offset: int, limit: int) -> Tuple[int, np.ndarray]:
+        """Total match count and the ranked positions for one page."""
+        query = " ".join(query.lower().split())
+        terms = set(_TOKEN.findall(query))
+        if not terms:
+            return self.size, self.listed[offset:offset + limit]
+
+        mask = None
+        for term in terms:
+            mask = self._mask(term) if mask is None else mask & self._mask(term)
+            if not mask.any():
+                return 0, np.empty(0, dtype=np.int32)
+        matches = np.flatnonzero(mask)
+
+        tier = np.full(self.size, CONTAINS, dtype=np.int8)
+        lo = bisect_left(self.sorted_lower, query)
+        tier[self.by_lower[lo:bisect_left(self.sorted_lower, query + "\uffff")]] = PREFIX
+        tier[self.by_lower[lo:bisect_right(self.sorted_lower, query)]] = EXACT
+
+        # Positions already encode the tie-break, so rank = (tier, position).
+        keys = tier[matches].astype(np.int64) * self.size + matches
+        end = min(offset + limit, len(keys))
+        if offset >= end:
+            return len(matches), np.empty(0, dtype=np.int32)
+        top = np.argpartition(keys, end - 1)[:end] if end < len(keys) else np.arange(len(keys))
+        top = top[np.argsort(keys[top], kind="stable")]
+        return len(matches), matches[top[offset:end]]
+
+
+class SchemeCatalogue:
+    """The full mutual fund scheme list, loaded once and searched in memory.
+
+    `fetch()` returns `(scheme_code, scheme_name)` pairs. `refresh()`
+    rebuilds the index off to the side and swaps it in, so searches keep
+    running against the old snapshot while a refresh is in progress.
+    """
+
+    def __init__(self, fetch: Callable[[], Iterable[Tuple[int, str]]]):
+        self.fetch = fetch
+        self._index: Optional[_Index] = None
+        self._lock = threading.RLock()
+        self.loaded_at: Optional[float] = None
+
+    def refresh(self) -> int:
+        # Serialized so a scheduled refresh and a first search don't both download.
+        with self._lock:
+            rows = []
+            for code, name in self.fetch():
+                try:
+                    rows.append((int(code), str(name)))
+                except (TypeError, ValueError):
+                    continue
+            if not rows:
+                raise RuntimeError("scheme list is empty")
+            self._index = _Index(rows)
+            self.loaded_at = time.time()
+            return len(rows)
+
+    def index(self) -> _Index:
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    self.refresh()
+        return self._index
+
+    @property
+    def loaded(self) -> bool:
+        return self._index is not None
+
+    def codes(self) -> List[int]:
+        return self.index().codes.tolist()
+
+    def __len__(self) -> int:
+        return self._index.size if self._index is not None else 0
+
+    def search(self, query: str = "", offset: int = 0, limit: int = 50) -> Tuple[int, List[Tuple[int, str]]]:
+        """`(total, [(code, name), ...])` for one page of ranked matches.
+
+        Every word of `query` must occur inside a word of the name (a lone
+        letter must start one). Names equal to the query rank first, then
+        names starting with it, then the rest; ties go to the shorter name.
+        A query without words pages through the list in its fetched order.
+        """
+        index = self.index()
+        total, positions = index.search(query, offset, limit)
+        return total, [(int(index.codes[p]), index.names[p]) for p in positions.tolist()]
+
+    def sample(self, count: int) -> Tuple[int, List[Tuple[int, str]]]:
+        """`(total, [(code, name), ...])` for `count` schemes picked at random."""
+        index = self.index()
+        positions = np.random.default_rng().choice(index.size, size=min(count, index.size), replace=False)
+        return index.size, [(int(index.codes[p]), index.names[p]) for p in positions.tolist()]
@@ -0,0 +1,233 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import wait
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import compute_pool
+import kernels
+from executors import BoundedExecutor
+from price_store import PriceStore
+
+logger = logging.getLogger(__name__)
+
+CAGR_YEARS = (1, 3, 5)
+METRICS = ("volatility", "annual_return", "sharpe", "max_drawdown") + tuple(f"cagr_{y}y" for y in CAGR_YEARS)
+# Schemes per compute pool task.
+MF_SCREENER_CHUNK = int(os.getenv("MF_SCREENER_CHUNK", "500"))
+# Schemes missing from the price store that one rebuild downloads, so the
+# universe fills in over a few runs instead of in one burst on mfapi.in.
+MF_SCREENER_BACKFILL = int(os.getenv("MF_SCREENER_BACKFILL", "500"))
+# Backfill downloads in flight at once.
+MF_SCREENER_BACKFILL_CONCURRENCY = max(1, int(os.getenv("MF_SCREENER_BACKFILL_CONCURRENCY", "2")))
+
+DAY_NS = 86400 * 10**9
+
+
+def compute_metrics(root: str, keys: Sequence[str], risk_free: float):
+    """Metrics for stored "mf" series, run in a compute pool worker.
+
+    Workers read the memory-mapped store themselves, so only the keys go
+    in and one small matrix comes back. Series with fewer than three NAVs
+    are skipped.
+    """
+    store = PriceStore(root)
+    info: List[Tuple[str, str, str, str, float, int]] = []
+    rows = []
+    for key in keys:
+        stored = store.read("mf", key)
+        if stored is None or len(stored.records) < 3:
+            continue
+        days = stored.records["ts"] // DAY_NS
+        navs = np.array(stored.records["nav"], dtype=np.float64)
+        rows.append(kernels.nav_metrics(days, navs, risk_free, CAGR_YEARS))
+        meta = stored.meta.get("meta", {})
+        info.append((
+            key, meta.get("scheme_name", ""), meta.get("scheme_category", ""),
+            meta.get("fund_house", ""), float(navs[-1]), int(days[-1]),
+        ))
+    matrix = np.array(rows) if rows else np.empty((0, len(METRICS)))
+    return info, matrix
+
+
+def _order(values: np.ndarray, descending: bool) -> np.ndarray:
+    """Positions sorted by `values`, missing values last either way."""
+    keys = -values if descending else values
+    return np.argsort(np.where(np.isnan(keys), np.inf, keys), kind="stable").astype(np.int32)
+
+
+class MetricsTable:
+    """Immutable screener snapshot: one row per scheme, one column per metric.
+
+    Every metric has a precomputed ascending and descending order, and each
+    distinct category and fund house a position array, so a query is a few
+    vectorized passes over the table instead of a sort.
+    """
+
+    def __init__(self, info: List[tuple], matrix: np.ndarray):
+        self.size = len(info)
+        self.codes = [row[0] for row in info]
+        self.names = [row[1] for row in info]
+        self.categories = [row[2] for row in info]
+        self.fund_houses = [row[3] for row in info]
+        self.navs = np.array([row[4] for row in info], dtype=np.float64)
+        self.nav_days = np.array([row[5] for row in info], dtype=np.int64)
+        self.columns = {name: np.ascontiguousarray(matrix[:, i]) for i, name in enumerate(METRICS)}
+        self.orders = {
+            (name, descending): _order(values, descending)
+            for name, values in self.columns.items()
+            for descending in (False, True)
+        }
+        self.by_category = self._group(self.categories)
+        self.by_fund_house = self._group(self.fund_houses)
+        self.built_at = time.time()
+
+    @staticmethod
+    def _group(labels: List[str]) -> Dict[str, np.ndarray]:
+        groups: Dict[str, List[int]] = {}
+        for pos, label in enumerate(labels):
+            groups.setdefault(label, []).append(pos)
+        return {label: np.array(pos, dtype=np.int32) for label, pos in groups.items()}
+
+    def _match(self, groups: Dict[str, np.ndarray], text: str, mask: np.ndarray) -> np.ndarray:
+        # Case-insensitive substring over the (few dozen) distinct labels.
+        text = text.lower()
+        keep = np.zeros(self.size, dtype=bool)
+        for label, positions in groups.items():
+            if text in label.lower():
+                keep[positions] = True
+        return mask & keep
+
+    def query(
+        self,
+        bounds: Dict[str, Tuple[Optional[float], Optional[float]]],
+        sort: str,
+        descending: bool,
+        offset: int,
+        limit: int,
+        category: str = "",
+        fund_house: str = "",
+    ) -> Tuple[int, np.ndarray]:
+        """Total matches and the positions of one page, in sort order.
+
+        `bounds` maps metrics to inclusive (low, high) limits; a bounded
+        metric excludes schemes that don't have it.
+        """
+        mask = np.ones(self.size, dtype=bool)
+        if category:
+            mask = self._match(self.by_category, category, mask)
+        if fund_house:
+            mask = self._match(self.by_fund_house, fund_house, mask)
+        for name, (low, high) in bounds.items():
+            values = self.columns[name]
+            if low is not None:
+                mask &= values >= low
+            if high is not None:
+                mask &= values <= high
+        order = self.orders[(sort, descending)]
+        ranked = order[mask[order]]
+        return len(ranked), ranked[offset:offset + limit]
+
+    def rows(self, positions: np.ndarray) -> List[dict]:
+        rows = []
+        for pos in positions.tolist():
+            row = {
+                "code": self.codes[pos],
+                "name": self.names[pos],
+                "category": self.categories[pos],
+                "fund_house": self.fund_houses[pos],
+                "nav": float(self.navs[pos]),
+                "nav_date": str(np.datetime64(int(self.nav_days[pos]), "D")),
+            }
+            for name, values in self.columns.items():
+                value = float(values[pos])
+                row[name] = value if np.isfinite(value) else None
+            rows.append(row)
+        return rows
+
+
+class Screener:
+    """Rebuilds the metrics table for every stored scheme in the background.
+
+    Each rebuild first downloads up to MF_SCREENER_BACKFILL schemes from
+    `universe()` that aren't in the store yet (via `load` on `pool`, at most
+    MF_SCREENER_BACKFILL_CONCURRENCY at a time), then
+    computes metrics for all stored schemes in chunks across the compute
+    pool and swaps the new table in.
+    """
+
+    def __init__(
+        self,
+        store: PriceStore,
+        load: Callable[[str], object],
+        pool: BoundedExecutor,
+        universe: Callable[[], List[str]],
+        risk_free: float,
+    ):
+        self.store = store
+        self.load = load
+        self.pool = pool
+        self.universe = universe
+        self.risk_free = risk_free
+        self.table: Optional[MetricsTable] = None
+        self._unavailable = set()
+        self.last_run: Optional[dict] = None
+
+    def _backfill(self) -> int:
+        try:
+            universe = self.universe()
+        except Exception as e:
+            logger.warning(f"screener universe unavailable: {e}")
+            return 0
+        stored = set(self.store.keys("mf"))
+        missing = [c for c in map(str, universe) if c not in stored and c not in self._unavailable]
+        # A sliding window of loads, so user requests on the shared pool
+        # never queue behind more than a few backfill downloads.
+        slots = threading.BoundedSemaphore(MF_SCREENER_BACKFILL_CONCURRENCY)
+        futures = {}
+        for code in missing[:MF_SCREENER_BACKFILL]:
+            slots.acquire()
+            future = self.pool.submit(self.load, code)
+            future.add_done_callback(lambda _: slots.release())
+            futures[future] = code
+        wait(futures)
+        loaded = 0
+        for future, code in futures.items():
+            if future.exception() is None and future.result() is not None and len(future.result()):
+                loaded += 1
+            elif future.exception() is None:
+                # Closed schemes have no NAVs; don't retry them every run.
+                self._unavailable.add(code)
+        return loaded
+
+    def rebuild(self) -> dict:
+        started = time.time()
+        backfilled = self._backfill() if MF_SCREENER_BACKFILL > 0 else 0
+        keys = self.store.keys("mf")
+        chunks = [keys[i:i + MF_SCREENER_CHUNK] for i in range(0, len(keys), MF_SCREENER_CHUNK)]
+        pool = compute_pool.get_pool()
+        results = [f.result() for f in [
+            pool.submit(compute_metrics, self.store.root, chunk, self.risk_free) for chunk in chunks
+        ]]
+        info = [row for chunk_info, _ in results for row in chunk_info]
+        matrix = np.vstack([m for _, m in results]) if results else np.empty((0, len(METRICS)))
+        self.table = MetricsTable(info, matrix)
+        self.last_run = {
+            "started_at": started,
+            "seconds": round(time.time() - started, 3),
+            "schemes": self.table.size,
+            "backfilled": backfilled,
+            "chunks": len(chunks),
+        }
+        return self.last_run
+
+    def stats(self) -> dict:
+        return {
+            "schemes": self.table.size if self.table is not None else 0,
+            "built_at": self.table.built_at if self.table is not None else None,
+            "unavailable": len(self._unavailable),
+            "last_run": self.last_run,
+        }
@@ -0,0 +1,268 @@
+import csv
+import logging
+import os
+import re
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Comma separated list of instrument master CSVs. Accepts the NSE equity
+# list (EQUITY_L.csv), the BSE scrip list, or a plain symbol,name,exchange file
+# (optionally with sector and industry columns).
+INSTRUMENT_MASTER_PATH = os.getenv(
+    "INSTRUMENT_MASTER_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "instruments.csv"),
+)
+
+EXCHANGE_SUFFIXES = {"NSE": ".NS", "BSE": ".BO"}
+
+# Used when no instrument master is available.
+DEFAULT_INSTRUMENTS = [
+    ("TCS.NS", "Tata Consultancy Services", "NSE"),
+    ("INFY.NS", "Infosys Ltd", "NSE"),
+    ("RELIANCE.NS", "Reliance Industries", "NSE"),
+    ("HDFCBANK.NS", "HDFC Bank", "NSE"),
+    ("SBIN.NS", "State Bank of India", "NSE"),
+    ("ICICIBANK.NS", "ICICI Bank", "NSE"),
+    ("HINDUNILVR.NS", "Hindustan Unilever", "NSE"),
+    ("MARUTI.NS", "Maruti Suzuki", "NSE"),
+    ("BAJFINANCE.NS", "Bajaj Finance", "NSE"),
+    ("KOTAKBANK.NS", "Kotak Mahindra Bank", "NSE"),
+    ("LT.NS", "Larsen & Toubro", "NSE"),
+    ("ITC.NS", "ITC Ltd", "NSE"),
+    ("AXISBANK.NS", "Axis Bank", "NSE"),
+    ("BHARTIARTL.NS", "Bharti Airtel", "NSE"),
+    ("WIPRO.NS", "Wipro Ltd", "NSE"),
+]
+
+_SYMBOL_COLUMNS = ("symbol", "security id", "tradingsymbol", "ticker")
+_NAME_COLUMNS = ("name", "name of company", "security name", "issuer name", "company name")
+_SECTOR_COLUMNS = ("sector", "sector name")
+_INDUSTRY_COLUMNS = ("industry", "industry new name")
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Match tiers, best first.
+EXACT, PREFIX, NAME, FUZZY = range(4)
+# Shorter keys give too many accidental one-edit matches.
+FUZZY_MIN_LENGTH = 4
+MAX_RESULTS = 50
+# Prefixes shorter than this match large parts of the universe, so their
+# best MAX_RESULTS matches are precomputed instead of ranked per query.
+SHORT_PREFIX = 3
+
+
+class Instrument(NamedTuple):
+    symbol: str
+    name: str
+    exchange: str
+    sector: Optional[str] = None
+    industry: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return {"symbol": self.symbol, "name": self.name, "exchange": self.exchange}
+
+
+def base_symbol(symbol: str) -> str:
+    """Symbol without its Yahoo exchange suffix, e.g. "TCS.NS" -> "TCS"."""
+    symbol = symbol.strip().upper()
+    for suffix in EXCHANGE_SUFFIXES.values():
+        if symbol.endswith(suffix):
+            return symbol[: -len(suffix)]
+    return symbol
+
+
+def _compact(text: str) -> str:
+    return "".join(_TOKEN.findall(text.lower()))
+
+
+def _tokens(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+def _deletes(key: str) -> Set[str]:
+    """`key` and every string one deletion away from it."""
+    return {key} | {key[:i] + key[i + 1:] for i in range(len(key))}
+
+
+class SymbolIndex:
+    """In-memory autocomplete index over an instrument list.
+
+    Keys are compacted symbols (exchange suffix and punctuation removed)
+    and lower-cased name tokens. Prefix lookups bisect sorted key lists;
+    typo tolerance uses a symmetric-delete map, so a query within one edit
+    of a key is found with a handful of dict lookups instead of a scan.
+    """
+
+    def __init__(self, instruments: Iterable[Instrument]):
+        self.instruments: List[Instrument] = []
+        seen = set()
+        for inst in instruments:
+            if inst.symbol not in seen:
+                seen.add(inst.symbol)
+                self.instruments.append(inst)
+
+        self._symbol_ids: Dict[str, List[int]] = defaultdict(list)
+        self._token_ids: Dict[str, List[int]] = defaultdict(list)
+        self._fuzzy: Dict[str, Set[int]] = defaultdict(set)
+        self._name_tokens = [_tokens(inst.name) for inst in self.instruments]
+        for i, inst in enumerate(self.instruments):
+            symbol_key = _compact(base_symbol(inst.symbol))
+            self._symbol_ids[symbol_key].append(i)
+            for token in set(self._name_tokens[i]):
+                self._token_ids[token].append(i)
+            for key in {symbol_key, *self._name_tokens[i]}:
+                if len(key) >= FUZZY_MIN_LENGTH:
+                    for variant in _deletes(key):
+                        self._fuzzy[variant].add(i)
+
+        self._symbol_keys = sorted(self._symbol_ids)
+        self._token_keys = sorted(self._token_ids)
+        # Tie-break within a tier: shorter symbols, NSE before BSE, then alphabetical.
+        exchanges = list(EXCHANGE_SUFFIXES)
+        self._order = {
+            i: (
+                len(base_symbol(inst.symbol)),
+                exchanges.index(inst.exchange) if inst.exchange in exchanges else len(exchanges),
+                inst.symbol,
+            )
+            for i, inst in enumerate(self.instruments)
+        }
+        self._short_symbol = self._top_by_prefix(self._symbol_ids)
+        self._short_token = self._top_by_prefix(self._token_ids)
+
+    def __len__(self) -> int:
+        return len(self.instruments)
+
+    def _top_by_prefix(self, ids: Dict[str, List[int]]) -> Dict[str, List[int]]:
+        grouped: Dict[str, Set[int]] = defaultdict(set)
+        for key, key_ids in ids.items():
+            for n in range(1, SHORT_PREFIX):
+                grouped[key[:n]].update(key_ids)
+        return {
+            prefix: sorted(found, key=self._order.get)[:MAX_RESULTS]
+            for prefix, found in grouped.items()
+        }
+
+    @staticmethod
+    def _prefixed(keys: List[str], ids: Dict[str, List[int]], prefix: str) -> Set[int]:
+        found = set()
+        for pos in range(bisect_left(keys, prefix), len(keys)):
+            key = keys[pos]
+            if not key.startswith(prefix):
+                break
+            found.update(ids[key])
+        return found
+
+    def lookup(self, symbol: str) -> Optional[Instrument]:
+        """The instrument listed under exactly this symbol, exchange suffix included.
+
+        Other listings of the same company are not substituted; `search`
+        is for suggestions.
+        """
+        symbol = symbol.strip().upper()
+        for i in self._symbol_ids.get(_compact(base_symbol(symbol)), ()):
+            if self.instruments[i].symbol == symbol:
+                return self.instruments[i]
+        return None
+
+    def search(self, query: str, limit: int = 8) -> List[Instrument]:
+        """Ranked matches: exact symbol, symbol prefix, name token prefix, then one-typo matches."""
+        key = _compact(base_symbol(query))
+        if not key or limit <= 0:
+            return []
+        limit = min(limit, MAX_RESULTS)
+        tiers: Dict[int, int] = {}
+
+        def add(ids: Iterable[int], tier: int):
+            for i in ids:
+                if i not in tiers:
+                    tiers[i] = tier
+
+        add(self._symbol_ids.get(key, ()), EXACT)
+        if len(key) < SHORT_PREFIX:
+            add(self._short_symbol.get(key, ()), PREFIX)
+        else:
+            add(self._prefixed(self._symbol_keys, self._symbol_ids, key), PREFIX)
+
+        # Every query word must prefix some word of the name. Candidates come
+        # from the longest word; the others are checked per candidate.
+        words = _tokens(base_symbol(query))
+        driver = max(words, key=len)
+        if len(driver) < SHORT_PREFIX:
+            candidates = self._short_token.get(driver, ())
+        else:
+            candidates = self._prefixed(self._token_keys, self._token_ids, driver)
+        others = [w for w in words if w is not driver]
+        add(
+            (i for i in candidates
+             if all(any(t.startswith(w) for t in self._name_tokens[i]) for w in others)),
+            NAME,
+        )
+
+        if len(tiers) < limit and len(key) >= FUZZY_MIN_LENGTH:
+            fuzzy = set()
+            for variant in _deletes(key):
+                fuzzy |= self._fuzzy.get(variant, set())
+            add(fuzzy, FUZZY)
+
+        ranked = sorted(tiers, key=lambda i: (tiers[i], self._order[i]))
+        return [self.instruments[i] for i in ranked[:limit]]
+
+
+def _read_master(path: str) -> List[Instrument]:
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        columns = {c.strip().lower(): c for c in reader.fieldnames or []}
+        symbol_col = next((columns[c] for c in _SYMBOL_COLUMNS if c in columns), None)
+        name_col = next((columns[c] for c in _NAME_COLUMNS if c in columns), None)
+        if symbol_col is None or name_col is None:
+            raise ValueError(f"{path}: no symbol/name columns in {reader.fieldnames}")
+        exchange_col = columns.get("exchange")
+        sector_col = next((columns[c] for c in _SECTOR_COLUMNS if c in columns), None)
+        industry_col = next((columns[c] for c in _INDUSTRY_COLUMNS if c in columns), None)
+        default_exchange = "BSE" if "security id" in columns else "NSE"
+
+        instruments = []
+        for row in reader:
+            symbol = (row.get(symbol_col) or "").strip().upper()
+            name = (row.get(name_col) or "").strip()
+            if not symbol or not name:
+                continue
+            exchange = (row.get(exchange_col) or "").strip().upper() if exchange_col else ""
+            exchange = exchange or default_exchange
+            if base_symbol(symbol) == symbol:
+                symbol += EXCHANGE_SUFFIXES.get(exchange, "")
+            sector = (row.get(sector_col) or "").strip() if sector_col else ""
+            industry = (row.get(industry_col) or "").strip() if industry_col else ""
+            instruments.append(Instrument(symbol, name, exchange, sector or None, industry or None))
+        return instruments
+
+
+def load_instruments(paths: str = INSTRUMENT_MASTER_PATH) -> List[Instrument]:
+    instruments = []
+    for path in filter(None, (p.strip() for p in paths.split(","))):
+        if not os.path.exists(path):
+            continue
+        try:
+            instruments.extend(_read_master(path))
+        except (OSError, ValueError, csv.Error) as e:
+            logger.warning(f"Skipping instrument master {path}: {e}")
+    return instruments or [Instrument(*row) for row in DEFAULT_INSTRUMENTS]
+
+
+_index: Optional[SymbolIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> SymbolIndex:
+    """The process-wide index, built from the instrument master on first use."""
+    global _index
+    if _index is not None:
+        return _index
+    with _index_lock:
+        if _index is None:
+            _index = SymbolIndex(load_instruments())
+        return _index
@@ -0,0 +1,97 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+RECORDS = "records"
+COLUMNAR = "columnar"
+FORMAT_PATTERN = f"^({RECORDS}|{COLUMNAR})$"
+
+
+def column_values(series: pd.Series, decimals: Optional[int] = None) -> list:
+    """Convert a column to a JSON-ready list, with NaN/NaT mapped to None in bulk."""
+    if decimals is not None:
+        series = series.round(decimals)
+    values = series.to_numpy(dtype=object)
+    values[pd.isna(values)] = None
+    return values.tolist()
+
+
+def format_dates(series: pd.Series, fmt: str = "%Y-%m-%d") -> pd.Series:
+    return pd.to_datetime(series).dt.strftime(fmt)
+
+
+def to_columnar(
+    df: pd.DataFrame,
+    columns: Dict[str, str],
+    decimals: Optional[Dict[str, int]] = None,
+) -> Dict[str, list]:
+    """Serialize `df` as parallel arrays, one per output column.
+
+    `columns` maps output names to source column names. Only the listed
+    columns are touched, so unrelated helper columns cost nothing.
+    """
+    decimals = decimals or {}
+    return {
+        name: column_values(df[source], decimals.get(name))
+        for name, source in columns.items()
+        if source in df.columns
+    }
+
+
+def to_records(
+    df: pd.DataFrame,
+    columns: Dict[str, str],
+    decimals: Optional[Dict[str, int]] = None,
+) -> List[dict]:
+    """Serialize `df` as a list of row dicts without iterating rows in pandas."""
+    arrays = to_columnar(df, columns, decimals)
+    names = list(arrays)
+    return [dict(zip(names, row)) for row in zip(*arrays.values())]
+
+
+def serialize_frame(
+    df: pd.DataFrame,
+    columns: Dict[str, str],
+    fmt: str = RECORDS,
+    dropna: Optional[List[str]] = None,
+    decimals: Optional[Dict[str, int]] = None,
+):
+    """Serialize `df` as row records or, with fmt="columnar", parallel arrays.
+
+    `dropna` lists source columns whose missing values drop the whole row.
+    """
+    if dropna:
+        df = df.dropna(subset=dropna)
+    if fmt == COLUMNAR:
+        return to_columnar(df, columns, decimals)
+    return to_records(df, columns, decimals)
+
+
+def array_values(values: np.ndarray, decimals: Optional[int] = None) -> list:
+    """Nested lists for a NumPy array, with NaN/inf mapped to None."""
+    values = np.asarray(values, dtype=np.float64)
+    if decimals is not None:
+        values = values.round(decimals)
+    out = values.astype(object)
+    out[~np.isfinite(values)] = None
+    return out.tolist()
+
+
+def serialize_aligned(
+    days: np.ndarray,
+    matrix: np.ndarray,
+    names: List[str],
+    fmt: str = RECORDS,
+    decimals: Optional[int] = None,
+):
+    """Serialize a T x N matrix on a day axis (days since epoch) with a "date" column.
+
+    Missing values come out as None rather than strings or NaN.
+    """
+    arrays = {"date": np.datetime_as_string(np.asarray(days).astype("datetime64[D]")).tolist()}
+    for j, name in enumerate(names):
+        arrays[name] = array_values(matrix[:, j], decimals)
+    if fmt == COLUMNAR:
+        return arrays
+    return [dict(zip(arrays, row)) for row in zip(*arrays.values())]
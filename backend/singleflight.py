@@ -0,0 +1,76 @@
+import functools
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it
+    is still in flight block on the same future and receive its result (or
+    its exception). Nothing is cached once the call completes.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable, *args, share: Optional[Callable[[Any], Any]] = None, **kwargs):
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+                self.calls += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            result = future.result()
+            return share(result) if share is not None else result
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"in_flight": len(self._inflight), "calls": self.calls, "shared": self.shared}
+
+
+def coalesce(group: SingleFlight, share: Optional[Callable[[Any], Any]] = None):
+    """Decorator routing a function through `group`, keyed on its arguments.
+
+    `share` is applied to the result handed to waiting callers, e.g. to give
+    each of them their own copy of a DataFrame they may mutate.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = (fn.__qualname__, args, tuple(sorted(kwargs.items())))
+            return group.do(key, fn, *args, share=share, **kwargs)
+        return wrapper
+    return decorator
+
+
+def copy_result(result):
+    """`share` hook returning a copy of DataFrame/list/dict results."""
+    return result.copy() if hasattr(result, "copy") else result
+
+
+yfinance_flight = SingleFlight("yfinance")
+coingecko_flight = SingleFlight("coingecko")
+mfapi_flight = SingleFlight("mfapi")
@@ -0,0 +1,62 @@
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+
+class Snapshot:
+    """The last good result of `fetch()`, refreshed in the background.
+
+    Requests read `value` without touching upstream. A refresh that fails
+    or comes back empty leaves the previous value in place, so readers keep
+    getting the last good snapshot while upstream is down.
+    """
+
+    def __init__(self, name: str, fetch: Callable[[], list]):
+        self.name = name
+        self.fetch = fetch
+        self.value: Optional[list] = None
+        self.updated_at: Optional[float] = None
+        self.failures = 0
+        self._lock = threading.RLock()
+        SNAPSHOTS[name] = self
+
+    def refresh(self) -> int:
+        # Serialized so a scheduled refresh and a first request don't both fetch.
+        with self._lock:
+            try:
+                value = self.fetch()
+                if not value:
+                    raise RuntimeError(f"{self.name} snapshot came back empty")
+            except Exception:
+                self.failures += 1
+                raise
+            self.value = value
+            self.updated_at = time.time()
+            return len(value)
+
+    def get(self) -> list:
+        """The current value, fetching it first if no refresh has succeeded yet."""
+        if self.value is None:
+            with self._lock:
+                if self.value is None:
+                    self.refresh()
+        return self.value
+
+    @property
+    def loaded(self) -> bool:
+        return self.value is not None
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self.value) if self.value is not None else 0,
+            "updated_at": self.updated_at,
+            "age": round(time.time() - self.updated_at, 1) if self.updated_at else None,
+            "failures": self.failures,
+        }
+
+
+SNAPSHOTS: Dict[str, Snapshot] = {}
+
+
+def snapshot_stats() -> Dict[str, dict]:
+    return {name: snapshot.stats() for name, snapshot in SNAPSHOTS.items()}
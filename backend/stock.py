@@ -1,12 +1,18 @@
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, ConfigDict
 import pandas as pd
 import numpy as np
 import yfinance as yf
 import logging
 from typing import List, Optional
 
+import compute_pool
+from indicators import add_indicators, columns_for, parse_indicators
+from montecarlo import MAX_HORIZON_DAYS, MAX_SIMULATIONS, PRECISION_PATTERN, PRECISIONS, simulate_prices
+from serialization import COLUMNAR, FORMAT_PATTERN, RECORDS, format_dates, serialize_frame
+
 app = FastAPI(title="Advanced Indian Stock API (yfinance)")
 app.add_middleware(
     CORSMiddleware,
@@ -40,6 +46,9 @@ class StockQuote(BaseModel):
     volume: Optional[int]
 
 class HistoryRow(BaseModel):
+    # Indicator columns beyond the defaults are passed through as extra fields.
+    model_config = ConfigDict(extra="allow")
+
     date: str
     open: Optional[float]
     high: Optional[float]
@@ -56,19 +65,25 @@ class NewsItem(BaseModel):
     link: str
     datetime: str
 
+HISTORY_COLUMNS = {
+    "date": "date",
+    "open": "Open",
+    "high": "High",
+    "low": "Low",
+    "close": "Close",
+    "volume": "Volume",
+}
+DEFAULT_HISTORY_INDICATORS = "ma20,ma50"
+
 # --- Utilities ---
 def get_yf_ticker(symbol: str) -> yf.Ticker:
     return yf.Ticker(symbol)
 
-def get_history_df(symbol: str, period="1y", interval="1d") -> pd.DataFrame:
+def get_history_df(symbol: str, period="1y", interval="1d", indicators=()) -> pd.DataFrame:
     hist = get_yf_ticker(symbol).history(period=period, interval=interval)
     if hist.empty:
         raise Exception(f"No historical data found for {symbol}")
-    hist = hist.reset_index()
-    hist['returns'] = hist['Close'].pct_change()  # Simple returns
-    hist['ma20'] = hist['Close'].rolling(window=20).mean()
-    hist['ma50'] = hist['Close'].rolling(window=50).mean()
-    return hist
+    return add_indicators(hist, indicators).reset_index()
 
 # --- Endpoints ---
 
@@ -134,27 +149,27 @@ async def get_stock_history(
     symbol: str,
     period: str = "1y",
     interval: str = "1d",
-    include_returns: bool = True
+    include_returns: bool = True,
+    indicators: str = Query(
+        DEFAULT_HISTORY_INDICATORS,
+        description="Comma separated, e.g. ma20,ema20,rsi14,macd,bollinger",
+    ),
+    format: str = Query(RECORDS, pattern=FORMAT_PATTERN),
 ):
     try:
-        hist = get_history_df(symbol, period, interval)
-        hist['date'] = pd.to_datetime(hist['Date']).dt.strftime('%Y-%m-%d')
-        rows = []
-        for _, r in hist.iterrows():
-            row = {
-                "date": r["date"],
-                "open": r.get("Open"),
-                "high": r.get("High"),
-                "low": r.get("Low"),
-                "close": r.get("Close"),
-                "volume": r.get("Volume"),
-                "ma20": float(r["ma20"]) if not np.isnan(r["ma20"]) else None,
-                "ma50": float(r["ma50"]) if not np.isnan(r["ma50"]) else None
-            }
-            if include_returns:
-                row["returns"] = float(r["returns"]) if not np.isnan(r["returns"]) else None
-            rows.append(row)
-        return rows
+        names = parse_indicators(indicators)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if include_returns and "returns" not in names:
+        names.append("returns")
+    try:
+        hist = get_history_df(symbol, period, interval, names)
+        hist['date'] = format_dates(hist['Date'])
+        columns = dict(HISTORY_COLUMNS)
+        columns.update((column, column) for column in columns_for(names))
+        if format == COLUMNAR:
+            return JSONResponse(serialize_frame(hist, columns, COLUMNAR))
+        return serialize_frame(hist, columns)
     except Exception as e:
         logger.warning(f"history error: {e}")
         raise HTTPException(status_code=404, detail=f"Error: {e}")
@@ -162,7 +177,7 @@ async def get_stock_history(
 @app.get("/api/stock/performance-heatmap/{symbol}", tags=["Analytics"])
 async def get_stock_heatmap(symbol: str, period: str="2y", interval: str="1d"):
     try:
-        hist = get_history_df(symbol, period, interval)
+        hist = get_history_df(symbol, period, interval, ["returns"])
         hist['month'] = pd.to_datetime(hist['Date']).dt.month
         grouped = hist.groupby('month')['returns'].mean().reset_index()
         grouped['month'] = grouped['month'].astype(str)
@@ -173,17 +188,20 @@ async def get_stock_heatmap(symbol: str, period: str="2y", interval: str="1d"):
         raise HTTPException(status_code=404, detail=f"Error: {e}")
 
 @app.get("/api/stock/risk-volatility/{symbol}", tags=["Analytics"])
-async def get_stock_risk(symbol: str, period: str="1y", interval: str="1d"):
+async def get_stock_risk(
+    symbol: str, period: str="1y", interval: str="1d",
+    format: str = Query(RECORDS, pattern=FORMAT_PATTERN),
+):
     try:
-        hist = get_history_df(symbol, period, interval)
+        hist = get_history_df(symbol, period, interval, ["returns"])
         annualized_volatility = hist["returns"].std() * (252 ** 0.5)
         annualized_return = (hist["returns"].mean() + 1) ** 252 - 1
         risk_free_rate = 0.06
         sharpe_ratio = ((annualized_return - risk_free_rate) / annualized_volatility) if annualized_volatility > 0 else 0
-        returns_list = [
-            {"date": row["Date"].strftime("%Y-%m-%d"), "returns": float(row["returns"])}
-            for _, row in hist.iterrows() if not np.isnan(row["returns"])
-        ]
+        hist['date'] = format_dates(hist['Date'])
+        returns_list = serialize_frame(
+            hist, {"date": "date", "returns": "returns"}, format, dropna=["returns"]
+        )
         return {
             "annualized_volatility": float(annualized_volatility),
             "annualized_return": float(annualized_return),
@@ -207,43 +225,46 @@ async def get_max_drawdown(symbol: str, period: str="3y", interval: str="1d"):
         raise HTTPException(status_code=404, detail=f"Error: {e}")
 
 @app.get("/api/stock/rolling-volatility/{symbol}", tags=["Analytics"])
-async def get_rolling_volatility(symbol: str, window: int=21, period: str="1y", interval: str="1d"):
+async def get_rolling_volatility(
+    symbol: str, window: int=21, period: str="1y", interval: str="1d",
+    format: str = Query(RECORDS, pattern=FORMAT_PATTERN),
+):
     try:
-        hist = get_history_df(symbol, period, interval)
-        hist['rolling_vol'] = hist["returns"].rolling(window=window).std() * (252 ** 0.5)
-        hist['date'] = pd.to_datetime(hist['Date']).dt.strftime('%Y-%m-%d')
-        series = [
-            {"date": row["date"], "rolling_volatility": float(row["rolling_vol"])}
-            for _, row in hist.iterrows() if not np.isnan(row["rolling_vol"])
-        ]
-        return series
+        hist = get_history_df(symbol, period, interval, ["returns"])
+        hist['rolling_vol'] = await compute_pool.rolling_std(
+            hist["returns"].to_numpy(dtype=float), window
+        ) * (252 ** 0.5)
+        hist['date'] = format_dates(hist['Date'])
+        return serialize_frame(
+            hist, {"date": "date", "rolling_volatility": "rolling_vol"}, format, dropna=["rolling_vol"]
+        )
     except Exception as e:
         logger.warning(f"rolling vol error: {e}")
         raise HTTPException(status_code=404, detail=f"Error: {e}")
 
 @app.get("/api/stock/monte-carlo-prediction/{symbol}", tags=["Simulation"])
 async def get_stock_monte_carlo(
-    symbol: str, num_simulations: int = 1000, days: int = 252
+    symbol: str,
+    num_simulations: int = Query(1000, ge=1, le=MAX_SIMULATIONS),
+    days: int = Query(252, ge=1, le=MAX_HORIZON_DAYS),
+    seed: Optional[int] = Query(None, ge=0),
+    precision: str = Query("float64", pattern=PRECISION_PATTERN),
 ):
     try:
-        hist = get_history_df(symbol, period="2y", interval="1d")
+        hist = get_history_df(symbol, period="2y", interval="1d", indicators=["returns"])
         mu = hist["returns"].mean()
         sigma = hist["returns"].std()
         last_price = float(hist["Close"].iloc[-1])
-        simulations = np.zeros((num_simulations, days))
-        simulations[:, 0] = last_price
-        for t in range(1, days):
-            random_returns = np.random.normal(mu, sigma, num_simulations)
-            simulations[:, t] = simulations[:, t - 1] * (1 + random_returns)
-        expected_price = float(np.mean(simulations[:, -1]))
-        prob_positive = float(np.mean(simulations[:, -1] > last_price)) * 100
-        percentile_5 = float(np.percentile(simulations[:, -1], 5))
-        percentile_95 = float(np.percentile(simulations[:, -1], 95))
+        result = simulate_prices(
+            last_price, mu, sigma, days, num_simulations,
+            seed=seed, dtype=PRECISIONS[precision],
+        )
+        summary = result.summary()
         return {
-            "expected_price": expected_price,
-            "probability_positive_return": prob_positive,
-            "lower_bound_5th_percentile": percentile_5,
-            "upper_bound_95th_percentile": percentile_95,
+            "expected_price": summary["expected"],
+            "probability_positive_return": summary["probability_positive"] * 100,
+            "lower_bound_5th_percentile": summary["percentile_5"],
+            "upper_bound_95th_percentile": summary["percentile_95"],
             "last_price": last_price,
         }
     except Exception as e:
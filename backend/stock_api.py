@@ -1,12 +1,44 @@
+import asyncio
 from fastapi import APIRouter, HTTPException, Query
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, ConfigDict
 import pandas as pd
 import numpy as np
 import yfinance as yf
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence
+import os
+
+import compute_pool
+from background import schedule
+from executors import yfinance_pool
+from history_cache import cached_histories, cached_history_entry, is_sliceable, period_start, slice_from
+from indicators import add_indicators, columns_for, parse_indicators
+from info_cache import InfoCache
+from news_cache import NewsCache, newest_first
+from montecarlo import MAX_HORIZON_DAYS, MAX_SIMULATIONS, PRECISION_PATTERN, PRECISIONS
+from price_store import PRICE_STORE_REFRESH, frame_to_records, price_store
+from search_index import MAX_RESULTS, get_index
+from serialization import COLUMNAR, FORMAT_PATTERN, RECORDS, format_dates, serialize_frame, to_columnar
+from singleflight import coalesce, yfinance_flight
+from snapshot import Snapshot
 
 router = APIRouter(prefix="/api/stock", tags=["Stock"])
 
+MAX_BULK_SYMBOLS = 50
+STOCK_LIST_REFRESH = float(os.getenv("STOCK_LIST_REFRESH", "300"))
+LISTED_STOCKS = [
+    ("TCS.NS", "Tata Consultancy Services"),
+    ("INFY.NS", "Infosys Ltd"),
+    ("RELIANCE.NS", "Reliance Industries"),
+    ("HDFCBANK.NS", "HDFC Bank"),
+    ("SBIN.NS", "State Bank of India"),
+    ("ICICIBANK.NS", "ICICI Bank"),
+    ("HINDUNILVR.NS", "Hindustan Unilever"),
+    ("MARUTI.NS", "Maruti Suzuki"),
+    ("BAJFINANCE.NS", "Bajaj Finance"),
+    ("KOTAKBANK.NS", "Kotak Mahindra Bank"),
+]
+
 class StockProfile(BaseModel):
     symbol: str
     longName: Optional[str] = None
@@ -26,7 +58,20 @@ class StockQuote(BaseModel):
     marketCap: Optional[float]
     volume: Optional[int]
 
+class ListedStock(BaseModel):
+    symbol: str
+    longName: str
+    price: Optional[float] = None
+    open: Optional[float] = None
+    dayHigh: Optional[float] = None
+    dayLow: Optional[float] = None
+    previousClose: Optional[float] = None
+    volume: Optional[int] = None
+
 class HistoryRow(BaseModel):
+    # Indicator columns beyond the defaults are passed through as extra fields.
+    model_config = ConfigDict(extra="allow")
+
     date: str
     open: Optional[float]
     high: Optional[float]
@@ -43,24 +88,232 @@ class NewsItem(BaseModel):
     link: str
     datetime: str
 
+class FeedItem(NewsItem):
+    symbols: List[str]
+
+HISTORY_COLUMNS = {
+    "date": "date",
+    "open": "Open",
+    "high": "High",
+    "low": "Low",
+    "close": "Close",
+    "volume": "Volume",
+}
+DEFAULT_HISTORY_INDICATORS = "ma20,ma50"
+
+STORED_HISTORY_FIELDS = ["Open", "High", "Low", "Close", "Volume", "Dividends", "Stock Splits"]
+# Ticker.history and yf.download frames share history_cache entries, so both
+# ask for the same adjustment; download_histories also aligns tz and columns.
+HISTORY_AUTO_ADJUST = True
+
+BULK_HISTORY_COLUMNS = {
+    "open": "Open",
+    "high": "High",
+    "low": "Low",
+    "close": "Close",
+    "volume": "Volume",
+}
+
 def get_yf_ticker(symbol: str) -> yf.Ticker:
     return yf.Ticker(symbol)
 
-def get_history_df(symbol: str, period="1y", interval="1d") -> pd.DataFrame:
-    hist = get_yf_ticker(symbol).history(period=period, interval=interval)
-    if hist.empty:
+@coalesce(yfinance_flight)
+def get_ticker_info(symbol: str) -> dict:
+    return get_yf_ticker(symbol).info
+
+ticker_info = InfoCache(get_ticker_info, yfinance_pool)
+
+def quote_fields(info: dict) -> dict:
+    """StockQuote fields (other than symbol) from a `.info` dict."""
+    return {
+        "price": info.get("regularMarketPrice"),
+        "open": info.get("regularMarketOpen"),
+        "dayHigh": info.get("dayHigh"),
+        "dayLow": info.get("dayLow"),
+        "previousClose": info.get("regularMarketPreviousClose"),
+        "currency": info.get("currency"),
+        "marketCap": info.get("marketCap"),
+        "volume": info.get("regularMarketVolume"),
+    }
+
+@coalesce(yfinance_flight)
+def fetch_history(symbol: str, period: str, interval: str) -> pd.DataFrame:
+    if interval == "1d" and is_sliceable(period):
+        return fetch_stored_daily_history(symbol, period)
+    return get_yf_ticker(symbol).history(period=period, interval=interval, auto_adjust=HISTORY_AUTO_ADJUST)
+
+def fetch_stored_daily_history(symbol: str, period: str) -> pd.DataFrame:
+    """Daily history served from the local price store, topped up incrementally.
+
+    Only bars from the second-to-last stored one onwards are downloaded.
+    The overlapping complete bar is compared with the stored copy, and a
+    dividend, split or changed close (which rewrites adjusted history)
+    triggers a full re-download instead of an append.
+    """
+    key = symbol.upper()
+    start = period_start(period, pd.Timestamp.now(tz="UTC"))
+    start_ns = start.value if start is not None else None
+    ticker = get_yf_ticker(symbol)
+    with price_store.lock("stock", key):
+        stored = price_store.read("stock", key)
+        if stored is not None and stored.covers(start_ns) and len(stored.records) >= 2:
+            if stored.is_fresh(PRICE_STORE_REFRESH):
+                return _stored_frame(stored, start_ns)
+            frame = stored.to_frame()
+            new = ticker.history(
+                start=frame.index[-2].strftime("%Y-%m-%d"), interval="1d", auto_adjust=HISTORY_AUTO_ADJUST,
+            )
+            if new.empty:
+                price_store.touch("stock", key)
+                return _stored_frame(stored, start_ns)
+            overlap = frame.index[-2]
+            actions = new[[c for c in ("Dividends", "Stock Splits") if c in new.columns]]
+            if (
+                overlap in new.index
+                and np.isclose(new.loc[overlap, "Close"], frame.loc[overlap, "Close"], rtol=1e-4)
+                and not actions.to_numpy().any()
+            ):
+                price_store.append("stock", key, frame_to_records(new, stored.fields))
+                return _stored_frame(price_store.read("stock", key), start_ns)
+
+        full = ticker.history(period=period, interval="1d", auto_adjust=HISTORY_AUTO_ADJUST)
+        if full.empty:
+            return full
+        fields = [c for c in STORED_HISTORY_FIELDS if c in full.columns]
+        price_store.write("stock", key, frame_to_records(full, fields), {
+            "tz": str(full.index.tz) if full.index.tz is not None else None,
+            "index_name": full.index.name,
+            "covers_from": start_ns,
+        })
+        return full
+
+def _stored_frame(stored, start_ns) -> pd.DataFrame:
+    # The store may reach further back than `period`; return only its window,
+    # as a download for it would.
+    frame = stored.to_frame(start_ns)
+    if "Volume" in frame.columns:
+        frame["Volume"] = frame["Volume"].fillna(0).astype("int64")
+    return frame
+
+@coalesce(yfinance_flight)
+def download_histories(symbols: Sequence[str], period: str, interval: str) -> Dict[str, pd.DataFrame]:
+    """Fetch OHLCV history for several tickers in one yf.download round trip.
+
+    Frames match Ticker.history's: exchange-tz index (UTC when the tickers
+    span exchanges), the same columns in the same order, integer volume.
+    """
+    data = yf.download(
+        list(symbols), period=period, interval=interval,
+        group_by="ticker", threads=True, progress=False,
+        actions=True, ignore_tz=False, auto_adjust=HISTORY_AUTO_ADJUST,
+    )
+    frames = {}
+    if data is None or data.empty:
+        return frames
+    for symbol in symbols:
+        if isinstance(data.columns, pd.MultiIndex):
+            if symbol not in data.columns.get_level_values(0):
+                continue
+            frame = data[symbol]
+        else:
+            frame = data
+        frame = frame.dropna(how="all")
+        if not frame.empty:
+            frames[symbol] = _history_frame(frame)
+    return frames
+
+def _history_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    frame = frame[[c for c in STORED_HISTORY_FIELDS if c in frame.columns]].copy()
+    frame.columns.name = None
+    for column in ("Dividends", "Stock Splits"):
+        if column in frame.columns:
+            frame[column] = frame[column].fillna(0.0)
+    if "Volume" in frame.columns:
+        frame["Volume"] = frame["Volume"].fillna(0).astype("int64")
+    return frame
+
+def bar_quote_fields(frame: pd.DataFrame) -> dict:
+    """Quote fields from the last two daily bars of a download_histories frame."""
+    last = frame.iloc[-1]
+    volume = last.get("Volume")
+    return {
+        "price": last.get("Close"),
+        "open": last.get("Open"),
+        "dayHigh": last.get("High"),
+        "dayLow": last.get("Low"),
+        "previousClose": frame["Close"].iloc[-2] if len(frame) > 1 else None,
+        "volume": int(volume) if volume is not None and volume == volume else None,
+    }
+
+def fetch_stock_list() -> List[ListedStock]:
+    frames = download_histories(tuple(symbol for symbol, _ in LISTED_STOCKS), "5d", "1d")
+    listed = []
+    for symbol, name in LISTED_STOCKS:
+        frame = frames.get(symbol)
+        fields = bar_quote_fields(frame) if frame is not None and not frame.empty else {}
+        listed.append(ListedStock(symbol=symbol, longName=name, **fields))
+    # A download with no prices at all is a failure, not a snapshot.
+    return listed if any(stock.price is not None for stock in listed) else []
+
+stock_list = Snapshot("stock-list", fetch_stock_list)
+schedule("stock-list", STOCK_LIST_REFRESH, stock_list.refresh, yfinance_pool)
+
+def parse_symbols(symbols: str) -> List[str]:
+    parsed = []
+    for s in symbols.split(","):
+        s = s.strip().upper()
+        if s and s not in parsed:
+            parsed.append(s)
+    if not parsed:
+        raise HTTPException(status_code=400, detail="No symbols given")
+    if len(parsed) > MAX_BULK_SYMBOLS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_SYMBOLS} symbols per request")
+    return parsed
+
+@coalesce(yfinance_flight)
+def fetch_news(symbol: str) -> list:
+    return getattr(get_yf_ticker(symbol), "news", [])
+
+news_cache = NewsCache(fetch_news, yfinance_pool)
+
+def get_history_df(symbol: str, period="1y", interval="1d", indicators=()) -> pd.DataFrame:
+    """History for `period` with the named indicator columns added.
+
+    Indicators are computed over the whole cached frame and memoized on its
+    cache version, then sliced to `period` with the price columns.
+    """
+    full, start, version = cached_history_entry(symbol, period, interval, fetch_history)
+    if full.empty:
         raise Exception(f"No historical data found for {symbol}")
-    hist = hist.reset_index()
-    hist['returns'] = hist['Close'].pct_change()
-    hist['ma20'] = hist['Close'].rolling(window=20).mean()
-    hist['ma50'] = hist['Close'].rolling(window=50).mean()
-    return hist
+    cache_key = (symbol.upper(), interval, version) if version is not None else None
+    hist = add_indicators(full, indicators, cache_key)
+    return slice_from(hist, start).reset_index()
 
 @router.get("/search")
 async def search_stock(symbol: str = Query(..., description="e.g. TCS.NS")):
+    # Known instruments are answered from the instrument master, so typing
+    # in the search box does not scrape `.info` on every keystroke.
+    instrument = get_index().lookup(symbol)
+    if instrument is not None:
+        sector, industry = instrument.sector, instrument.industry
+        if sector is None and industry is None:
+            # Not in the master: take them from the cached profile, which
+            # only blocks the first time a symbol is looked up.
+            try:
+                info = await ticker_info.profile(instrument.symbol)
+                sector, industry = info.get("sector"), info.get("industry")
+            except Exception:
+                pass
+        return {
+            "found": True,
+            "symbol": instrument.symbol,
+            "longName": instrument.name,
+            "exchange": instrument.exchange,
+            "sector": sector,
+            "industry": industry,
+        }
     try:
-        stock = get_yf_ticker(symbol)
-        info = stock.info
+        info = await ticker_info.profile(symbol)
         found = bool(info and 'regularMarketPrice' in info)
         return {
             "found": found,
@@ -74,46 +327,17 @@ async def search_stock(symbol: str = Query(..., description="e.g. TCS.NS")):
         return {"found": False}
 
 @router.get("/search-stocks")
-async def search_stocks(q: str = Query(..., description="Search query for stocks")):
+async def search_stocks(
+    q: str = Query(..., description="Search query for stocks"),
+    limit: int = Query(8, ge=1, le=MAX_RESULTS),
+):
     """Search for stocks by name or symbol and return multiple results"""
-    try:
-        # For now, return a curated list of popular stocks that match the query
-        popular_stocks = [
-            {"symbol": "TCS.NS", "name": "Tata Consultancy Services", "exchange": "NSE"},
-            {"symbol": "INFY.NS", "name": "Infosys Ltd", "exchange": "NSE"},
-            {"symbol": "RELIANCE.NS", "name": "Reliance Industries", "exchange": "NSE"},
-            {"symbol": "HDFCBANK.NS", "name": "HDFC Bank", "exchange": "NSE"},
-            {"symbol": "SBIN.NS", "name": "State Bank of India", "exchange": "NSE"},
-            {"symbol": "ICICIBANK.NS", "name": "ICICI Bank", "exchange": "NSE"},
-            {"symbol": "HINDUNILVR.NS", "name": "Hindustan Unilever", "exchange": "NSE"},
-            {"symbol": "MARUTI.NS", "name": "Maruti Suzuki", "exchange": "NSE"},
-            {"symbol": "BAJFINANCE.NS", "name": "Bajaj Finance", "exchange": "NSE"},
-            {"symbol": "KOTAKBANK.NS", "name": "Kotak Mahindra Bank", "exchange": "NSE"},
-            {"symbol": "LT.NS", "name": "Larsen & Toubro", "exchange": "NSE"},
-            {"symbol": "ITC.NS", "name": "ITC Ltd", "exchange": "NSE"},
-            {"symbol": "AXISBANK.NS", "name": "Axis Bank", "exchange": "NSE"},
-            {"symbol": "BHARTIARTL.NS", "name": "Bharti Airtel", "exchange": "NSE"},
-            {"symbol": "WIPRO.NS", "name": "Wipro Ltd", "exchange": "NSE"},
-        ]
-
-        # Filter stocks based on query
-        query_lower = q.lower()
-        filtered_stocks = [
-            stock for stock in popular_stocks
-            if query_lower in stock["name"].lower() or query_lower in stock["symbol"].lower()
-        ]
-
-        # Return up to 8 results
-        return filtered_stocks[:8]
-
-    except Exception as e:
-        print(f"Error in search_stocks: {e}")
-        return []
+    return [instrument.to_dict() for instrument in get_index().search(q, limit)]
 
 @router.get("/profile/{symbol}", response_model=StockProfile)
 async def get_stock_profile(symbol: str):
     try:
-        info = get_yf_ticker(symbol).info
+        info = await ticker_info.profile(symbol)
         return StockProfile(
             symbol=symbol,
             longName=info.get("longName"),
@@ -128,62 +352,109 @@ async def get_stock_profile(symbol: str):
 @router.get("/quote/{symbol}", response_model=StockQuote)
 async def get_stock_quote(symbol: str):
     try:
-        info = get_yf_ticker(symbol).info
-        return StockQuote(
-            symbol=symbol,
-            price=info.get("regularMarketPrice"),
-            open=info.get("regularMarketOpen"),
-            dayHigh=info.get("dayHigh"),
-            dayLow=info.get("dayLow"),
-            previousClose=info.get("regularMarketPreviousClose"),
-            currency=info.get("currency"),
-            marketCap=info.get("marketCap"),
-            volume=info.get("regularMarketVolume"),
-        )
+        info = await ticker_info.quote(symbol)
+        return StockQuote(symbol=symbol, **quote_fields(info))
     except Exception as e:
         raise HTTPException(status_code=404, detail=f"Error: {e}")
 
+@router.get("/quotes", response_model=List[StockQuote])
+async def get_stock_quotes(symbols: str = Query(..., description="Comma separated, e.g. TCS.NS,INFY.NS")):
+    """Latest daily bar for many symbols from a single batched download.
+
+    Unlike /quote/{symbol} this skips the `.info` scrape, so currency and
+    marketCap are not available.
+    """
+    tickers = parse_symbols(symbols)
+    try:
+        frames = await yfinance_pool.run(download_histories, tuple(tickers), "5d", "1d")
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Error: {e}")
+    quotes = []
+    for symbol in tickers:
+        frame = frames.get(symbol)
+        if frame is not None and not frame.empty:
+            quotes.append(StockQuote(symbol=symbol, currency=None, marketCap=None, **bar_quote_fields(frame)))
+    return quotes
+
+@router.get("/histories")
+async def get_stock_histories(
+    symbols: str = Query(..., description="Comma separated, e.g. TCS.NS,INFY.NS"),
+    period: str = "1y",
+    interval: str = "1d",
+):
+    """OHLCV history for many symbols on a shared date axis.
+
+    Returns `{"dates": [...], "symbols": {SYM: {"open": [...], ...}}}` where
+    every array lines up with `dates` and gaps are null.
+    """
+    tickers = parse_symbols(symbols)
+    try:
+        frames = await yfinance_pool.run(
+            cached_histories, tickers, period, interval, download_histories
+        )
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Error: {e}")
+    if not frames:
+        return {"dates": [], "symbols": {}}
+    index = frames[next(iter(frames))].index
+    for frame in frames.values():
+        index = index.union(frame.index)
+    fmt = "%Y-%m-%d" if interval in ("1d", "5d", "1wk", "1mo", "3mo") else "%Y-%m-%d %H:%M"
+    payload = {}
+    for symbol in tickers:
+        frame = frames.get(symbol)
+        if frame is None:
+            continue
+        frame = frame.reindex(index)
+        if "Volume" in frame.columns:
+            frame["Volume"] = frame["Volume"].round().astype("Int64")
+        payload[symbol] = to_columnar(frame, BULK_HISTORY_COLUMNS)
+    return {"dates": index.strftime(fmt).tolist(), "symbols": payload}
+
 @router.get("/history/{symbol}", response_model=List[HistoryRow])
 async def get_stock_history(
     symbol: str,
     period: str = "1y",
     interval: str = "1d",
-    include_returns: bool = True
+    include_returns: bool = True,
+    indicators: str = Query(
+        DEFAULT_HISTORY_INDICATORS,
+        description="Comma separated, e.g. ma20,ema20,rsi14,macd,bollinger",
+    ),
+    format: str = Query(RECORDS, pattern=FORMAT_PATTERN),
 ):
     try:
-        hist = get_history_df(symbol, period, interval)
-        hist['date'] = pd.to_datetime(hist['Date']).dt.strftime('%Y-%m-%d')
-        rows = []
-        for _, r in hist.iterrows():
-            row = {
-                "date": r["date"],
-                "open": r.get("Open"),
-                "high": r.get("High"),
-                "low": r.get("Low"),
-                "close": r.get("Close"),
-                "volume": r.get("Volume"),
-                "ma20": float(r["ma20"]) if not np.isnan(r["ma20"]) else None,
-                "ma50": float(r["ma50"]) if not np.isnan(r["ma50"]) else None
-            }
-            if include_returns:
-                row["returns"] = float(r["returns"]) if not np.isnan(r["returns"]) else None
-            rows.append(row)
-        return rows
+        names = parse_indicators(indicators)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if include_returns and "returns" not in names:
+        names.append("returns")
+    try:
+        hist = await yfinance_pool.run(get_history_df, symbol, period, interval, names)
+        hist['date'] = format_dates(hist['Date'])
+        columns = dict(HISTORY_COLUMNS)
+        columns.update((column, column) for column in columns_for(names))
+        if format == COLUMNAR:
+            return JSONResponse(serialize_frame(hist, columns, COLUMNAR))
+        return serialize_frame(hist, columns)
     except Exception as e:
         raise HTTPException(status_code=404, detail=f"Error: {e}")
 
 @router.get("/risk-volatility/{symbol}")
-async def get_stock_risk(symbol: str, period: str="1y", interval: str="1d"):
+async def get_stock_risk(
+    symbol: str, period: str="1y", interval: str="1d",
+    format: str = Query(RECORDS, pattern=FORMAT_PATTERN),
+):
     try:
-        hist = get_history_df(symbol, period, interval)
+        hist = await yfinance_pool.run(get_history_df, symbol, period, interval, ["returns"])
         annualized_volatility = hist["returns"].std() * (252 ** 0.5)
         annualized_return = (hist["returns"].mean() + 1) ** 252 - 1
         risk_free_rate = 0.06
         sharpe_ratio = ((annualized_return - risk_free_rate) / annualized_volatility) if annualized_volatility > 0 else 0
-        returns_list = [
-            {"date": row["Date"].strftime("%Y-%m-%d"), "returns": float(row["returns"])}
-            for _, row in hist.iterrows() if not np.isnan(row["returns"])
-        ]
+        hist['date'] = format_dates(hist['Date'])
+        returns_list = serialize_frame(
+            hist, {"date": "date", "returns": "returns"}, format, dropna=["returns"]
+        )
         return {
             "annualized_volatility": float(annualized_volatility),
             "annualized_return": float(annualized_return),
@@ -195,67 +466,72 @@ async def get_stock_risk(symbol: str, period: str="1y", interval: str="1d"):
 
 @router.get("/monte-carlo-prediction/{symbol}")
 async def get_stock_monte_carlo(
-    symbol: str, num_simulations: int = 1000, days: int = 252
+    symbol: str,
+    num_simulations: int = Query(1000, ge=1, le=MAX_SIMULATIONS),
+    days: int = Query(252, ge=1, le=MAX_HORIZON_DAYS),
+    seed: Optional[int] = Query(None, ge=0),
+    precision: str = Query("float64", pattern=PRECISION_PATTERN),
 ):
     try:
-        hist = get_history_df(symbol, period="2y", interval="1d")
+        hist = await yfinance_pool.run(get_history_df, symbol, "2y", "1d", ["returns"])
         mu = hist["returns"].mean()
         sigma = hist["returns"].std()
         last_price = float(hist["Close"].iloc[-1])
-        simulations = np.zeros((num_simulations, days))
-        simulations[:, 0] = last_price
-        for t in range(1, days):
-            random_returns = np.random.normal(mu, sigma, num_simulations)
-            simulations[:, t] = simulations[:, t - 1] * (1 + random_returns)
-        expected_price = float(np.mean(simulations[:, -1]))
-        prob_positive = float(np.mean(simulations[:, -1] > last_price)) * 100
-        percentile_5 = float(np.percentile(simulations[:, -1], 5))
-        percentile_95 = float(np.percentile(simulations[:, -1], 95))
+        result = await compute_pool.simulate_prices(
+            last_price, mu, sigma, days, num_simulations,
+            seed=seed, dtype=PRECISIONS[precision],
+        )
+        summary = result.summary()
         return {
-            "expected_price": expected_price,
-            "probability_positive_return": prob_positive,
-            "lower_bound_5th_percentile": percentile_5,
-            "upper_bound_95th_percentile": percentile_95,
+            "expected_price": summary["expected"],
+            "probability_positive_return": summary["probability_positive"] * 100,
+            "lower_bound_5th_percentile": summary["percentile_5"],
+            "upper_bound_95th_percentile": summary["percentile_95"],
             "last_price": last_price,
         }
     except Exception as e:
         raise HTTPException(status_code=404, detail=f"Error: {e}")
     
-@router.get("/list")
+@router.get("/list", response_model=List[ListedStock])
 async def list_stocks():
-    stocks = [
-        {"symbol": "TCS.NS", "longName": "Tata Consultancy Services"},
-        {"symbol": "INFY.NS", "longName": "Infosys Ltd"},
-        {"symbol": "RELIANCE.NS", "longName": "Reliance Industries"},
-        {"symbol": "HDFCBANK.NS", "longName": "HDFC Bank"},
-        {"symbol": "SBIN.NS", "longName": "State Bank of India"},
-        {"symbol": "ICICIBANK.NS", "longName": "ICICI Bank"},
-        {"symbol": "HINDUNILVR.NS", "longName": "Hindustan Unilever"},
-        {"symbol": "MARUTI.NS", "longName": "Maruti Suzuki"},
-        {"symbol": "BAJFINANCE.NS", "longName": "Bajaj Finance"},
-        {"symbol": "KOTAKBANK.NS", "longName": "Kotak Mahindra Bank"},
-    ]
-    return stocks
+    """The featured stocks with their latest daily bar.
+
+    Served from a snapshot refreshed every STOCK_LIST_REFRESH seconds. If
+    no refresh has succeeded yet and upstream fails, the names come back
+    without prices.
+    """
+    if not stock_list.loaded:
+        try:
+            await yfinance_pool.run(stock_list.get)
+        except Exception:
+            return [ListedStock(symbol=symbol, longName=name) for symbol, name in LISTED_STOCKS]
+    return stock_list.value
+
+
+@router.get("/news", response_model=List[FeedItem])
+async def get_news_feed(
+    symbols: str = Query(..., description="Comma separated, e.g. TCS.NS,INFY.NS"),
+    limit: int = Query(20, ge=1, le=200),
+):
+    """News for several symbols merged newest first.
 
+    An article covering more than one of the symbols appears once, with
+    all of them listed in `symbols`.
+    """
+    tickers = parse_symbols(symbols)
+    results = await asyncio.gather(*(news_cache.get(s) for s in tickers), return_exceptions=True)
+    merged: Dict[str, dict] = {}
+    for symbol, items in zip(tickers, results):
+        if isinstance(items, Exception):
+            continue
+        for item in items:
+            entry = merged.setdefault(item["link"], dict(item, symbols=[]))
+            entry["symbols"].append(symbol)
+    return newest_first(merged.values())[:limit]
 
 @router.get("/news/{symbol}", response_model=List[NewsItem])
 async def get_stock_news(symbol: str, limit: int = 8):
     try:
-        stock = yf.Ticker(symbol)
-        news = getattr(stock, "news", [])
-        news_items = []
-        for i, n in enumerate(news[:limit]):
-            title = n.get("title", "")
-            publisher = n.get("publisher", "")
-            link = n.get("link", "")
-            ts = n.get("providerPublishTime", None)
-            if ts:
-                dt_txt = pd.to_datetime(ts, unit="s").strftime('%Y-%m-%d %H:%M:%S')
-            else:
-                dt_txt = ""
-            news_items.append(NewsItem(
-                title=title, publisher=publisher, link=link, datetime=dt_txt
-            ))
-        return news_items
+        return (await news_cache.get(symbol))[:limit]
     except Exception as e:
         raise HTTPException(status_code=404, detail=f"Error: {e}")
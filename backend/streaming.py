@@ -0,0 +1,285 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+from fastapi import APIRouter, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+from crypto_api import fetch_simple_price
+from executors import coingecko_pool
+from info_cache import quote_ttl
+from stock_api import quote_fields, ticker_info
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/stream", tags=["Streaming"])
+
+# A topic with no subscribers keeps polling this long, so reconnects (page
+# reloads, tab switches) find a warm snapshot, and is then stopped.
+STREAM_IDLE_TIMEOUT = float(os.getenv("STREAM_IDLE_TIMEOUT", "60"))
+STREAM_CRYPTO_INTERVAL = float(os.getenv("STREAM_CRYPTO_INTERVAL", "30"))
+STREAM_KEEPALIVE = float(os.getenv("STREAM_KEEPALIVE", "15"))
+STREAM_QUEUE_SIZE = int(os.getenv("STREAM_QUEUE_SIZE", "256"))
+STREAM_MAX_SUBSCRIPTIONS = int(os.getenv("STREAM_MAX_SUBSCRIPTIONS", "50"))
+# Wait after a failed upstream poll before trying again.
+STREAM_ERROR_BACKOFF = float(os.getenv("STREAM_ERROR_BACKOFF", "30"))
+
+Topic = Tuple[str, Hashable]
+
+
+class Subscriber:
+    """Outgoing message queue of one client connection.
+
+    The queue is bounded; a client that stops reading loses its oldest
+    messages instead of growing server memory.
+    """
+
+    def __init__(self, maxsize: int = STREAM_QUEUE_SIZE):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.topics: Set[Topic] = set()
+
+    def push(self, message: dict) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+
+
+class Source:
+    """How to poll one kind of topic: an async fetch and a poll interval."""
+
+    def __init__(self, fetch: Callable[[Hashable], Awaitable[dict]], interval: Callable[[Hashable], float], describe: Callable[[Hashable], dict]):
+        self.fetch = fetch
+        self.interval = interval
+        self.describe = describe
+
+
+class _TopicState:
+    def __init__(self):
+        self.subscribers: Set[Subscriber] = set()
+        self.last: Optional[dict] = None
+        self.task: Optional[asyncio.Task] = None
+        self.idle_since: Optional[float] = None
+
+
+class QuoteHub:
+    """Fans one upstream poller per topic out to any number of subscribers.
+
+    The first subscriber to a topic starts its poller; every poll is diffed
+    against the previous snapshot and only changed fields are pushed. New
+    subscribers get the latest full snapshot straight away. Once a topic has
+    had no subscribers for STREAM_IDLE_TIMEOUT its poller stops, so upstream
+    calls scale with distinct live topics rather than connections.
+    """
+
+    def __init__(self):
+        self.sources: Dict[str, Source] = {}
+        self._topics: Dict[Topic, _TopicState] = {}
+        self.polls = 0
+
+    def add_source(self, kind: str, source: Source) -> None:
+        self.sources[kind] = source
+
+    def subscribe(self, subscriber: Subscriber, topic: Topic) -> None:
+        state = self._topics.get(topic)
+        if state is None:
+            state = self._topics[topic] = _TopicState()
+        state.subscribers.add(subscriber)
+        state.idle_since = None
+        subscriber.topics.add(topic)
+        if state.last is not None:
+            subscriber.push(self._message("snapshot", topic, state.last))
+        if state.task is None or state.task.done():
+            state.task = asyncio.create_task(self._poll(topic, state))
+
+    def unsubscribe(self, subscriber: Subscriber, topic: Topic) -> None:
+        subscriber.topics.discard(topic)
+        state = self._topics.get(topic)
+        if state is None:
+            return
+        state.subscribers.discard(subscriber)
+        if not state.subscribers:
+            state.idle_since = time.monotonic()
+
+    def unsubscribe_all(self, subscriber: Subscriber) -> None:
+        for topic in list(subscriber.topics):
+            self.unsubscribe(subscriber, topic)
+
+    def _message(self, kind: str, topic: Topic, data: dict) -> dict:
+        return {"type": kind, **self.sources[topic[0]].describe(topic[1]), "data": data, "ts": time.time()}
+
+    async def _poll(self, topic: Topic, state: _TopicState) -> None:
+        source = self.sources[topic[0]]
+        try:
+            while True:
+                if state.idle_since is not None and time.monotonic() - state.idle_since >= STREAM_IDLE_TIMEOUT:
+                    break
+                delay = source.interval(topic[1])
+                try:
+                    self.polls += 1
+                    data = await source.fetch(topic[1])
+                except Exception as e:
+                    logger.warning(f"stream poll {topic} failed: {e}")
+                    delay = max(delay, STREAM_ERROR_BACKOFF)
+                else:
+                    if data:
+                        self._publish(topic, state, data)
+                await asyncio.sleep(min(delay, STREAM_IDLE_TIMEOUT) if state.idle_since else delay)
+        finally:
+            if self._topics.get(topic) is state and not state.subscribers:
+                del self._topics[topic]
+
+    def _publish(self, topic: Topic, state: _TopicState, data: dict) -> None:
+        if state.last is None:
+            message = self._message("snapshot", topic, data)
+        else:
+            delta = {k: v for k, v in data.items() if state.last.get(k) != v}
+            if not delta:
+                return
+            message = self._message("delta", topic, delta)
+        state.last = data
+        for subscriber in list(state.subscribers):
+            subscriber.push(message)
+
+    def stats(self) -> dict:
+        return {
+            "topics": len(self._topics),
+            "active_topics": sum(1 for s in self._topics.values() if s.subscribers),
+            "subscriptions": sum(len(s.subscribers) for s in self._topics.values()),
+            "polls": self.polls,
+        }
+
+    async def close(self) -> None:
+        tasks = [s.task for s in self._topics.values() if s.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._topics.clear()
+
+
+async def _stock_quote(symbol: str) -> dict:
+    # max_stale=0: the poller is what keeps the quote cache fresh.
+    return quote_fields(await ticker_info.quote(symbol, max_stale=0))
+
+
+async def _coin_price(key: Tuple[str, str]) -> dict:
+    return await coingecko_pool.run(fetch_simple_price, *key)
+
+
+hub = QuoteHub()
+hub.add_source("stock", Source(_stock_quote, quote_ttl, lambda s: {"kind": "stock", "symbol": s}))
+hub.add_source("crypto", Source(
+    _coin_price,
+    lambda key: STREAM_CRYPTO_INTERVAL,
+    lambda key: {"kind": "crypto", "symbol": key[0], "vs_currency": key[1]},
+))
+
+
+def parse_topics(symbols: Optional[List[str]], coins: Optional[List[str]], vs_currency: str = "usd") -> List[Topic]:
+    topics: List[Topic] = []
+    for s in symbols or []:
+        s = str(s).strip().upper()
+        if s and ("stock", s) not in topics:
+            topics.append(("stock", s))
+    for c in coins or []:
+        c = str(c).strip().lower()
+        if c and ("crypto", (c, vs_currency)) not in topics:
+            topics.append(("crypto", (c, vs_currency)))
+    return topics
+
+
+def _split(value: str) -> List[str]:
+    return [v for v in (value or "").split(",") if v.strip()]
+
+
+@router.get("/sse")
+async def stream_sse(
+    request: Request,
+    symbols: str = Query("", description="Comma separated stock symbols, e.g. TCS.NS,INFY.NS"),
+    coins: str = Query("", description="Comma separated CoinGecko ids, e.g. bitcoin,ethereum"),
+    vs_currency: str = "usd",
+):
+    """Server-sent events: a "snapshot" per topic, then "delta" events with changed fields."""
+    topics = parse_topics(_split(symbols), _split(coins), vs_currency.lower())
+    if not topics:
+        raise HTTPException(status_code=400, detail="No symbols or coins given")
+    if len(topics) > STREAM_MAX_SUBSCRIPTIONS:
+        raise HTTPException(status_code=400, detail=f"At most {STREAM_MAX_SUBSCRIPTIONS} subscriptions")
+
+    subscriber = Subscriber()
+    for topic in topics:
+        hub.subscribe(subscriber, topic)
+
+    async def events():
+        try:
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(subscriber.queue.get(), STREAM_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {message['type']}\ndata: {json.dumps(message)}\n\n"
+        finally:
+            hub.unsubscribe_all(subscriber)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/ws")
+async def stream_ws(websocket: WebSocket):
+    """WebSocket stream. Clients send
+    `{"action": "subscribe" | "unsubscribe", "symbols": [...], "coins": [...], "vs_currency": "usd"}`
+    and receive the same snapshot/delta messages as the SSE stream.
+    """
+    await websocket.accept()
+    subscriber = Subscriber()
+
+    async def sender():
+        while True:
+            await websocket.send_json(await subscriber.queue.get())
+
+    send_task = asyncio.create_task(sender())
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            # Parsed here rather than with receive_json, which would end the
+            # connection on one bad frame.
+            try:
+                request = json.loads(message.get("text") or message.get("bytes") or "")
+            except ValueError:
+                subscriber.push({"type": "error", "detail": "Messages must be JSON"})
+                continue
+            if not isinstance(request, dict) or not all(
+                isinstance(request.get(key), (list, type(None))) for key in ("symbols", "coins")
+            ):
+                subscriber.push({"type": "error", "detail": "Expected an object with symbols and coins lists"})
+                continue
+            action = request.get("action")
+            topics = parse_topics(
+                request.get("symbols"), request.get("coins"),
+                str(request.get("vs_currency") or "usd").lower(),
+            )
+            if action == "subscribe":
+                if len(subscriber.topics | set(topics)) > STREAM_MAX_SUBSCRIPTIONS:
+                    subscriber.push({"type": "error", "detail": f"At most {STREAM_MAX_SUBSCRIPTIONS} subscriptions"})
+                    continue
+                for topic in topics:
+                    hub.subscribe(subscriber, topic)
+            elif action == "unsubscribe":
+                for topic in topics:
+                    hub.unsubscribe(subscriber, topic)
+            else:
+                subscriber.push({"type": "error", "detail": f"Unknown action: {action}"})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        send_task.cancel()
+        hub.unsubscribe_all(subscriber)
@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+# Backend modules import each other by bare name, as when run from backend/.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Keep module-level stores and background jobs away from real data.
+os.environ.setdefault("PRICE_STORE_DIR", tempfile.mkdtemp(prefix="price-store-"))
+os.environ.setdefault("AMFI_NAV_SYNC", "0")
@@ -0,0 +1,61 @@
+import threading
+
+import pytest
+
+from coin_index import CoinDirectory, CoinIndex
+
+MARKETS = [
+    {"id": "bitcoin", "symbol": "btc", "name": "Bitcoin", "market_cap_rank": 1},
+    {"id": "ethereum", "symbol": "eth", "name": "Ethereum", "market_cap_rank": 2},
+]
+COINS = MARKETS + [
+    {"id": "bitcoin-cash", "symbol": "bch", "name": "Bitcoin Cash"},
+    {"id": "wrapped-btc", "symbol": "btc", "name": "Wrapped BTC"},
+]
+
+
+def test_search_prefers_ranked_exact_matches():
+    index = CoinIndex(COINS, {"bitcoin": 1, "ethereum": 2})
+    assert [c["id"] for c in index.search("btc")] == ["bitcoin", "wrapped-btc"]
+    assert [c["id"] for c in index.search("bitc")] == ["bitcoin", "bitcoin-cash"]
+    assert index.search("") == []
+
+
+def test_directory_merges_market_rows_into_search():
+    directory = CoinDirectory(lambda: MARKETS, lambda: COINS)
+    directory.refresh_list()
+    found = directory.search("bitcoin")
+    assert found[0]["market_cap_rank"] == 1
+    assert "market_cap_rank" not in found[1]
+    assert [c["id"] for c in directory.lookup(["ethereum", "dogecoin", "bitcoin"])] == ["bitcoin", "ethereum"]
+
+
+def test_first_request_does_not_wait_for_a_queued_background_refresh():
+    release = threading.Event()
+    started = threading.Event()
+
+    def slow_background_fetch():
+        started.set()
+        release.wait(5)
+        return MARKETS
+
+    directory = CoinDirectory(slow_background_fetch, lambda: COINS, fetch_markets_now=lambda: MARKETS[:1])
+    refresh = threading.Thread(target=directory.refresh_markets)
+    refresh.start()
+    try:
+        assert started.wait(5)
+        assert [c["id"] for c in directory.top(10)] == ["bitcoin"]
+    finally:
+        release.set()
+        refresh.join()
+    assert [c["id"] for c in directory.top(10)] == ["bitcoin", "ethereum"]
+
+
+def test_empty_refresh_keeps_previous_snapshot():
+    rows = [MARKETS]
+    directory = CoinDirectory(lambda: rows[0], lambda: COINS)
+    directory.refresh_markets()
+    rows[0] = []
+    with pytest.raises(RuntimeError):
+        directory.refresh_markets()
+    assert len(directory.top(10)) == 2
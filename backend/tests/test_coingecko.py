@@ -0,0 +1,69 @@
+import threading
+import time
+
+import pytest
+
+import coingecko
+from coingecko import BACKGROUND, INTERACTIVE, CoinGeckoClient, RateLimited, RequestBudget
+
+
+def test_burst_then_timeout():
+    budget = RequestBudget(rate_per_minute=60, burst=2)
+    assert budget.acquire(INTERACTIVE, 0.1)
+    assert budget.acquire(INTERACTIVE, 0.1)
+    assert not budget.acquire(INTERACTIVE, 0.05)
+    assert budget.stats()["timed_out"]["interactive"] == 1
+
+
+def test_waiting_interactive_call_goes_before_earlier_background_call():
+    budget = RequestBudget(rate_per_minute=600, burst=1)  # a token every 0.1s
+    assert budget.acquire(INTERACTIVE, 1)
+    order = []
+
+    def take(priority, name, delay):
+        time.sleep(delay)
+        if budget.acquire(priority, 2):
+            order.append(name)
+
+    threads = [
+        threading.Thread(target=take, args=(BACKGROUND, "background", 0)),
+        threading.Thread(target=take, args=(INTERACTIVE, "interactive", 0.02)),
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert order == ["interactive", "background"]
+
+
+def test_pause_blocks_and_accrues_nothing():
+    budget = RequestBudget(rate_per_minute=600, burst=5)
+    budget.pause(0.2)
+    assert not budget.acquire(INTERACTIVE, 0.1)
+    time.sleep(0.15)
+    budget._refill(time.monotonic())
+    # 0.05s past the pause at 10 tokens/s, not 0.25s worth.
+    assert budget.tokens < 1.0
+    assert budget.acquire(INTERACTIVE, 1)
+
+
+class _Response:
+    def __init__(self, status, headers=None):
+        self.status_code = status
+        self.headers = headers or {}
+
+
+def test_client_retries_429_after_retry_after(monkeypatch):
+    responses = [_Response(429, {"Retry-After": "0"}), _Response(200)]
+    monkeypatch.setattr(coingecko.requests, "get", lambda *a, **k: responses.pop(0))
+    client = CoinGeckoClient(RequestBudget(rate_per_minute=6000, burst=5))
+    assert client.get("/ping").status_code == 200
+    assert client.stats()["throttled"] == 1 and client.sent == 2
+
+
+def test_client_gives_up_with_rate_limited(monkeypatch):
+    monkeypatch.setattr(coingecko, "COINGECKO_MAX_RETRIES", 1)
+    monkeypatch.setattr(coingecko.requests, "get", lambda *a, **k: _Response(429, {"Retry-After": "0"}))
+    client = CoinGeckoClient(RequestBudget(rate_per_minute=6000, burst=5))
+    with pytest.raises(RateLimited):
+        client.get("/ping")
@@ -0,0 +1,67 @@
+import asyncio
+import threading
+
+from executors import BoundedExecutor
+
+
+def test_stats_count_completed_and_failed():
+    pool = BoundedExecutor("test_stats", 2)
+
+    def boom():
+        raise ValueError("boom")
+
+    assert pool.submit(lambda: 42).result() == 42
+    assert isinstance(pool.submit(boom).exception(), ValueError)
+    stats = pool.stats()
+    assert stats["submitted"] == 2 and stats["completed"] == 2 and stats["failed"] == 1
+    assert stats["queued"] == 0 and stats["active"] == 0
+
+
+def test_cancelled_run_does_not_stay_queued():
+    pool = BoundedExecutor("test_cancel", 1)
+    release = threading.Event()
+    blocker = pool.submit(release.wait, 5)
+
+    async def scenario():
+        waiting = asyncio.ensure_future(pool.run(lambda: "never"))
+        await asyncio.sleep(0.05)
+        assert pool.stats()["queued"] == 1
+        waiting.cancel()
+        await asyncio.sleep(0.05)
+
+    asyncio.run(scenario())
+    release.set()
+    blocker.result()
+    stats = pool.stats()
+    assert stats["cancelled"] == 1
+    assert stats["queued"] == 0
+    assert stats["peak_queued"] == 1
+
+
+def test_submit_once_shares_pending_future():
+    pool = BoundedExecutor("test_once", 1)
+    release = threading.Event()
+    calls = []
+
+    def work():
+        calls.append(1)
+        release.wait(5)
+        return len(calls)
+
+    first = pool.submit_once("key", work)
+    second = pool.submit_once("key", work)
+    assert first is second
+    release.set()
+    assert first.result() == 1
+    assert pool.submit_once("key", work).result() == 2
+
+
+def test_map_keeps_order_and_returns_exceptions():
+    pool = BoundedExecutor("test_map", 2)
+
+    def invert(x):
+        return 1 / x
+
+    results = asyncio.run(pool.map(invert, [1, 0, 4], limit=1))
+    assert results[0] == 1 and results[2] == 0.25
+    assert isinstance(results[1], ZeroDivisionError)
@@ -0,0 +1,136 @@
+import pandas as pd
+import pytest
+
+import history_cache
+from history_cache import FrameCache, cached_history, slice_from, window_start
+
+
+def daily(start: str, days: int) -> pd.DataFrame:
+    index = pd.bdate_range(start, periods=days, tz="Asia/Kolkata", name="Date")
+    return pd.DataFrame({"Close": [float(i) for i in range(days)]}, index=index)
+
+
+def intraday(*dates: str) -> pd.DataFrame:
+    index = pd.DatetimeIndex(
+        [pd.Timestamp(f"{d} {t}", tz="Asia/Kolkata") for d in dates for t in ("09:15", "12:00", "15:15")],
+        name="Datetime",
+    )
+    return pd.DataFrame({"Close": range(len(index))}, index=index, dtype=float)
+
+
+@pytest.fixture
+def fresh_cache(monkeypatch):
+    cache = FrameCache(max_bytes=1 << 30, max_entries=100)
+    monkeypatch.setattr(history_cache, "history_cache", cache)
+    return cache
+
+
+def test_get_slices_cached_frame_from_start():
+    cache = FrameCache(max_bytes=1 << 30, max_entries=10)
+    frame = daily("2024-01-01", 20)
+    cache.put("k", frame, pd.Timestamp("2023-12-01"), ttl=60)
+    sliced = cache.get("k", pd.Timestamp("2024-01-15"))
+    assert sliced.index[0].date() == pd.Timestamp("2024-01-15").date()
+    assert len(sliced) == 10
+
+
+def test_get_misses_when_cached_window_starts_later():
+    cache = FrameCache(max_bytes=1 << 30, max_entries=10)
+    cache.put("k", daily("2024-01-01", 20), pd.Timestamp("2024-01-01"), ttl=60)
+    assert cache.get("k", pd.Timestamp("2023-06-01")) is None
+    assert cache.get("k", None) is None
+    assert cache.stats()["misses"] == 2
+
+
+def test_full_history_entry_covers_any_start():
+    cache = FrameCache(max_bytes=1 << 30, max_entries=10)
+    cache.put("k", daily("2024-01-01", 5), None, ttl=60)
+    assert len(cache.get("k", None)) == 5
+    assert len(cache.get("k", pd.Timestamp("2024-01-03"))) == 3
+
+
+def test_expired_entry_is_a_miss():
+    cache = FrameCache(max_bytes=1 << 30, max_entries=10)
+    cache.put("k", daily("2024-01-01", 5), None, ttl=-1)
+    assert cache.get("k", None) is None
+
+
+def test_evicts_least_recently_used_over_entry_limit():
+    cache = FrameCache(max_bytes=1 << 30, max_entries=2)
+    for key in ("a", "b"):
+        cache.put(key, daily("2024-01-01", 5), None, ttl=60)
+    cache.get("a", None)
+    cache.put("c", daily("2024-01-01", 5), None, ttl=60)
+    assert cache.get("b", None) is None
+    assert cache.get("a", None) is not None
+    assert cache.get("c", None) is not None
+
+
+def test_evicts_over_byte_budget_and_skips_oversized_frames():
+    frame = daily("2024-01-01", 50)
+    size = int(frame.memory_usage(index=True).sum())
+    cache = FrameCache(max_bytes=2 * size, max_entries=100)
+    for key in ("a", "b", "c"):
+        cache.put(key, frame, None, ttl=60)
+    assert cache.get("a", None) is None
+    assert cache.stats()["bytes"] == 2 * size
+
+    cache.put("big", daily("2024-01-01", 500), None, ttl=60)
+    assert cache.get("big", None) is None
+    assert cache.stats()["entries"] == 2
+
+
+def test_put_replaces_entry_and_bumps_version():
+    cache = FrameCache(max_bytes=1 << 30, max_entries=10)
+    first = cache.put("k", daily("2024-01-01", 5), None, ttl=60)
+    second = cache.put("k", daily("2024-01-01", 3), None, ttl=60)
+    assert second > first
+    assert cache.version("k") == second
+    assert cache.stats()["entries"] == 1
+    cache.invalidate("k")
+    assert cache.version("k") is None
+    assert cache.stats()["bytes"] == 0
+
+
+def test_window_start_counts_trading_sessions():
+    frame = intraday("2024-01-04", "2024-01-05", "2024-01-08")
+    now = pd.Timestamp("2024-01-08 16:00")
+    one_day = slice_from(frame, window_start(frame, "1d", now))
+    assert set(one_day.index.date) == {pd.Timestamp("2024-01-08").date()}
+    five_days = slice_from(frame, window_start(frame, "5d", now))
+    assert len(five_days) == len(frame)
+
+
+def test_window_start_uses_calendar_for_longer_periods():
+    now = pd.Timestamp("2024-03-15")
+    assert window_start(daily("2024-01-01", 60), "1mo", now) == pd.Timestamp("2024-02-15")
+
+
+def test_cached_history_fetches_wider_period_once_and_slices(fresh_cache):
+    calls = []
+
+    def fetch(symbol, period, interval):
+        calls.append(period)
+        end = pd.Timestamp.now(tz="Asia/Kolkata").normalize()
+        index = pd.bdate_range(end=end, periods=520, tz="Asia/Kolkata", name="Date")
+        return pd.DataFrame({"Close": range(len(index))}, index=index, dtype=float)
+
+    year = cached_history("tcs.ns", "1y", "1d", fetch)
+    five = cached_history("TCS.NS", "5d", "1d", fetch)
+    assert calls == [history_cache.HISTORY_CACHE_MIN_PERIOD]
+    assert 240 < len(year) < 270
+    assert len(five) == 5
+    assert five.index[-1] == year.index[-1]
+
+
+def test_cached_history_bypasses_unknown_periods(fresh_cache):
+    calls = []
+
+    def fetch(symbol, period, interval):
+        calls.append(period)
+        return daily("2024-01-01", 3)
+
+    cached_history("TCS.NS", "7d", "1d", fetch)
+    cached_history("TCS.NS", "7d", "1d", fetch)
+    assert calls == ["7d", "7d"]
+    assert fresh_cache.stats()["entries"] == 0
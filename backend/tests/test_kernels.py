@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+import kernels
+
+
+def test_rolling_cagr_of_constant_growth():
+    days = np.arange(0, 3 * 365, dtype=np.int64)
+    values = 100.0 * 1.1 ** (days / 365.25)
+    ends, cagr = kernels.rolling_cagr(days, values, 365)
+    assert ends[0] == 365
+    assert len(ends) == len(days) - 365
+    np.testing.assert_allclose(cagr, 0.1, rtol=1e-9)
+
+
+def test_rolling_cagr_pairs_with_last_observation_before_window():
+    # Weekly points: a 10-day window reaches back to the point 14 days earlier.
+    days = np.array([0, 7, 14, 21], dtype=np.int64)
+    values = np.array([100.0, 101.0, 110.0, 121.0])
+    ends, cagr = kernels.rolling_cagr(days, values, 10)
+    assert ends.tolist() == [2, 3]
+    np.testing.assert_allclose(cagr, [1.1 ** (365.25 / 14) - 1, (121 / 101) ** (365.25 / 14) - 1])
+
+
+def test_rolling_cagr_window_longer_than_history():
+    days = np.arange(10, dtype=np.int64)
+    ends, cagr = kernels.rolling_cagr(days, np.linspace(1, 2, 10), 30)
+    assert len(ends) == 0 and len(cagr) == 0
+
+
+def test_xirr_single_year():
+    rate = kernels.xirr(np.array([-1000.0, 1100.0]), np.array([0, 365]))
+    assert rate == pytest.approx(0.1, abs=1e-9)
+
+
+def test_xirr_monthly_installments():
+    days = np.arange(0, 360, 30)
+    amounts = np.full(len(days) + 1, -100.0)
+    final = 365
+    # Value at `final` of each installment grown at 12% a year.
+    amounts[-1] = (100.0 * 1.12 ** ((final - days) / 365.0)).sum()
+    rate = kernels.xirr(amounts, np.r_[days, final])
+    assert rate == pytest.approx(0.12, abs=1e-8)
+
+
+def test_xirr_loss():
+    rate = kernels.xirr(np.array([-1000.0, 500.0]), np.array([0, 730]))
+    assert rate == pytest.approx(0.5 ** 0.5 - 1, abs=1e-9)
+
+
+def test_xirr_without_sign_change_is_nan():
+    assert np.isnan(kernels.xirr(np.array([-100.0, -50.0]), np.array([0, 30])))
+
+
+def test_last_per_day_keeps_last_finite_value():
+    days, values = kernels.last_per_day(np.array([3, 1, 3, 2, 2]), np.array([1.0, 2.0, 3.0, np.nan, 5.0]))
+    assert days.tolist() == [1, 2, 3]
+    assert values.tolist() == [2.0, 5.0, 3.0]
@@ -0,0 +1,65 @@
+import sqlite3
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def portfolio(tmp_path, monkeypatch):
+    monkeypatch.setenv("PORTFOLIO_DB", str(tmp_path / "portfolio.db"))
+    import importlib
+    import portfolio
+    module = importlib.reload(portfolio)
+    yield module
+    conn = getattr(module._local, "conn", None)
+    if conn is not None:
+        conn.close()
+
+
+def client(portfolio):
+    app = FastAPI()
+    app.include_router(portfolio.router)
+    return TestClient(app)
+
+
+def test_add_list_and_remove(portfolio):
+    c = client(portfolio)
+    item = c.post("/api/portfolio/add/u1", json={"symbol": "TCS.NS", "name": "TCS"}).json()
+    assert c.post("/api/portfolio/add/u1", json={"symbol": "TCS.NS", "name": "TCS"}).status_code == 400
+    assert [i["symbol"] for i in c.get("/api/portfolio/u1").json()] == ["TCS.NS"]
+    assert c.delete(f"/api/portfolio/u1/{item['id']}").status_code == 200
+    assert c.delete(f"/api/portfolio/u1/{item['id']}").status_code == 404
+
+
+def test_bulk_is_all_or_nothing(portfolio):
+    c = client(portfolio)
+    ok = c.post("/api/portfolio/bulk/u1", json={"add": [{"symbol": "A", "name": "a"}, {"symbol": "B", "name": "b"}]})
+    assert ok.status_code == 200 and len(ok.json()["added"]) == 2
+    too_many = {"add": [{"symbol": f"S{i}", "name": "s"} for i in range(portfolio.MAX_BULK_ITEMS + 1)]}
+    assert c.post("/api/portfolio/bulk/u1", json=too_many).status_code == 400
+    assert len(c.get("/api/portfolio/u1").json()) == 2
+
+
+def test_rolled_back_body_leaves_connection_usable(portfolio):
+    with pytest.raises(HTTPException):
+        with portfolio.transaction() as conn:
+            conn.execute("INSERT INTO portfolio_items (user_id, symbol, name, item_type) VALUES ('u', 'X', 'x', 'stock')")
+            raise HTTPException(status_code=400)
+    with portfolio.transaction() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM portfolio_items").fetchone()[0] == 0
+
+
+def test_failed_commit_rolls_back(portfolio):
+    conn = portfolio.get_connection()
+    # Deferred foreign keys fail at COMMIT, like SQLITE_BUSY would.
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.execute("CREATE TABLE parent (id INTEGER PRIMARY KEY)")
+    conn.execute("CREATE TABLE child (pid INTEGER REFERENCES parent(id) DEFERRABLE INITIALLY DEFERRED)")
+    with pytest.raises(sqlite3.IntegrityError):
+        with portfolio.transaction() as tx:
+            tx.execute("INSERT INTO child VALUES (1)")
+    assert not conn.in_transaction
+    with portfolio.transaction() as tx:
+        tx.execute("INSERT INTO parent VALUES (1)")
+    assert conn.execute("SELECT COUNT(*) FROM child").fetchone()[0] == 0
@@ -0,0 +1,149 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from price_store import PriceStore, is_next_session, record_dtype
+
+RECORD = record_dtype(["close"])
+
+
+def day(text: str) -> int:
+    return pd.Timestamp(text).value
+
+
+def records(*bars) -> np.ndarray:
+    out = np.empty(len(bars), dtype=RECORD)
+    out["ts"] = [day(d) for d, _ in bars]
+    out["close"] = [v for _, v in bars]
+    return out
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = PriceStore(str(tmp_path))
+    store.write("stock", "ABC", records(("2024-01-01", 1.0), ("2024-01-02", 2.0), ("2024-01-03", 3.0)), {})
+    return store
+
+
+def stored_bars(store):
+    stored = store.read("stock", "ABC")
+    return [(str(pd.Timestamp(int(t)).date()), float(v)) for t, v in zip(stored.records["ts"], stored.records["close"])]
+
+
+def test_append_replaces_overlapping_bars(store):
+    added = store.append("stock", "ABC", records(("2024-01-03", 3.5), ("2024-01-04", 4.0)))
+    assert added == 1
+    assert stored_bars(store) == [
+        ("2024-01-01", 1.0), ("2024-01-02", 2.0), ("2024-01-03", 3.5), ("2024-01-04", 4.0),
+    ]
+
+
+def test_append_from_earlier_bar_drops_everything_after_it(store):
+    added = store.append("stock", "ABC", records(("2024-01-02", 2.5)))
+    assert added == -1
+    assert stored_bars(store) == [("2024-01-01", 1.0), ("2024-01-02", 2.5)]
+
+
+def test_append_after_gap_keeps_all_stored_bars(store):
+    added = store.append("stock", "ABC", records(("2024-01-10", 10.0), ("2024-01-08", 8.0)))
+    assert added == 2
+    assert stored_bars(store)[2:] == [("2024-01-03", 3.0), ("2024-01-08", 8.0), ("2024-01-10", 10.0)]
+
+
+def test_append_updates_meta(store):
+    store.append("stock", "ABC", records(("2024-01-04", 4.0)), {"synced_through": "2024-01-04"})
+    stored = store.read("stock", "ABC")
+    assert stored.meta["count"] == 4
+    assert stored.meta["synced_through"] == "2024-01-04"
+    assert stored.fields == ["close"]
+
+
+def test_append_leaves_open_memmaps_intact(store):
+    before = store.read("stock", "ABC")
+    store.append("stock", "ABC", records(("2024-01-02", 9.0)))
+    assert before.records["close"].tolist() == [1.0, 2.0, 3.0]
+
+
+def test_append_requires_stored_series(store):
+    with pytest.raises(KeyError):
+        store.append("stock", "XYZ", records(("2024-01-01", 1.0)))
+
+
+def test_read_ignores_bytes_past_meta_count(store):
+    data_path, _ = store._paths("stock", "ABC")
+    with open(data_path, "ab") as f:
+        f.write(records(("2024-01-04", 4.0)).tobytes())
+    assert len(store.read("stock", "ABC").records) == 3
+
+
+def test_read_stops_at_end_of_short_file(store):
+    data_path, _ = store._paths("stock", "ABC")
+    with open(data_path, "r+b") as f:
+        f.truncate(os.path.getsize(data_path) - RECORD.itemsize + 3)
+    assert [v for _, v in stored_bars(store)] == [1.0, 2.0]
+
+
+def test_reader_keeps_records_and_meta_of_one_write(store):
+    store.touch("stock", "ABC")
+    before = store.read("stock", "ABC")
+    store.append("stock", "ABC", records(("2024-01-04", 4.0)), {"synced_through": "2024-01-04"})
+    assert before.meta["count"] == len(before.records) == 3
+    assert "synced_through" not in before.meta
+    after = store.read("stock", "ABC")
+    assert after.meta["count"] == len(after.records) == 4
+    assert after.meta["version"] != before.meta["version"]
+
+
+def test_touch_refreshes_checked_at(store):
+    data_path, check_path = store._paths("stock", "ABC")
+    with open(data_path, "rb") as f:
+        written = f.read()
+    store.touch("stock", "ABC")
+    with open(data_path, "rb") as f:
+        assert f.read() == written
+    with open(check_path) as f:
+        checked_at = json.load(f)["checked_at"]
+    assert store.read("stock", "ABC").meta["checked_at"] == checked_at
+
+
+def test_touch_of_replaced_version_is_ignored(store):
+    _, check_path = store._paths("stock", "ABC")
+    store.touch("stock", "ABC")
+    with open(check_path) as f:
+        check = json.load(f)
+    store.write("stock", "ABC", records(("2024-01-01", 1.0)), {})
+    with open(check_path, "w") as f:
+        json.dump(dict(check, checked_at=check["checked_at"] + 3600), f)
+    assert store.read("stock", "ABC").meta["checked_at"] < check["checked_at"] + 3600
+
+
+def test_read_rejects_files_without_header(store):
+    data_path, _ = store._paths("stock", "ABC")
+    with open(data_path, "wb") as f:
+        f.write(records(("2024-01-01", 1.0)).tobytes())
+    assert store.read("stock", "ABC") is None
+
+
+def test_keys_lists_data_files(store):
+    store.touch("stock", "ABC")
+    store.write("stock", "X/Y", records(("2024-01-01", 1.0)), {})
+    assert store.keys("stock") == ["ABC", "X_Y"]
+
+
+def test_read_missing_series(store):
+    assert store.read("stock", "XYZ") is None
+
+
+@pytest.mark.parametrize("last, nxt, expected", [
+    ("2024-01-02", "2024-01-03", True),   # Tue -> Wed
+    ("2024-01-05", "2024-01-08", True),   # Fri -> Mon
+    ("2024-01-06", "2024-01-08", True),   # Sat -> Mon
+    ("2024-01-03", "2024-01-03", True),   # same day, overlap only
+    ("2024-01-02", "2024-01-04", False),  # Wed missing
+    ("2024-01-05", "2024-01-09", False),  # Mon missing
+])
+def test_is_next_session(last, nxt, expected):
+    assert is_next_session(day(last), day(nxt)) is expected
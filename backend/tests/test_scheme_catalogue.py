@@ -0,0 +1,45 @@
+from scheme_catalogue import SchemeCatalogue
+
+SCHEMES = [
+    (101, "HDFC Liquid Fund - Growth"),
+    (102, "Axis Bluechip Fund"),
+    (103, "HDFC Liquid"),
+    (104, "ICICI Prudential Liquid Fund"),
+    (105, "SBI Small Cap Fund"),
+]
+
+
+def catalogue():
+    return SchemeCatalogue(lambda: SCHEMES)
+
+
+def test_search_ranks_exact_then_prefix_then_contains():
+    total, page = catalogue().search("hdfc liquid")
+    assert total == 2
+    assert [code for code, _ in page] == [103, 101]
+    total, page = catalogue().search("liquid")
+    assert total == 3
+    assert [code for code, _ in page] == [103, 101, 104]
+
+
+def test_every_query_word_must_match():
+    assert catalogue().search("hdfc bluechip") == (0, [])
+
+
+def test_single_letter_matches_word_starts_only():
+    total, page = catalogue().search("s")
+    assert [code for code, _ in page] == [105]
+
+
+def test_blank_search_pages_in_fetched_order():
+    total, page = catalogue().search("", offset=1, limit=2)
+    assert total == 5
+    assert [code for code, _ in page] == [102, 103]
+
+
+def test_sample_returns_distinct_schemes():
+    total, page = catalogue().sample(3)
+    assert total == 5
+    assert len({code for code, _ in page}) == 3
+    assert set(page) <= set(SCHEMES)
+    assert len(catalogue().sample(50)[1]) == 5
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from price_store import PriceStore, record_dtype
+from screener import METRICS, MetricsTable, compute_metrics
+
+NAN = float("nan")
+
+
+def scheme(code, category, fund_house, **metrics):
+    info = (code, f"Scheme {code}", category, fund_house, 10.0, 19723)
+    return info, [metrics.get(name, NAN) for name in METRICS]
+
+
+@pytest.fixture
+def table():
+    rows = [
+        scheme("1", "Equity Scheme - Large Cap Fund", "Alpha MF", sharpe=1.2, volatility=0.18),
+        scheme("2", "Equity Scheme - Small Cap Fund", "Beta MF", sharpe=0.4, volatility=0.30),
+        scheme("3", "Debt Scheme - Liquid Fund", "Alpha MF", sharpe=2.0, volatility=0.01),
+        scheme("4", "Equity Scheme - Large Cap Fund", "Beta MF", volatility=0.20),
+    ]
+    return MetricsTable([info for info, _ in rows], np.array([values for _, values in rows]))
+
+
+def codes(table, positions):
+    return [table.codes[p] for p in positions]
+
+
+def test_sort_puts_missing_values_last_both_ways(table):
+    total, page = table.query({}, "sharpe", True, 0, 10)
+    assert total == 4
+    assert codes(table, page) == ["3", "1", "2", "4"]
+    _, page = table.query({}, "sharpe", False, 0, 10)
+    assert codes(table, page) == ["2", "1", "3", "4"]
+
+
+def test_bounds_are_inclusive_and_drop_missing_values(table):
+    total, page = table.query({"sharpe": (0.4, 1.2)}, "sharpe", False, 0, 10)
+    assert total == 2
+    assert codes(table, page) == ["2", "1"]
+    total, _ = table.query({"volatility": (None, 0.2)}, "volatility", False, 0, 10)
+    assert total == 3
+
+
+def test_category_and_fund_house_match_substrings(table):
+    total, page = table.query({}, "volatility", False, 0, 10, category="large cap", fund_house="beta")
+    assert total == 1
+    assert codes(table, page) == ["4"]
+    total, _ = table.query({}, "volatility", False, 0, 10, category="equity")
+    assert total == 3
+
+
+def test_paging_keeps_total(table):
+    total, page = table.query({}, "volatility", False, 1, 2)
+    assert total == 4
+    assert codes(table, page) == ["1", "4"]
+    total, page = table.query({}, "volatility", False, 10, 2)
+    assert total == 4
+    assert len(page) == 0
+
+
+def test_rows_report_missing_metrics_as_none(table):
+    _, page = table.query({}, "volatility", False, 0, 10, fund_house="beta")
+    rows = table.rows(page)
+    assert [row["code"] for row in rows] == ["4", "2"]
+    assert rows[0]["sharpe"] is None
+    assert rows[1]["sharpe"] == pytest.approx(0.4)
+    assert rows[0]["nav_date"] == "2024-01-01"
+
+
+def test_empty_table():
+    table = MetricsTable([], np.empty((0, len(METRICS))))
+    assert table.query({"sharpe": (0, None)}, "sharpe", True, 0, 10)[0] == 0
+    assert table.rows(np.empty(0, dtype=np.int32)) == []
+
+
+def test_compute_metrics_reads_store_and_skips_short_series(tmp_path):
+    store = PriceStore(str(tmp_path))
+    dates = pd.bdate_range("2023-01-02", periods=300)
+    records = np.empty(len(dates), dtype=record_dtype(["nav"]))
+    records["ts"] = dates.to_numpy(dtype="datetime64[ns]").view(np.int64)
+    records["nav"] = np.linspace(10.0, 12.0, len(dates))
+    store.write("mf", "100", records, {"meta": {"scheme_name": "Growth Fund", "fund_house": "Alpha MF"}})
+    store.write("mf", "200", records[:2], {"meta": {}})
+
+    info, matrix = compute_metrics(str(tmp_path), ["100", "200", "300"], 0.065)
+    assert [row[0] for row in info] == ["100"]
+    assert info[0][1] == "Growth Fund"
+    assert info[0][4] == pytest.approx(12.0)
+    assert matrix.shape == (1, len(METRICS))
+    assert matrix[0, METRICS.index("annual_return")] > 0
@@ -0,0 +1,65 @@
+import logging
+
+from search_index import Instrument, SymbolIndex, load_instruments
+
+INSTRUMENTS = [
+    Instrument("TCS.NS", "Tata Consultancy Services", "NSE"),
+    Instrument("RELIANCE.NS", "Reliance Industries", "NSE", "Energy", "Oil & Gas"),
+    Instrument("RELIANCE.BO", "Reliance Industries", "BSE"),
+    Instrument("RELINFRA.NS", "Reliance Infrastructure", "NSE"),
+    Instrument("INFY.NS", "Infosys Ltd", "NSE"),
+    Instrument("TATAMOTORS.NS", "Tata Motors", "NSE"),
+]
+
+
+def symbols(found):
+    return [i.symbol for i in found]
+
+
+def test_lookup_returns_only_the_exact_listing():
+    index = SymbolIndex(INSTRUMENTS)
+    assert index.lookup("reliance.bo").exchange == "BSE"
+    assert index.lookup("RELIANCE.NS").sector == "Energy"
+    assert index.lookup("TCS") is None
+    assert index.lookup("TCS.BO") is None
+    assert index.lookup("WIPRO.NS") is None
+
+
+def test_search_ranks_exact_symbol_then_prefix_nse_first():
+    index = SymbolIndex(INSTRUMENTS)
+    assert symbols(index.search("reliance")) == ["RELIANCE.NS", "RELIANCE.BO", "RELINFRA.NS"]
+    assert symbols(index.search("rel", limit=1)) == ["RELIANCE.NS"]
+
+
+def test_search_matches_name_word_prefixes():
+    index = SymbolIndex(INSTRUMENTS)
+    assert symbols(index.search("tata mot")) == ["TATAMOTORS.NS"]
+    assert symbols(index.search("consultancy")) == ["TCS.NS"]
+
+
+def test_search_tolerates_one_typo():
+    index = SymbolIndex(INSTRUMENTS)
+    assert symbols(index.search("infosis")) == ["INFY.NS"]
+
+
+def test_duplicate_symbols_are_indexed_once():
+    index = SymbolIndex(INSTRUMENTS + [Instrument("TCS.NS", "TCS again", "NSE")])
+    assert len(index) == len(INSTRUMENTS)
+    assert index.lookup("TCS.NS").name == "Tata Consultancy Services"
+
+
+def test_load_instruments_reads_master_columns(tmp_path):
+    master = tmp_path / "instruments.csv"
+    master.write_text("SYMBOL,NAME OF COMPANY,Sector,Industry\nABB,ABB India,Industrials,Machinery\n")
+    assert load_instruments(str(master)) == [
+        Instrument("ABB.NS", "ABB India", "NSE", "Industrials", "Machinery"),
+    ]
+
+
+def test_unreadable_master_is_logged_and_skipped(tmp_path, caplog):
+    bad = tmp_path / "bad.csv"
+    bad.write_text("foo,bar\n1,2\n")
+    with caplog.at_level(logging.WARNING, logger="search_index"):
+        instruments = load_instruments(str(bad))
+    assert instruments and instruments[0].symbol == "TCS.NS"
+    assert "Skipping instrument master" in caplog.text
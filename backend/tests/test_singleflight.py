@@ -0,0 +1,73 @@
+import threading
+import time
+
+import pytest
+
+from singleflight import SingleFlight, coalesce, copy_result
+
+
+def run_together(count, fn):
+    results = [None] * count
+    errors = [None] * count
+
+    def one(i):
+        try:
+            results[i] = fn()
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=one, args=(i,)) for i in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, errors
+
+
+def test_concurrent_calls_share_one_execution():
+    group = SingleFlight("test")
+    calls = []
+
+    @coalesce(group, share=copy_result)
+    def fetch(symbol):
+        calls.append(symbol)
+        time.sleep(0.1)
+        return [symbol]
+
+    results, errors = run_together(5, lambda: fetch("TCS"))
+    assert calls == ["TCS"]
+    assert results == [["TCS"]] * 5 and errors == [None] * 5
+    # Waiters get their own copy.
+    assert len({id(r) for r in results}) == 5
+    assert group.stats() == {"in_flight": 0, "calls": 1, "shared": 4}
+
+
+def test_different_arguments_are_not_coalesced():
+    group = SingleFlight("test")
+
+    @coalesce(group)
+    def fetch(symbol, period="1y"):
+        return (symbol, period)
+
+    assert fetch("TCS") == ("TCS", "1y")
+    assert fetch("TCS", period="5d") == ("TCS", "5d")
+    assert group.calls == 2 and group.shared == 0
+
+
+def test_exception_reaches_every_waiter_and_is_not_cached():
+    group = SingleFlight("test")
+    attempts = []
+
+    @coalesce(group)
+    def fetch():
+        attempts.append(1)
+        time.sleep(0.1)
+        if len(attempts) == 1:
+            raise RuntimeError("upstream down")
+        return "ok"
+
+    results, errors = run_together(3, fetch)
+    assert all(isinstance(e, RuntimeError) for e in errors)
+    assert fetch() == "ok"
+    with pytest.raises(KeyError):
+        group.do("k", {}.__getitem__, "missing")
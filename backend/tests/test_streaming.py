@@ -0,0 +1,26 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import streaming
+
+app = FastAPI()
+app.include_router(streaming.router)
+
+
+def test_bad_websocket_messages_get_errors_and_keep_the_connection():
+    with TestClient(app).websocket_connect("/api/stream/ws") as ws:
+        ws.send_text("not json{")
+        assert ws.receive_json() == {"type": "error", "detail": "Messages must be JSON"}
+        ws.send_json(["TCS.NS"])
+        assert ws.receive_json()["type"] == "error"
+        ws.send_json({"action": "subscribe", "symbols": "TCS.NS"})
+        assert ws.receive_json()["type"] == "error"
+        ws.send_json({"action": "watch"})
+        assert ws.receive_json() == {"type": "error", "detail": "Unknown action: watch"}
+
+
+def test_parse_topics_dedupes_and_normalizes():
+    assert streaming.parse_topics([" tcs.ns", "TCS.NS"], ["Bitcoin", "bitcoin"], "inr") == [
+        ("stock", "TCS.NS"),
+        ("crypto", ("bitcoin", "inr")),
+    ]